@@ -0,0 +1,69 @@
+import math
+
+import db
+
+# Yields are scaled by a full page of cards so UCB sees rewards in [0, 1]
+PAGE_SIZE = 25
+# Exploration weight in the UCB score
+EXPLORATION = 1.0
+# Old observations fade so the allocator follows changes in the market
+DECAY = 0.9
+# Assumed share of the previous page's yield for a page never fetched
+DEPTH_PRIOR = 0.5
+
+
+class BudgetAllocator:
+    """
+    UCB1 bandit that decides which search page to fetch next.
+
+    Each arm is a (keyword, page) pair for one location, scored by its
+    historical new jobs per fetch plus an exploration bonus. Page 0 of a
+    keyword that has never been fetched is always tried first. All
+    statistics decay once per scan, so arms that have not been fetched for
+    a while regain exploration bonus and get re-checked. State is stored
+    in the allocator_stats table.
+    """
+
+    def __init__(self, location):
+        self.location = location
+        self.stats = db.get_allocator_stats(location)
+
+    def _mean(self, keyword, page):
+        pulls, total = self.stats.get((keyword, page), (0.0, 0.0))
+        if pulls:
+            return total / pulls
+        if page == 0:
+            return None
+        parent = self._mean(keyword, page - 1)
+        return None if parent is None else parent * DEPTH_PRIOR
+
+    def score(self, keyword, page):
+        mean = self._mean(keyword, page)
+        if mean is None:
+            return math.inf
+        pulls = self.stats.get((keyword, page), (0.0, 0.0))[0]
+        total_pulls = sum(p for p, _ in self.stats.values()) or 1.0
+        return mean / PAGE_SIZE + EXPLORATION * math.sqrt(math.log(total_pulls + 1) / (pulls + 1))
+
+    def choose(self, candidates):
+        """Pick the (keyword, page) candidate with the highest score, or None."""
+        ranked = self.rank(candidates, 1)
+        return ranked[0] if ranked else None
+
+    def rank(self, candidates, n):
+        """The n highest-scoring (keyword, page) candidates, best first."""
+        return sorted(candidates, key=lambda arm: self.score(*arm), reverse=True)[:n]
+
+    def record(self, keyword, page, new_jobs):
+        pulls, total = self.stats.get((keyword, page), (0.0, 0.0))
+        self.stats[(keyword, page)] = (pulls + 1, total + new_jobs)
+
+    def save(self):
+        """Decay every arm and persist. Call once at the end of a scan."""
+        self.stats = {
+            arm: (pulls * DECAY, total * DECAY) for arm, (pulls, total) in self.stats.items()
+        }
+        db.save_allocator_stats(
+            self.location,
+            [(keyword, page, pulls, total) for (keyword, page), (pulls, total) in self.stats.items()],
+        )
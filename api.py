@@ -0,0 +1,141 @@
+import base64
+import gzip
+import hashlib
+import json
+import logging
+import re
+import sqlite3
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import chats
+import db
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LIMIT = 100
+MAX_LIMIT = 1000
+# Smaller bodies aren't worth compressing
+GZIP_MIN_BYTES = 1024
+
+_TIMESTAMP = re.compile(r"^\d{4}-\d{2}-\d{2}([ T]\d{2}:\d{2}(:\d{2})?)?$")
+
+
+class BadRequest(ValueError):
+    pass
+
+
+def encode_cursor(created_at, row_id):
+    return base64.urlsafe_b64encode(f"{created_at}|{row_id}".encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode("utf-8")
+        created_at, row_id = raw.rsplit("|", 1)
+        return created_at, int(row_id)
+    except ValueError:
+        raise BadRequest("invalid cursor") from None
+
+
+def _timestamp(value, name, separator=" "):
+    """
+    ISO date or date-time, with the date/time separator its column is stored
+    with: ' ' for created_at, 'T' for posted_at.
+    """
+    if not _TIMESTAMP.match(value):
+        raise BadRequest(f"{name} must be YYYY-MM-DD or YYYY-MM-DDTHH:MM:SS")
+    return value.replace("T", " ").replace(" ", separator)
+
+
+def list_jobs(query):
+    """
+    The /jobs response for parsed query parameters ({name: [values]}).
+
+    Filters: status, keyword, company, since, until (UTC, on created_at),
+    posted_since, posted_until (UTC, on when the posting went up). chat
+    selects whose history (and statuses) to list; the primary chat by default.
+    Returns {"jobs": [...], "next_cursor": str or None}; pass next_cursor
+    back as cursor for the following page.
+    """
+    params = {name: values[-1] for name, values in query.items()}
+    try:
+        limit = int(params.get("limit", DEFAULT_LIMIT))
+    except ValueError:
+        raise BadRequest("limit must be an integer") from None
+    if not 1 <= limit <= MAX_LIMIT:
+        raise BadRequest(f"limit must be between 1 and {MAX_LIMIT}")
+    chat_id = params.get("chat")
+    if chat_id is not None and chat_id not in chats.all_chats():
+        raise BadRequest("unknown chat")
+
+    rows = db.list_jobs(
+        status=params.get("status"),
+        keyword=params.get("keyword"),
+        company=params.get("company"),
+        since=_timestamp(params["since"], "since") if "since" in params else None,
+        until=_timestamp(params["until"], "until") if "until" in params else None,
+        before=decode_cursor(params["cursor"]) if "cursor" in params else None,
+        limit=limit,
+        posted_since=_timestamp(params["posted_since"], "posted_since", "T") if "posted_since" in params else None,
+        posted_until=_timestamp(params["posted_until"], "posted_until", "T") if "posted_until" in params else None,
+        chat_id=chat_id,
+    )
+    jobs = [dict(row) for row in rows]
+    next_cursor = None
+    if len(jobs) == limit:
+        next_cursor = encode_cursor(jobs[-1]["created_at"], jobs[-1]["id"])
+    return {"jobs": jobs, "next_cursor": next_cursor}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        url = urlsplit(self.path)
+        if url.path != "/jobs":
+            self._send_json(404, {"error": "not found"})
+            return
+        try:
+            payload = list_jobs(parse_qs(url.query))
+        except BadRequest as e:
+            self._send_json(400, {"error": str(e)})
+            return
+        except sqlite3.OperationalError as e:
+            logger.error(f"History API query failed: {e}")
+            self._send_json(503, {"error": "database unavailable"})
+            return
+        self._send_json(200, payload)
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+        tag = f'"{hashlib.sha1(body).hexdigest()}"'
+        # Weak: the same tag covers the gzip and identity encodings of the body
+        etag = f"W/{tag}"
+        if status == 200 and tag in self.headers.get("If-None-Match", ""):
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("ETag", etag)
+        self.send_header("Vary", "Accept-Encoding")
+        if len(body) >= GZIP_MIN_BYTES and "gzip" in self.headers.get("Accept-Encoding", ""):
+            body = gzip.compress(body, compresslevel=5)
+            self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_server(host, port):
+    """Serve the read-only /jobs API from a daemon thread. Returns the server; call shutdown() to stop it."""
+    server = ThreadingHTTPServer((host, port), _Handler)
+    thread = threading.Thread(target=server.serve_forever, name="api-server", daemon=True)
+    thread.start()
+    logger.info(f"Job history API served at http://{host}:{server.server_address[1]}/jobs")
+    return server
@@ -0,0 +1,356 @@
+"""
+Synthetic LinkedIn pages and local stand-ins for the LinkedIn, Telegram Bot
+and Ollama APIs, so benchmarks and load tests run without touching the real
+services.
+"""
+import json
+import random
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+PAGE_SIZE = 25
+
+_TITLES = ["Software Engineer", "Backend Developer", "Data Engineer", "Platform Engineer",
+           "Machine Learning Engineer", "Site Reliability Engineer", "Frontend Developer"]
+_LEVELS = ["", "Senior ", "Staff ", "Junior ", "Lead "]
+_COMPANIES = ["Acme", "Globex", "Initech", "Umbrella", "Hooli", "Stark Industries", "Wayne Enterprises"]
+_LOCATIONS = ["Singapore", "Remote", "London, England, United Kingdom", "Bangalore, Karnataka, India"]
+
+
+def keyword_slot(keyword):
+    """Which block of a million job IDs a keyword's postings use."""
+    return zlib.crc32(keyword.encode("utf-8")) % 100_000
+
+
+def job_id_for(keyword, index):
+    """Stable numeric job ID of the index-th posting for a keyword."""
+    return str(10_000_000_000 + keyword_slot(keyword) * 1_000_000 + index)
+
+
+def job_card(keyword, index):
+    rng = random.Random(f"{keyword}-{index}")
+    title = f"{rng.choice(_LEVELS)}{keyword} {rng.choice(_TITLES)}"
+    company = f"{rng.choice(_COMPANIES)} {index % 97}"
+    job_id = job_id_for(keyword, index)
+    slug = title.lower().replace(" ", "-")
+    return f"""<li>
+<div class="base-card relative job-search-card" data-entity-urn="urn:li:jobPosting:{job_id}">
+  <a class="base-card__full-link" href="https://www.linkedin.com/jobs/view/{slug}-at-acme-{job_id}?refId=abc&amp;trackingId=xyz"><span class="sr-only">{title}</span></a>
+  <div class="base-search-card__info">
+    <h3 class="base-search-card__title">{title}</h3>
+    <h4 class="base-search-card__subtitle"><a class="hidden-nested-link" href="https://www.linkedin.com/company/x">{company}</a></h4>
+    <div class="base-search-card__metadata">
+      <span class="job-search-card__location">{rng.choice(_LOCATIONS)}</span>
+      <time class="job-search-card__listdate" datetime="2024-05-01">1 day ago</time>
+    </div>
+  </div>
+</div>
+</li>"""
+
+
+def search_page(keyword, indexes):
+    """A search-results fragment holding one card per posting index."""
+    cards = "\n".join(job_card(keyword, index) for index in indexes)
+    return f"<!DOCTYPE html><html><body><ul class=\"jobs-search__results-list\">\n{cards}\n</ul></body></html>"
+
+
+def detail_page(job_id):
+    return f"""<html><body>
+<div class="show-more-less-html__markup">Build and run services for job {job_id}.<br>Python, SQL, cloud.</div>
+<ul class="description__job-criteria-list">
+  <li class="description__job-criteria-item"><h3 class="description__job-criteria-subheader">Seniority level</h3>
+    <span class="description__job-criteria-text">Mid-Senior level</span></li>
+  <li class="description__job-criteria-item"><h3 class="description__job-criteria-subheader">Employment type</h3>
+    <span class="description__job-criteria-text">Full-time</span></li>
+</ul>
+<span class="posted-time-ago__text">2 hours ago</span>
+</body></html>"""
+
+
+class _Server:
+    """ThreadingHTTPServer on a free local port, served from a daemon thread."""
+
+    handler = None
+
+    def start(self):
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), self.handler)
+        self.httpd.fake = self
+        self.httpd.daemon_threads = True
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+        return self
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.httpd.server_address[1]}"
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+        return False
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out in separate writes; with Nagle on, keep-alive
+    # clients wait out a delayed ACK (~40 ms) on every response
+    disable_nagle_algorithm = True
+
+    def _reply(self, status, body, content_type="text/html; charset=utf-8", headers=()):
+        data = body.encode("utf-8") if isinstance(body, str) else body
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in headers:
+            self.send_header(name, value)
+        self.end_headers()
+        try:
+            self.wfile.write(data)
+        except (BrokenPipeError, ConnectionResetError):
+            # The client gave up (timeout, shutdown mid long-poll)
+            pass
+
+    def log_message(self, format, *args):
+        pass
+
+
+class _LinkedInHandler(_Handler):
+    def do_GET(self):
+        fake = self.server.fake
+        status = fake.admit()
+        if fake.latency:
+            time.sleep(fake.latency)
+        if status != 200:
+            headers = [("Retry-After", "1")] if status == 429 else []
+            self._reply(status, "", headers=headers)
+            return
+
+        url = urlparse(self.path)
+        if url.path.startswith("/jobs/view/"):
+            self._reply(200, detail_page(url.path.rstrip("/").rsplit("/", 1)[-1]))
+            return
+        if url.path != "/jobs/search":
+            self._reply(404, "")
+            return
+
+        query = parse_qs(url.query)
+        keyword = query.get("keywords", [""])[0]
+        start = int(query.get("start", ["0"])[0])
+        self._reply(200, search_page(keyword, fake.page_indexes(keyword, start)))
+
+
+class FakeLinkedIn(_Server):
+    """
+    Serves /jobs/search and /jobs/view/<id> with synthetic postings.
+
+    Each keyword has jobs_per_keyword postings, newest first. With
+    postings_per_hour set, new postings keep appearing at the top of page 0
+    at that rate per keyword; posted_at() says when a given job appeared.
+    Responses can be slowed (latency), fail at random (error_rate, HTTP 500)
+    or be rate limited (HTTP 429 above max_rps requests per second).
+    """
+
+    handler = _LinkedInHandler
+
+    def __init__(self, jobs_per_keyword=100, postings_per_hour=0.0, latency=0.0,
+                 error_rate=0.0, max_rps=0.0, seed=0):
+        self.jobs_per_keyword = jobs_per_keyword
+        self.postings_per_hour = postings_per_hour
+        self.latency = latency
+        self.error_rate = error_rate
+        self.max_rps = max_rps
+        self.started = time.time()
+        self.requests = 0
+        self.statuses = {}
+        self._rng = random.Random(seed)
+        self._window = []
+        self._lock = threading.Lock()
+
+    def _newest(self):
+        elapsed = time.time() - self.started
+        return self.jobs_per_keyword + int(elapsed * self.postings_per_hour / 3600)
+
+    def page_indexes(self, keyword, start):
+        newest = self._newest()
+        # Postings 1..newest exist; page 0 starts at the newest
+        return range(newest - start, max(newest - start - PAGE_SIZE, 0), -1)
+
+    def posted_at(self, job_id):
+        """Wall-clock time a posting appeared (server start for the initial ones)."""
+        index = int(job_id) % 1_000_000
+        if index <= self.jobs_per_keyword or not self.postings_per_hour:
+            return self.started
+        return self.started + (index - self.jobs_per_keyword) * 3600 / self.postings_per_hour
+
+    def admit(self):
+        with self._lock:
+            self.requests += 1
+            now = time.monotonic()
+            status = 200
+            if self.max_rps:
+                self._window = [t for t in self._window if now - t < 1.0]
+                if len(self._window) >= self.max_rps:
+                    status = 429
+                else:
+                    self._window.append(now)
+            if status == 200 and self._rng.random() < self.error_rate:
+                status = 500
+            self.statuses[status] = self.statuses.get(status, 0) + 1
+            return status
+
+
+class _TelegramHandler(_Handler):
+    def do_POST(self):
+        fake = self.server.fake
+        length = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(length).decode("utf-8", "replace")
+        if "json" in (self.headers.get("Content-Type") or ""):
+            params = json.loads(raw or "{}")
+        else:
+            params = {key: values[0] for key, values in parse_qs(raw).items()}
+
+        method = self.path.rstrip("/").rsplit("/", 1)[-1]
+        if fake.latency:
+            time.sleep(fake.latency)
+        result = fake.call(method, params)
+        if result is None:
+            body = {"ok": False, "error_code": 429, "description": "Too Many Requests: retry after 1",
+                    "parameters": {"retry_after": 1}}
+            self._reply(429, json.dumps(body), "application/json")
+            return
+        self._reply(200, json.dumps({"ok": True, "result": result}), "application/json")
+
+    do_GET = do_POST
+
+
+class FakeTelegram(_Server):
+    """
+    Minimal Bot API: getMe, getUpdates, sendMessage and the other calls the
+    bot makes on startup and shutdown. send_command() queues a user message
+    for getUpdates to deliver. Sent messages are kept in `messages` as
+    (received_at, chat_id, text). With error_rate set, that share of
+    sendMessage calls is answered with 429 Too Many Requests.
+    """
+
+    handler = _TelegramHandler
+
+    def __init__(self, latency=0.0, error_rate=0.0, seed=0):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.messages = []
+        self.failed = 0
+        self._updates = []
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def send_command(self, text, chat_id):
+        """Queue a message from a user in chat_id, as the bot will receive it from getUpdates."""
+        with self._lock:
+            update_id = len(self._updates) + 1
+            command = text.split()[0] if text.startswith("/") else ""
+            self._updates.append({
+                "update_id": update_id,
+                "message": {
+                    "message_id": update_id,
+                    "date": int(time.time()),
+                    "chat": {"id": int(chat_id), "type": "private"},
+                    "from": {"id": int(chat_id), "is_bot": False, "first_name": "User"},
+                    "text": text,
+                    "entities": [{"type": "bot_command", "offset": 0, "length": len(command)}] if command else [],
+                },
+            })
+
+    def _pending_updates(self, offset):
+        with self._lock:
+            return [update for update in self._updates if update["update_id"] >= offset]
+
+    def call(self, method, params):
+        if method == "getMe":
+            return {"id": 1, "is_bot": True, "first_name": "Radar", "username": "radar_bench_bot"}
+        if method == "getUpdates":
+            offset = int(params.get("offset") or 0)
+            # Long polling: hold the request briefly so the poller doesn't spin
+            deadline = time.monotonic() + min(float(params.get("timeout") or 0), 0.5)
+            while not self._pending_updates(offset) and time.monotonic() < deadline:
+                time.sleep(0.01)
+            return self._pending_updates(offset)
+        if method in ("sendMessage", "sendDocument"):
+            with self._lock:
+                if self._rng.random() < self.error_rate:
+                    self.failed += 1
+                    return None
+                self.messages.append((time.time(), str(params.get("chat_id")), params.get("text", "")))
+                message_id = len(self.messages)
+            return {
+                "message_id": message_id,
+                "date": int(time.time()),
+                "chat": {"id": int(params.get("chat_id") or 0), "type": "private"},
+                "text": params.get("text", ""),
+            }
+        # deleteWebhook, setMyCommands, close, ...
+        return True
+
+
+class _OllamaHandler(_Handler):
+    def do_POST(self):
+        fake = self.server.fake
+        length = int(self.headers.get("Content-Length") or 0)
+        request = json.loads(self.rfile.read(length) or b"{}")
+        if fake.latency:
+            time.sleep(fake.latency)
+        if self.path != "/api/chat":
+            self._reply(404, json.dumps({"error": "not found"}), "application/json")
+            return
+
+        prompt = request["messages"][-1]["content"]
+        content = fake.answer(prompt)
+        if content is None:
+            self._reply(500, json.dumps({"error": "model overloaded"}), "application/json")
+            return
+        self._reply(200, json.dumps({
+            "model": request.get("model", ""),
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "message": {"role": "assistant", "content": content},
+            "done": True,
+        }), "application/json")
+
+
+class FakeOllama(_Server):
+    """
+    Answers /api/chat like a local model: triage prompts get a verdict per
+    job (fit for fit_rate of them), anything else a small resume profile.
+    error_rate of calls fail with HTTP 500.
+    """
+
+    handler = _OllamaHandler
+
+    def __init__(self, latency=0.0, fit_rate=0.5, error_rate=0.0, seed=0):
+        self.latency = latency
+        self.fit_rate = fit_rate
+        self.error_rate = error_rate
+        self.calls = 0
+        self.failed = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def answer(self, prompt):
+        with self._lock:
+            self.calls += 1
+            if self._rng.random() < self.error_rate:
+                self.failed += 1
+                return None
+            if "Jobs:\n" in prompt:
+                jobs = json.loads(prompt.split("Jobs:\n", 1)[1].rsplit("\n\nRespond ONLY", 1)[0])
+                return json.dumps([
+                    {"job_id": job["job_id"], "fit": self._rng.random() < self.fit_rate, "reason": "benchmark"}
+                    for job in jobs
+                ])
+        return json.dumps({"profile": "Backend engineer, Python and SQL.", "keywords": ["Python Developer"]})
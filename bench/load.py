@@ -0,0 +1,216 @@
+"""
+End-to-end load test.
+
+Runs main.main() — scheduler, scans, bot — for a fixed time against local
+LinkedIn, Telegram Bot API and Ollama stand-ins (bench/fakes.py), then
+stops it with SIGINT like a real shutdown and reports throughput, alert
+latency percentiles, peak memory and error counts.
+
+    python -m bench.load --keywords 50 --postings-per-hour 3000 --duration 300
+    python -m bench.load --linkedin-latency 0.8 --linkedin-error-rate 0.05 --linkedin-max-rps 2
+    python -m bench.load --triage --ollama-latency 2 --telegram-error-rate 0.02
+
+Run it as its own process: the Ollama client reads OLLAMA_HOST when
+`ollama` is first imported, so nothing that imports it may load earlier.
+"""
+import argparse
+import asyncio
+import json
+import os
+import re
+import resource
+import signal
+import sys
+import tempfile
+import time
+
+import config
+from bench import fakes
+
+_ROLES = ["Python Developer", "Backend Engineer", "Data Engineer", "Platform Engineer", "SRE",
+          "Go Developer", "ML Engineer", "Frontend Engineer", "DevOps Engineer", "Java Developer"]
+_LEVELS = ["", "Senior ", "Staff ", "Lead ", "Principal "]
+
+_JOB_URL = re.compile(r"/jobs/view/[^)\s]*?(\d{8,})")
+
+
+def _keywords(count):
+    """count keyword names whose synthetic job IDs don't collide."""
+    names, slots = [], set()
+    for level in _LEVELS:
+        for role in _ROLES:
+            for suffix in ("", " II", " III", " Remote"):
+                name = f"{level}{role}{suffix}"
+                if fakes.keyword_slot(name) not in slots:
+                    slots.add(fakes.keyword_slot(name))
+                    names.append(name)
+                if len(names) == count:
+                    return names
+    raise ValueError(f"At most {len(names)} distinct keywords are available")
+
+
+def _set(name, value):
+    """Set a config value here and in the environment, so spawned scrape workers see it too."""
+    setattr(config, name, value)
+    os.environ[name] = str(value).lower() if isinstance(value, bool) else str(value)
+
+
+def percentiles(values, points=(50, 90, 99)):
+    if not values:
+        return {f"p{point}": None for point in points}
+    ordered = sorted(values)
+    return {
+        f"p{point}": ordered[min(len(ordered) - 1, int(round(point / 100 * (len(ordered) - 1))))]
+        for point in points
+    }
+
+
+def _max_rss_mb():
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return {"process": round(own / 1024, 1), "children": round(children / 1024, 1)}
+
+
+def run(args):
+    keywords = _keywords(args.keywords)
+    linkedin = fakes.FakeLinkedIn(
+        jobs_per_keyword=args.backlog,
+        postings_per_hour=args.postings_per_hour / len(keywords),
+        latency=args.linkedin_latency,
+        error_rate=args.linkedin_error_rate,
+        max_rps=args.linkedin_max_rps,
+    ).start()
+    bot_api = fakes.FakeTelegram(latency=args.telegram_latency, error_rate=args.telegram_error_rate).start()
+    model = fakes.FakeOllama(latency=args.ollama_latency, error_rate=args.ollama_error_rate).start()
+    os.environ["OLLAMA_HOST"] = model.url
+    workdir = tempfile.mkdtemp(prefix="radar-load-")
+
+    _set("DB_PATH", os.path.join(workdir, "load.db"))
+    _set("LINKEDIN_URL", linkedin.url)
+    _set("TELEGRAM_API_URL", f"{bot_api.url}/bot")
+    _set("TELEGRAM_BOT_TOKEN", "1:load")
+    _set("TELEGRAM_CHAT_ID", "1")
+    _set("INSTANCE_ID", "load")
+    _set("REQUEST_INTERVAL_SECONDS", args.request_interval)
+    _set("SCAN_REQUEST_BUDGET", args.budget)
+    _set("SCAN_TICK_MINUTES", args.tick / 60)
+    _set("SCAN_MIN_INTERVAL_MINUTES", args.tick / 60)
+    # Only the bot process schedules; workers would choke on a float here
+    config.SCRAPE_INTERVAL_MINUTES = args.tick / 60
+    _set("STARTUP_JITTER_SECONDS", 0.0)
+    _set("TRIAGE_ENABLED", args.triage)
+    _set("FETCH_JOB_DETAILS", args.details)
+    _set("SCRAPE_WORKERS", args.workers)
+    config.TELEGRAM_EXTRA_CHAT_IDS = []
+
+    # Imported only now: the Ollama client and the rate limiter read their settings on import
+    import db
+    import main
+    import metrics
+
+    db.init_db()
+    db.save_profile("load test", "Backend engineer, Python and SQL.", ",".join(keywords))
+    db.set_setting("keywords", ",".join(keywords))
+    db.set_setting("location", "Singapore")
+
+    async def drive():
+        # main() installs its SIGINT handler once the bot is up; this stops it like Ctrl-C would
+        asyncio.get_running_loop().call_later(args.duration, os.kill, os.getpid(), signal.SIGINT)
+        await main.main()
+
+    started = time.time()
+    asyncio.run(drive())
+    elapsed = time.time() - started
+
+    latencies = []
+    alerts = 0
+    for received_at, chat_id, text in bot_api.messages:
+        match = _JOB_URL.search(text or "")
+        if not match:
+            continue
+        alerts += 1
+        posted_at = linkedin.posted_at(match.group(1))
+        if posted_at > linkedin.started:
+            latencies.append(received_at - posted_at)
+
+    for server in (linkedin, bot_api, model):
+        server.stop()
+
+    posted = int(elapsed * args.postings_per_hour / 3600)
+    return {
+        "config": vars(args),
+        "duration_seconds": round(elapsed, 1),
+        "linkedin": {
+            "requests": linkedin.requests,
+            "requests_per_second": round(linkedin.requests / elapsed, 2),
+            "statuses": {str(status): count for status, count in sorted(linkedin.statuses.items())},
+        },
+        "postings": {"backlog": args.backlog * len(keywords), "posted_during_run": posted},
+        "alerts": {
+            "sent": alerts,
+            "per_second": round(alerts / elapsed, 2),
+            "of_new_postings": len(latencies),
+            "latency_seconds": {
+                key: None if value is None else round(value, 2)
+                for key, value in {**percentiles(latencies), "max": max(latencies, default=None)}.items()
+            },
+        },
+        "errors": {
+            "linkedin_non_200": sum(count for status, count in linkedin.statuses.items() if status != 200),
+            "telegram_rejected": bot_api.failed,
+            "telegram_send_failures": int(metrics.TELEGRAM_SEND_FAILURES.value()),
+            "ollama_failed": model.failed,
+        },
+        "ollama_calls": model.calls,
+        "max_rss_mb": _max_rss_mb(),
+    }
+
+
+def _print_report(report):
+    latency = report["alerts"]["latency_seconds"]
+    print(f"\nLoad test: {report['config']['keywords']} keywords, {report['duration_seconds']}s")
+    print(f"  LinkedIn requests   {report['linkedin']['requests']} ({report['linkedin']['requests_per_second']}/s) "
+          f"statuses {report['linkedin']['statuses']}")
+    print(f"  Postings            {report['postings']['backlog']} backlog, "
+          f"{report['postings']['posted_during_run']} posted during the run")
+    print(f"  Alerts sent         {report['alerts']['sent']} ({report['alerts']['per_second']}/s), "
+          f"{report['alerts']['of_new_postings']} for postings made during the run")
+    print(f"  Alert latency (s)   p50 {latency['p50']}  p90 {latency['p90']}  p99 {latency['p99']}  max {latency['max']}")
+    print(f"  Errors              {report['errors']}")
+    print(f"  Ollama calls        {report['ollama_calls']}")
+    print(f"  Peak RSS (MB)       {report['max_rss_mb']}")
+
+
+def main_cli(argv=None):
+    parser = argparse.ArgumentParser(description="Load-test the radar against local stand-ins.")
+    parser.add_argument("--duration", type=float, default=120, help="seconds to run")
+    parser.add_argument("--keywords", type=int, default=50)
+    parser.add_argument("--backlog", type=int, default=100, help="postings per keyword at start")
+    parser.add_argument("--postings-per-hour", type=float, default=3000, help="new postings per hour, all keywords")
+    parser.add_argument("--tick", type=float, default=15, help="scheduler tick in seconds")
+    parser.add_argument("--budget", type=int, default=60, help="page fetches per scan")
+    parser.add_argument("--request-interval", type=float, default=0.1, help="seconds between LinkedIn requests")
+    parser.add_argument("--workers", type=int, default=0, help="scrape worker processes")
+    parser.add_argument("--triage", action="store_true", help="screen jobs with the (fake) Ollama")
+    parser.add_argument("--details", action="store_true", help="fetch job detail pages")
+    parser.add_argument("--linkedin-latency", type=float, default=0.0)
+    parser.add_argument("--linkedin-error-rate", type=float, default=0.0, help="share of HTTP 500s")
+    parser.add_argument("--linkedin-max-rps", type=float, default=0.0, help="429 above this rate (0 = never)")
+    parser.add_argument("--telegram-latency", type=float, default=0.0)
+    parser.add_argument("--telegram-error-rate", type=float, default=0.0, help="share of 429s on sendMessage")
+    parser.add_argument("--ollama-latency", type=float, default=0.0)
+    parser.add_argument("--ollama-error-rate", type=float, default=0.0)
+    parser.add_argument("--output", help="write the report as JSON here")
+    args = parser.parse_args(argv)
+
+    report = run(args)
+    _print_report(report)
+    if args.output:
+        os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main_cli())
@@ -0,0 +1,141 @@
+"""
+Memory held per scraped job and allocated per search.
+
+Parses synthetic search pages (bench/fakes.py) under tracemalloc and
+reports what the resulting jobs keep alive, both as Job records and as the
+plain dicts the pipeline used to pass around, plus the peak and retained
+memory of a whole multi-keyword search_jobs run. Nothing leaves the machine.
+
+    python -m bench.memory                 # 1000 cards, 3 keywords x 200 postings
+    python -m bench.memory --cards 10000 --postings 1000
+"""
+import argparse
+import contextlib
+import gc
+import io
+import os
+import tempfile
+import tracemalloc
+
+from bs4 import BeautifulSoup
+
+import config
+import db
+import scraper
+from bench import fakes
+
+KEYWORDS = ["Python", "Go", "Rust"]
+
+
+def traced(build):
+    """Run build() under tracemalloc. Returns (its result, bytes still held, blocks still held, peak bytes)."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        value = build()
+        gc.collect()
+        current, peak = tracemalloc.get_traced_memory()
+        blocks = sum(stat.count for stat in tracemalloc.take_snapshot().statistics("filename"))
+    finally:
+        tracemalloc.stop()
+    return value, current, blocks, peak
+
+
+def _parse(li, html, keyword):
+    cards = BeautifulSoup(html, "html.parser").find_all("div", class_="base-card")
+    jobs = [li._parse_job_card(card) for card in cards]
+    for job in jobs:
+        job.keyword = keyword
+    return jobs
+
+
+def _as_dict(job):
+    """A job the way it used to travel: a dict with its own copy of every string."""
+    return {
+        "job_id": job.job_id, "title": job.title,
+        "company": job.company.encode().decode(), "location": job.location.encode().decode(),
+        "url": job.url, "keyword": job.keyword.encode().decode(), "posted_at": job.posted_at,
+    }
+
+
+def job_footprint(count=1000):
+    """Bytes and allocator blocks each parsed job keeps alive, as a Job and as a dict."""
+    li = scraper.LinkedInJobScraper()
+    html = fakes.search_page("Python", range(count, 0, -1))
+    _parse(li, fakes.search_page("Python", range(1, 3)), "Python")  # warm caches and lazy imports
+
+    jobs, job_bytes, job_blocks, _ = traced(lambda: _parse(li, html, "Python"))
+    dicts, dict_bytes, dict_blocks, _ = traced(lambda: [_as_dict(job) for job in _parse(li, html, "Python")])
+    return {
+        "jobs": len(jobs),
+        "job": {"bytes": job_bytes / len(jobs), "blocks": job_blocks / len(jobs)},
+        "dict": {"bytes": dict_bytes / len(dicts), "blocks": dict_blocks / len(dicts)},
+    }
+
+
+class _Page:
+    def __init__(self, text):
+        self.text = text
+        self.status_code = 200
+
+    def raise_for_status(self):
+        pass
+
+
+def search_allocations(postings=200, keywords=KEYWORDS):
+    """Peak and retained memory of one search_jobs run over pre-rendered pages."""
+    pages = {}
+    for keyword in keywords:
+        for start in range(0, postings, fakes.PAGE_SIZE):
+            indexes = range(postings - start, max(postings - start - fakes.PAGE_SIZE, 0), -1)
+            pages[(keyword, start)] = fakes.search_page(keyword, indexes)
+
+    li = scraper.LinkedInJobScraper()
+
+    def get(kind, url, pace=0.0, params=None):
+        html = pages.get((params["keywords"], params["start"]))
+        return _Page(html or "<html><body></body></html>")
+
+    li._get = get
+    budget = len(pages) + len(keywords)
+    li.search_jobs(keywords[:1], "Singapore", budget=2)  # warm caches and lazy imports
+
+    jobs, held, blocks, peak = traced(lambda: li.search_jobs(keywords, "Singapore", budget=budget))
+    return {
+        "jobs": len(jobs),
+        "pages": len(pages),
+        "peak_bytes": peak,
+        "held_bytes": held,
+        "held_blocks": blocks,
+        "held_bytes_per_job": held / len(jobs) if jobs else 0,
+    }
+
+
+def main_cli(argv=None):
+    parser = argparse.ArgumentParser(description="Memory per job and per search for the job radar.")
+    parser.add_argument("--cards", type=int, default=1000, help="cards parsed for the per-job footprint")
+    parser.add_argument("--postings", type=int, default=200, help="postings per keyword in the search run")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        config.DB_PATH = os.path.join(workdir, "memory.db")
+        config.LINKEDIN_URL = "http://127.0.0.1:9"
+        scraper.rate_limiter.min_interval = 0
+        scraper.rate_limiter.jitter = 0
+        db.init_db()
+        with contextlib.redirect_stdout(io.StringIO()):
+            footprint = job_footprint(args.cards)
+            search = search_allocations(args.postings)
+
+    print(f"Per job ({footprint['jobs']} parsed cards):")
+    for kind in ("job", "dict"):
+        print(f"  {kind:5} {footprint[kind]['bytes']:8.0f} bytes  {footprint[kind]['blocks']:5.1f} blocks")
+    print(f"search_jobs, {len(KEYWORDS)} keywords x {args.postings} postings ({search['pages']} pages):")
+    print(f"  peak {search['peak_bytes'] / 1024:.0f} KiB, "
+          f"held {search['held_bytes'] / 1024:.0f} KiB in {search['held_blocks']} blocks "
+          f"({search['held_bytes_per_job']:.0f} bytes/job)")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main_cli())
@@ -0,0 +1,398 @@
+"""
+Offline benchmark suite.
+
+Measures card parsing on synthetic search pages (25 to 10,000 cards),
+_extract_job_id, db.py operations on a seeded database, message
+formatting, and a full main.run_job_scan against local LinkedIn and
+Telegram stand-ins (bench/fakes.py). Nothing leaves the machine.
+
+    python -m bench.run                       # full run, results to data/benchmarks/
+    python -m bench.run --quick               # smaller sizes, fewer repeats
+    python -m bench.run --baseline data/benchmarks/old.json --threshold 0.25
+    python -m bench.run --archive data/http-archive   # also replay recorded LinkedIn pages
+
+With --baseline, exits 1 if any benchmark got slower than the baseline by
+more than the threshold (0.25 = 25%).
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from urllib.parse import parse_qsl, urlsplit
+
+from bs4 import BeautifulSoup
+
+import config
+import db
+import dedup
+import main
+import scraper
+import telegram_bot
+import transport
+from bench import fakes
+from models import Job
+
+BENCHMARKS = []
+
+
+def benchmark(name):
+    """Register fn(ctx) as a benchmark. It returns a zero-arg callable and the calls it makes per run."""
+    def decorator(fn):
+        BENCHMARKS.append((name, fn))
+        return fn
+    return decorator
+
+
+def measure(run, repeat, calls=1):
+    """Median and best seconds per call over repeat runs."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        times.append((time.perf_counter() - start) / calls)
+    return {"seconds": statistics.median(times), "min": min(times), "repeat": repeat, "calls": calls}
+
+
+class Context:
+    def __init__(self, quick, workdir):
+        self.quick = quick
+        self.workdir = workdir
+        self.sizes = [25, 100, 1000] if quick else [25, 100, 1000, 10000]
+        self.table_size = 2000 if quick else 20000
+        self.repeat = 3 if quick else 7
+
+    def fresh_db(self, name):
+        config.DB_PATH = os.path.join(self.workdir, f"{name}.db")
+        if os.path.exists(config.DB_PATH):
+            os.remove(config.DB_PATH)
+        db.init_db()
+
+
+def _configure(workdir):
+    """Point every upstream at nothing real and take pacing out of the measurements."""
+    config.DB_PATH = os.path.join(workdir, "bench.db")
+    config.TELEGRAM_BOT_TOKEN = "1:bench"
+    config.TELEGRAM_CHAT_ID = "1"
+    config.TELEGRAM_EXTRA_CHAT_IDS = []
+    config.INSTANCE_ID = "bench"
+    config.SCAN_SPREAD_FRACTION = 0
+    config.FETCH_JOB_DETAILS = False
+    config.TRIAGE_ENABLED = False
+    config.SCRAPE_WORKERS = 0
+    config.TRACING = False
+    scraper.rate_limiter.min_interval = 0
+    scraper.rate_limiter.jitter = 0
+    logging.getLogger().setLevel(logging.WARNING)
+
+
+def _seed_jobs(count, keyword="Python"):
+    """Store count synthetic jobs (with fingerprints) the way a long-running radar would have them."""
+    rows = []
+    for index in range(1, count + 1):
+        card = BeautifulSoup(fakes.job_card(keyword, index), "html.parser")
+        title = card.find("h3").get_text(strip=True)
+        company = card.find("h4").get_text(strip=True)
+        status = ("pending", "viewed", "ignored")[index % 3]
+        rows.append((fakes.job_id_for(keyword, index), title, company, "Singapore",
+                     f"https://www.linkedin.com/jobs/view/{index}", status, keyword))
+    # One transaction instead of a connection per insert_job; same triggers and indexes
+    conn = db._get_conn()
+    conn.executemany(
+        "INSERT OR IGNORE INTO jobs (job_id, title, company, location, url, status, keyword) VALUES (?, ?, ?, ?, ?, ?, ?)",
+        rows,
+    )
+    conn.commit()
+    conn.close()
+    dedup.backfill_fingerprints()
+    return [row[0] for row in rows]
+
+
+# --- Parsing ---
+
+def _parse_cards(li, html):
+    soup = BeautifulSoup(html, "html.parser")
+    cards = soup.find_all("div", class_="base-card") or soup.find_all("div", class_="job-search-card")
+    return [li._parse_job_card(card) for card in cards]
+
+
+def _register_parse(size):
+    @benchmark(f"parse.cards[{size}]")
+    def parse_cards(ctx):
+        if size not in ctx.sizes:
+            return None
+        ctx.fresh_db("parse")
+        html = fakes.search_page("Python", range(size, 0, -1))
+        li = scraper.LinkedInJobScraper()
+        return (lambda: _parse_cards(li, html)), 1
+
+    @benchmark(f"scraper.search_single_keyword[{size}]")
+    def search_single_keyword(ctx):
+        if size not in ctx.sizes:
+            return None
+        ctx.fresh_db("search")
+        linkedin = fakes.FakeLinkedIn(jobs_per_keyword=size).start()
+        ctx.cleanup.append(linkedin.stop)
+        config.LINKEDIN_URL = linkedin.url
+        li = scraper.LinkedInJobScraper()
+        return (lambda: li._search_single_keyword("Python", "Singapore", "r604800", size)), 1
+
+
+for _size in (25, 100, 1000, 10000):
+    _register_parse(_size)
+
+
+@benchmark("scraper.extract_job_id")
+def extract_job_id(ctx):
+    li = scraper.LinkedInJobScraper()
+    urls = []
+    for index in range(1000):
+        job_id = fakes.job_id_for("Python", index)
+        urls += [
+            f"https://www.linkedin.com/jobs/view/{job_id}",
+            f"https://www.linkedin.com/jobs/view/senior-python-engineer-at-acme-{job_id}?refId=x",
+            f"https://www.linkedin.com/jobs/search?currentJobId={job_id}",
+            f"https://example.com/postings/{job_id}/",
+        ]
+    return (lambda: [li._extract_job_id(url) for url in urls]), len(urls)
+
+
+# --- Database, at ctx.table_size stored jobs ---
+
+def _db_operations(job_ids):
+    """(name, callable) pairs covering db.py's scan and bot paths."""
+    batch = job_ids[:500]
+    counter = iter(range(10**9))
+    job = {"job_id": batch[0], "title": "Python Software Engineer", "company": "Acme 1", "location": "Singapore"}
+    bands = dedup.bands(dedup.simhash(job))
+    return [
+        ("job_exists", lambda: db.job_exists(batch[0])),
+        ("insert_job", lambda: db.insert_job(f"new-{next(counter)}", "Python Dev", "Acme", "SG", "https://x", keyword="Python")),
+        ("get_known_job_ids", lambda: db.get_known_job_ids(batch)),
+        ("get_job_statuses", lambda: db.get_job_statuses(batch)),
+        ("update_job_status", lambda: db.update_job_status(batch[1], "viewed")),
+        ("claim_job_alert", lambda: db.claim_job_alert(batch[2], time.time(), 0)),
+        ("find_fingerprint_candidates", lambda: db.find_fingerprint_candidates(bands, batch[0])),
+        ("save_fingerprints", lambda: db.save_fingerprints([(f"fp-{next(counter)}", 1, (1, 2, 3, 4))])),
+        ("get_job_details", lambda: db.get_job_details(batch[:100])),
+        ("save_job_details", lambda: db.save_job_details(batch[3], "Build services.", "Mid-Senior level", "Full-time")),
+        ("get_verdicts", lambda: db.get_verdicts(batch[:100])),
+        ("save_verdicts", lambda: db.save_verdicts([(batch[4], True, "fits")])),
+        ("search_jobs", lambda: db.search_jobs("engineer")),
+        ("list_jobs", lambda: db.list_jobs(limit=100)),
+        ("list_jobs_by_status", lambda: db.list_jobs(status="viewed", limit=100)),
+        ("get_stats", lambda: db.get_stats(days=7, top=5)),
+        ("get_setting", lambda: db.get_setting("keywords")),
+        ("set_setting", lambda: db.set_setting("keywords", "Python,Go")),
+        ("get_profile", lambda: db.get_profile()),
+        ("get_query_schedules", lambda: db.get_query_schedules("Singapore")),
+        ("get_allocator_stats", lambda: db.get_allocator_stats("Singapore")),
+    ]
+
+
+def _register_db(name, index):
+    @benchmark(f"db.{name}")
+    def db_operation(ctx):
+        if ctx.seeded is None:
+            ctx.fresh_db("tables")
+            ctx.seeded = _db_operations(_seed_jobs(ctx.table_size))
+        config.DB_PATH = os.path.join(ctx.workdir, "tables.db")
+        return ctx.seeded[index][1], 1
+
+
+for _index, (_name, _) in enumerate(_db_operations(["0"] * 5)):
+    _register_db(_name, _index)
+
+
+# --- Telegram message formatting ---
+
+@benchmark("telegram.build_message")
+def build_message(ctx):
+    jobs = [
+        Job(str(i), f"Sr. C++ Engineer (Backend) #{i}", "Acme [Asia] Pte. Ltd.",
+            "Singapore", f"https://www.linkedin.com/jobs/view/{i}")
+        for i in range(1000)
+    ]
+    return (lambda: [telegram_bot._build_message(job) for job in jobs]), len(jobs)
+
+
+@benchmark("telegram.escape_md")
+def escape_md(ctx):
+    texts = [f"Sr. C++/C# Engineer - Backend (Payments) [{i}] {{remote}}!" for i in range(1000)]
+    return (lambda: [telegram_bot._escape_md(text) for text in texts]), len(texts)
+
+
+# --- Full scan against the stand-ins ---
+
+@benchmark("scan.run_job_scan")
+def run_job_scan(ctx):
+    linkedin = fakes.FakeLinkedIn(jobs_per_keyword=200).start()
+    bot_api = fakes.FakeTelegram().start()
+    ctx.cleanup += [linkedin.stop, bot_api.stop]
+    config.LINKEDIN_URL = linkedin.url
+    config.TELEGRAM_API_URL = f"{bot_api.url}/bot"
+
+    async def scan_once():
+        # Every run starts from an empty database so every posting is new
+        ctx.fresh_db("scan")
+        db.set_setting("keywords", "Python,Go,Rust")
+        db.set_setting("location", "Singapore")
+        db.set_setting("timeframe", "r604800")
+        application = telegram_bot.create_application()
+        async with application:
+            start = time.perf_counter()
+            await main.run_job_scan(application)
+            return time.perf_counter() - start
+
+    def run():
+        return asyncio.run(scan_once())
+
+    return run, None
+
+
+def _register_replay(archive_path):
+    """Time fetching and parsing every recorded search page, replayed with no delay."""
+    searches = [
+        entry for entry in transport.get_archive(archive_path).entries()
+        if entry["url"].split("?", 1)[0].endswith("/jobs/search") and not entry["error"]
+    ]
+    if not searches:
+        raise ValueError(f"No search pages recorded in {archive_path}")
+
+    @benchmark("replay.fetch_page")
+    def replay(ctx):
+        ctx.fresh_db("replay")
+        parts = urlsplit(searches[0]["url"])
+        config.LINKEDIN_URL = f"{parts.scheme}://{parts.netloc}"
+        config.HTTP_REPLAY_DIR = archive_path
+        config.HTTP_REPLAY_TIMING = "none"
+        ctx.cleanup.append(lambda: setattr(config, "HTTP_REPLAY_DIR", ""))
+        li = scraper.LinkedInJobScraper()
+        pages = []
+        for entry in searches:
+            query = dict(parse_qsl(urlsplit(entry["url"]).query))
+            pages.append((query.get("keywords", ""), query.get("location", ""), query.get("f_TPR", ""),
+                          int(query.get("start", 0)) // fakes.PAGE_SIZE))
+
+        def run():
+            # Start each run at the first recording of every URL
+            transport.get_archive(archive_path).rewind()
+            for page in pages:
+                li._fetch_page(*page)
+
+        return run, len(pages)
+
+
+def run_all(quick=False, only=None):
+    results = {}
+    with tempfile.TemporaryDirectory() as workdir:
+        _configure(workdir)
+        ctx = Context(quick, workdir)
+        ctx.seeded = None
+        for name, setup in BENCHMARKS:
+            if only and not any(part in name for part in only):
+                continue
+            ctx.cleanup = []
+            try:
+                with contextlib.redirect_stdout(io.StringIO()):
+                    prepared = setup(ctx)
+                    if prepared is None:
+                        continue
+                    run, calls = prepared
+                    if calls is None:
+                        # The callable times itself, leaving out per-run setup
+                        times = [run() for _ in range(max(ctx.repeat // 2, 1))]
+                        result = {"seconds": statistics.median(times), "min": min(times), "repeat": len(times), "calls": 1}
+                    else:
+                        run()  # warm-up
+                        result = measure(run, ctx.repeat, calls)
+            finally:
+                for stop in ctx.cleanup:
+                    stop()
+            results[name] = result
+            print(f"{name:45} {_format_seconds(result['seconds']):>10}/call  (best {_format_seconds(result['min'])})")
+    return results
+
+
+def _format_seconds(seconds):
+    for unit, scale in (("s", 1), ("ms", 1e-3), ("us", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.2f}{unit}"
+    return f"{seconds / 1e-9:.0f}ns"
+
+
+def _git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def compare(results, baseline, threshold):
+    """Benchmarks slower than baseline by more than threshold: [(name, old, new, ratio)]."""
+    regressions = []
+    for name, result in results.items():
+        old = baseline.get(name)
+        if not old or not old["seconds"]:
+            continue
+        ratio = result["seconds"] / old["seconds"]
+        if ratio > 1 + threshold:
+            regressions.append((name, old["seconds"], result["seconds"], ratio))
+    return regressions
+
+
+def main_cli(argv=None):
+    parser = argparse.ArgumentParser(description="Offline benchmarks for the job radar.")
+    parser.add_argument("--quick", action="store_true", help="smaller inputs and fewer repeats")
+    parser.add_argument("--only", nargs="*", help="run benchmarks whose name contains any of these")
+    parser.add_argument("--output", help="results JSON path (default: data/benchmarks/<timestamp>.json)")
+    parser.add_argument("--baseline", help="results JSON to compare against")
+    parser.add_argument("--archive", help="HTTP archive (HTTP_RECORD_DIR) whose search pages to replay")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed slowdown vs baseline (0.25 = 25%%)")
+    args = parser.parse_args(argv)
+
+    if args.archive:
+        _register_replay(args.archive)
+    started = datetime.utcnow().replace(microsecond=0)
+    results = run_all(quick=args.quick, only=args.only)
+
+    output = args.output or os.path.join("data", "benchmarks", f"{started:%Y%m%dT%H%M%S}.json")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w") as f:
+        json.dump({
+            "meta": {
+                "started_at": started.isoformat(),
+                "revision": _git_revision(),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "quick": args.quick,
+            },
+            "benchmarks": results,
+        }, f, indent=2)
+    print(f"\nResults written to {output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["benchmarks"]
+        regressions = compare(results, baseline, args.threshold)
+        for name, old, new, ratio in regressions:
+            print(f"REGRESSION {name}: {_format_seconds(old)} -> {_format_seconds(new)} ({ratio:.2f}x)")
+        if regressions:
+            return 1
+        print(f"No regressions beyond {args.threshold:.0%} against {args.baseline}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main_cli())
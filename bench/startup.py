@@ -0,0 +1,71 @@
+"""
+Time to first answer: how long after `python main.py` starts the bot
+replies to a command.
+
+Runs main.py as a fresh process against the local Telegram stand-in, with
+no stored profile, no resume links and Ollama and LinkedIn unreachable, so
+the measurement also shows that startup doesn't wait on any of them.
+
+    python -m bench.startup            # prints seconds until /stats is answered
+"""
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+
+from bench import fakes
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Nothing listens here: connections are refused at once
+UNREACHABLE = "http://127.0.0.1:9"
+
+
+def time_to_first_answer(command="/stats", expect="Jobs by status", timeout=30.0):
+    """Seconds from process start to the bot's reply to command, or None if it never came."""
+    with fakes.FakeTelegram() as bot_api, tempfile.TemporaryDirectory() as workdir:
+        env = dict(
+            os.environ,
+            DB_PATH=os.path.join(workdir, "startup.db"),
+            TELEGRAM_API_URL=f"{bot_api.url}/bot",
+            TELEGRAM_BOT_TOKEN="1:startup",
+            TELEGRAM_CHAT_ID="1",
+            TELEGRAM_EXTRA_CHAT_IDS="",
+            OLLAMA_HOST=UNREACHABLE,
+            LINKEDIN_URL=UNREACHABLE,
+            RESUME_LINKS="",
+            STARTUP_JITTER_SECONDS="3600",
+            METRICS_PORT="0",
+            SCRAPE_WORKERS="0",
+        )
+        bot_api.send_command(command, 1)
+
+        start = time.perf_counter()
+        process = subprocess.Popen(
+            [sys.executable, "main.py"], cwd=ROOT, env=env,
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        answered_at = None
+        try:
+            while time.perf_counter() - start < timeout and process.poll() is None:
+                if any(expect in (text or "") for _, _, text in bot_api.messages):
+                    answered_at = time.perf_counter()
+                    break
+                time.sleep(0.01)
+        finally:
+            if process.poll() is None:
+                process.send_signal(signal.SIGINT)
+                try:
+                    process.wait(timeout=30)
+                except subprocess.TimeoutExpired:
+                    process.kill()
+        return None if answered_at is None else answered_at - start
+
+
+if __name__ == "__main__":
+    seconds = time_to_first_answer()
+    if seconds is None:
+        print("The bot never answered.")
+        sys.exit(1)
+    print(f"Time to first answer: {seconds:.2f}s")
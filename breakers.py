@@ -0,0 +1,180 @@
+import logging
+import threading
+import time
+
+import config
+import metrics
+
+logger = logging.getLogger(__name__)
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half-open"
+
+_breakers = {}
+_lock = threading.Lock()
+
+
+class CircuitOpen(Exception):
+    """Raised instead of calling a dependency its breaker considers down."""
+
+    def __init__(self, name, retry_in):
+        super().__init__(f"{name} is unavailable; retrying in {retry_in:.0f}s")
+        self.name = name
+        self.retry_in = retry_in
+
+
+class CircuitBreaker:
+    """
+    Fails calls to a dependency fast while it is known to be down.
+
+    After failure_threshold consecutive failures the breaker opens and
+    every call raises CircuitOpen without touching the dependency. Once
+    reset_seconds have passed it is half-open: a single probe call goes
+    through while the rest keep failing fast. A successful probe closes the
+    breaker; a failed one opens it again for twice as long, up to
+    max_reset_seconds. A probe that never reports back is replaced after
+    reset_seconds.
+
+    is_failure(exc) decides which exceptions count as the dependency being
+    down; the others (a bad request, a missing document) pass through
+    without counting.
+    """
+
+    def __init__(self, name, failure_threshold=5, reset_seconds=60.0, max_reset_seconds=900.0,
+                 is_failure=None, clock=time.monotonic):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.max_reset_seconds = max_reset_seconds
+        self.is_failure = is_failure or (lambda exc: True)
+        self._clock = clock
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._open_for = self.reset_seconds
+            self._probe_at = None
+            self.last_error = None
+
+    def _state(self, now):
+        if self._opened_at is None:
+            return CLOSED
+        return HALF_OPEN if now - self._opened_at >= self._open_for else OPEN
+
+    @property
+    def state(self):
+        with self._lock:
+            return self._state(self._clock())
+
+    def guard(self):
+        """Raise CircuitOpen unless a call may go through now. Half-open, admits one probe."""
+        with self._lock:
+            now = self._clock()
+            state = self._state(now)
+            if state == CLOSED:
+                return
+            if state == HALF_OPEN and (self._probe_at is None or now - self._probe_at >= self.reset_seconds):
+                self._probe_at = now
+                return
+            retry_in = max(self._opened_at + self._open_for - now, 0.0)
+        metrics.BREAKER_REJECTED.inc(self.name)
+        raise CircuitOpen(self.name, retry_in)
+
+    def success(self):
+        with self._lock:
+            recovered = self._opened_at is not None
+            self._failures = 0
+            self._opened_at = None
+            self._open_for = self.reset_seconds
+            self._probe_at = None
+        if recovered:
+            logger.info(f"{self.name} is reachable again; circuit closed.")
+
+    def failure(self, error=None):
+        with self._lock:
+            now = self._clock()
+            self.last_error = str(error) if error is not None else None
+            if self._probe_at is not None:
+                # The half-open probe failed: stay open, backing off
+                self._open_for = min(self._open_for * 2, self.max_reset_seconds)
+                self._opened_at = now
+                self._probe_at = None
+                return
+            self._failures += 1
+            if self._opened_at is not None or self._failures < self.failure_threshold:
+                return
+            self._opened_at = now
+        metrics.BREAKER_TRIPS.inc(self.name)
+        logger.warning(
+            f"{self.name} failed {self._failures} times in a row ({error}); "
+            f"failing fast for {self.reset_seconds:g}s."
+        )
+
+    def call(self, fn, *args, **kwargs):
+        """fn(*args, **kwargs) through the breaker."""
+        self.guard()
+        try:
+            result = fn(*args, **kwargs)
+        except Exception as e:
+            self._record(e)
+            raise
+        self.success()
+        return result
+
+    async def call_async(self, fn, *args, **kwargs):
+        """await fn(*args, **kwargs) through the breaker."""
+        self.guard()
+        try:
+            result = await fn(*args, **kwargs)
+        except Exception as e:
+            self._record(e)
+            raise
+        self.success()
+        return result
+
+    def _record(self, exc):
+        if self.is_failure(exc):
+            self.failure(exc)
+        else:
+            # The dependency answered; it just didn't like this call
+            self.success()
+
+    def snapshot(self):
+        """State for /breakers: {name, state, failures, retry_in, last_error}."""
+        with self._lock:
+            now = self._clock()
+            state = self._state(now)
+            retry_in = self._opened_at + self._open_for - now if state == OPEN else 0.0
+            return {
+                "name": self.name,
+                "state": state,
+                "failures": self._failures,
+                "retry_in": retry_in,
+                "last_error": self.last_error,
+            }
+
+
+def breaker(name, is_failure=None):
+    """The process-wide breaker for a dependency, created on first use with the configured thresholds."""
+    with _lock:
+        if name not in _breakers:
+            _breakers[name] = CircuitBreaker(
+                name,
+                failure_threshold=config.BREAKER_FAILURE_THRESHOLD,
+                reset_seconds=config.BREAKER_RESET_SECONDS,
+                max_reset_seconds=config.BREAKER_MAX_RESET_SECONDS,
+                is_failure=is_failure,
+            )
+        return _breakers[name]
+
+
+def all_breakers():
+    with _lock:
+        return list(_breakers.values())
+
+
+def reset_all():
+    for circuit in all_breakers():
+        circuit.reset()
@@ -0,0 +1,25 @@
+import config
+
+
+def primary():
+    """The chat from TELEGRAM_CHAT_ID, which owns the original single-user tables."""
+    return str(config.TELEGRAM_CHAT_ID)
+
+
+def all_chats():
+    """Every chat the bot serves: the primary chat, then TELEGRAM_EXTRA_CHAT_IDS."""
+    chat_ids = [primary()] if primary() else []
+    for chat_id in config.TELEGRAM_EXTRA_CHAT_IDS:
+        if chat_id not in chat_ids:
+            chat_ids.append(chat_id)
+    return chat_ids
+
+
+def is_served(chat_id):
+    """Whether the bot answers this chat."""
+    return is_primary(chat_id) or str(chat_id) in all_chats()
+
+
+def is_primary(chat_id):
+    """None stands for the primary chat."""
+    return chat_id is None or str(chat_id) == primary()
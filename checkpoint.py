@@ -0,0 +1,61 @@
+import json
+
+import chats
+import config
+import db
+
+
+class ScanCheckpoint:
+    """
+    Persisted progress of one scan, so a restart resumes instead of redoing it.
+
+    Records which (keyword, page) units were fetched, the jobs they found
+    and which of those were alerted to each chat. Rows are kept in SQLite until the
+    scan finishes.
+    """
+
+    def __init__(self, scan_id, keywords, location, timeframe):
+        self.scan_id = scan_id
+        self.keywords = keywords
+        self.location = location
+        self.timeframe = timeframe
+
+    @classmethod
+    def start(cls, keywords, location, timeframe):
+        scan_id = db.create_scan(config.INSTANCE_ID, keywords, location, timeframe)
+        return cls(scan_id, keywords, location, timeframe)
+
+    @classmethod
+    def interrupted(cls):
+        """The scan a previous process of this instance left unfinished, if any."""
+        row = db.get_running_scan(config.INSTANCE_ID)
+        if row is None:
+            return None
+        return cls(row["id"], json.loads(row["keywords"]), row["location"], row["timeframe"])
+
+    def done_units(self):
+        """[(keyword, page, new_jobs)] in page order; new_jobs is None for empty or failed pages."""
+        return [(row["keyword"], row["page"], row["new_jobs"]) for row in db.get_scan_units(self.scan_id)]
+
+    def record_unit(self, keyword, page, new_jobs, jobs):
+        db.save_scan_unit(self.scan_id, keyword, page, new_jobs, jobs)
+
+    def jobs(self):
+        return db.get_scan_jobs(self.scan_id)
+
+    def alerted_ids(self, chat_id=None):
+        return db.get_scan_alerted(self.scan_id, chat_id or chats.primary())
+
+    def mark_alerted(self, job_id, chat_id=None):
+        db.mark_scan_job_alerted(self.scan_id, job_id, chat_id or chats.primary())
+
+    def record_failure(self):
+        """Count a failed run. Returns how many runs of this scan have failed."""
+        return db.record_scan_failure(self.scan_id)
+
+    def finish(self):
+        db.finish_scan(self.scan_id)
+
+    def abandon(self):
+        """Give up on a scan that keeps failing, so it stops being resumed."""
+        db.finish_scan(self.scan_id, status="abandoned")
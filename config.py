@@ -1,16 +1,132 @@
 import os
+import re
+import socket
 from dotenv import load_dotenv
 
 load_dotenv()
 
+
+def _chat_id(name, value):
+    """A Telegram chat ID is an integer (negative for groups); anything else can never match a chat."""
+    if not re.fullmatch(r"-?\d+", value):
+        raise ValueError(f"{name} must be a numeric Telegram chat ID (negative for groups), got {value!r}")
+    return value
+
+
+def _near_dup_distance(value):
+    """
+    dedup.py finds candidates through 4 LSH bands of 16 bits, which only
+    guarantees a shared band up to 3 differing bits; a larger distance would
+    silently miss most matches.
+    """
+    distance = int(value)
+    if not 0 <= distance <= 3:
+        raise ValueError(f"NEAR_DUP_MAX_DISTANCE must be between 0 and 3 (differing bits out of 64), got {distance}")
+    return distance
+
+
 TELEGRAM_BOT_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN", "")
-TELEGRAM_CHAT_ID = os.getenv("TELEGRAM_CHAT_ID", "")
+TELEGRAM_CHAT_ID = os.getenv("TELEGRAM_CHAT_ID", "").strip()
+if TELEGRAM_CHAT_ID:
+    _chat_id("TELEGRAM_CHAT_ID", TELEGRAM_CHAT_ID)
+# Other chats (team members) served by the same bot, each with its own
+# keywords, profile, filters and job statuses
+TELEGRAM_EXTRA_CHAT_IDS = [
+    _chat_id("TELEGRAM_EXTRA_CHAT_IDS", chat_id.strip())
+    for chat_id in os.getenv("TELEGRAM_EXTRA_CHAT_IDS", "").split(",")
+    if chat_id.strip()
+]
 
 OLLAMA_MODEL = os.getenv("OLLAMA_MODEL", "mistral")
 
+# Upstream endpoints; overridden to point at local stand-ins by bench/
+LINKEDIN_URL = os.getenv("LINKEDIN_URL", "https://www.linkedin.com")
+TELEGRAM_API_URL = os.getenv("TELEGRAM_API_URL", "https://api.telegram.org/bot")
+
+# Record LinkedIn / Google Docs responses into an archive directory, or
+# replay them from one without network ("original" timing or "none")
+HTTP_RECORD_DIR = os.getenv("HTTP_RECORD_DIR", "")
+HTTP_REPLAY_DIR = os.getenv("HTTP_REPLAY_DIR", "")
+HTTP_REPLAY_TIMING = os.getenv("HTTP_REPLAY_TIMING", "original")
+
+# Near-duplicate (repost) suppression via SimHash fingerprints
+NEAR_DUP_ENABLED = os.getenv("NEAR_DUP_ENABLED", "true").lower() == "true"
+NEAR_DUP_MAX_DISTANCE = _near_dup_distance(os.getenv("NEAR_DUP_MAX_DISTANCE", "3"))  # differing bits out of 64, 0-3
+NEAR_DUP_WINDOW_DAYS = int(os.getenv("NEAR_DUP_WINDOW_DAYS", "30"))  # how far back pending jobs count
+
+# LLM triage: screen scraped jobs against the parsed profile before alerting
+TRIAGE_ENABLED = os.getenv("TRIAGE_ENABLED", "false").lower() == "true"
+TRIAGE_BATCH_SIZE = int(os.getenv("TRIAGE_BATCH_SIZE", "8"))
+
 JOB_LOCATION = os.getenv("JOB_LOCATION", "Singapore")
 JOB_TIMEFRAME = os.getenv("JOB_TIMEFRAME", "r604800")  # r86400=24h, r172800=48h, r604800=week
-SCRAPE_INTERVAL_MINUTES = int(os.getenv("SCRAPE_INTERVAL_MINUTES", "10"))
+SCRAPE_INTERVAL_MINUTES = int(os.getenv("SCRAPE_INTERVAL_MINUTES", "10"))  # starting interval per query
+# Postings older than this are not alerted (0 = off); chats can set their own with /freshness
+MAX_POSTING_AGE_HOURS = float(os.getenv("MAX_POSTING_AGE_HOURS", "0"))
+
+# Adaptive scheduling: each (keyword, location) query gets its own interval
+# within these bounds, shortened when it yields new jobs and backed off when not
+SCAN_MIN_INTERVAL_MINUTES = float(os.getenv("SCAN_MIN_INTERVAL_MINUTES", "5"))
+SCAN_MAX_INTERVAL_MINUTES = float(os.getenv("SCAN_MAX_INTERVAL_MINUTES", "240"))
+SCAN_TARGET_YIELD = float(os.getenv("SCAN_TARGET_YIELD", "1"))  # new jobs wanted per scan of a query
+# Max LinkedIn search-page fetches per scan, spread across keywords and page
+# depths by yield (see allocator.py)
+SCAN_REQUEST_BUDGET = int(os.getenv("SCAN_REQUEST_BUDGET", "15"))
+SCAN_TICK_MINUTES = float(os.getenv("SCAN_TICK_MINUTES", "1"))  # how often due queries are checked
+# Scheduled scans pace their fetches over this share of a tick instead of bursting
+SCAN_SPREAD_FRACTION = float(os.getenv("SCAN_SPREAD_FRACTION", "0.8"))
+SCHEDULE_JITTER = float(os.getenv("SCHEDULE_JITTER", "0.1"))  # +/- fraction on each query's next run
+STARTUP_JITTER_SECONDS = float(os.getenv("STARTUP_JITTER_SECONDS", "30"))  # random delay before the first scan
+# On shutdown, wait this long for the in-flight scan to checkpoint before exiting
+SHUTDOWN_GRACE_SECONDS = float(os.getenv("SHUTDOWN_GRACE_SECONDS", "30"))
+# A checkpointed scan that fails this many runs in a row is abandoned instead of resumed again
+SCAN_MAX_FAILURES = int(os.getenv("SCAN_MAX_FAILURES", "3"))
+# Minimum gap between any two LinkedIn requests, shared by all scraper threads
+REQUEST_INTERVAL_SECONDS = float(os.getenv("REQUEST_INTERVAL_SECONDS", "2"))
+REQUEST_JITTER = float(os.getenv("REQUEST_JITTER", "0.3"))  # +/- fraction applied to every request gap
+
+# Scrape worker processes: search pages are fetched and parsed by this many
+# separate processes fed through a SQLite work queue (0 = in the bot process)
+SCRAPE_WORKERS = int(os.getenv("SCRAPE_WORKERS", "0"))
+# A claimed unit not finished within this time is handed to another worker
+SCRAPE_UNIT_TIMEOUT_SECONDS = float(os.getenv("SCRAPE_UNIT_TIMEOUT_SECONDS", "120"))
+
+# Several instances can share one database: each scrapes only the queries it
+# holds a lease on. INSTANCE_ID must be stable across restarts and unique per instance.
+INSTANCE_ID = os.getenv("INSTANCE_ID", socket.gethostname())
+LEASE_SECONDS = float(os.getenv("LEASE_SECONDS", "180"))  # a dead instance's queries are taken over after this
+
+# Prometheus metrics at http://METRICS_HOST:METRICS_PORT/metrics (0 = off)
+METRICS_PORT = int(os.getenv("METRICS_PORT", "0"))
+METRICS_HOST = os.getenv("METRICS_HOST", "127.0.0.1")
+
+# Read-only job history API at http://API_HOST:API_PORT/jobs (0 = off)
+API_PORT = int(os.getenv("API_PORT", "0"))
+API_HOST = os.getenv("API_HOST", "127.0.0.1")
+
+# Per-scan tracing: spans kept for the last TRACE_BUFFER_SIZE scans (/perf)
+TRACING = os.getenv("TRACING", "false").lower() == "true"
+TRACE_BUFFER_SIZE = int(os.getenv("TRACE_BUFFER_SIZE", "20"))
+PROFILE_INTERVAL_SECONDS = float(os.getenv("PROFILE_INTERVAL_SECONDS", "0.005"))
+
+# Job detail stage: fetch /jobs/view/<id> once per new job for description etc.
+FETCH_JOB_DETAILS = os.getenv("FETCH_JOB_DETAILS", "false").lower() == "true"
+DETAIL_WORKERS = int(os.getenv("DETAIL_WORKERS", "4"))
+
+# Liveness checks: every LIVENESS_INTERVAL_MINUTES, while no scan is running, up to
+# LIVENESS_BATCH_SIZE pending postings not checked for LIVENESS_RECHECK_HOURS are
+# probed and closed ones marked expired (0 = off)
+LIVENESS_BATCH_SIZE = int(os.getenv("LIVENESS_BATCH_SIZE", "30"))
+LIVENESS_INTERVAL_MINUTES = float(os.getenv("LIVENESS_INTERVAL_MINUTES", "30"))
+LIVENESS_RECHECK_HOURS = float(os.getenv("LIVENESS_RECHECK_HOURS", "24"))
+LIVENESS_WORKERS = int(os.getenv("LIVENESS_WORKERS", "2"))
+
+# Circuit breakers (LinkedIn, Google Docs, Ollama, Telegram): after BREAKER_FAILURE_THRESHOLD
+# failures in a row, calls fail fast for BREAKER_RESET_SECONDS, then one probe goes through;
+# each failed probe doubles the wait, up to BREAKER_MAX_RESET_SECONDS
+BREAKER_FAILURE_THRESHOLD = int(os.getenv("BREAKER_FAILURE_THRESHOLD", "5"))
+BREAKER_RESET_SECONDS = float(os.getenv("BREAKER_RESET_SECONDS", "60"))
+BREAKER_MAX_RESET_SECONDS = float(os.getenv("BREAKER_MAX_RESET_SECONDS", "900"))
 
 # Comma-separated Google Docs links (must be shared as "anyone with link can view")
 RESUME_LINKS = [
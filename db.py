@@ -1,19 +1,53 @@
+import json
 import sqlite3
 import os
+import re
+import zlib
 from datetime import datetime
 
+import chats
 import config
+import metrics
+import tracing
+from models import Job
+
+
+def _operation(fn):
+    """Time each call of a public operation for the metrics endpoint and record it in scan traces."""
+    return tracing.traced(f"db.{fn.__name__}")(metrics.timed(metrics.DB_SECONDS, fn.__name__)(fn))
+
+
+def _decompress(blob):
+    return zlib.decompress(blob).decode("utf-8") if blob is not None else None
 
 
 def _get_conn():
     os.makedirs(os.path.dirname(config.DB_PATH), exist_ok=True)
-    conn = sqlite3.connect(config.DB_PATH)
+    # Scrape worker processes share the file; wait for locks instead of failing
+    conn = sqlite3.connect(config.DB_PATH, timeout=30)
     conn.row_factory = sqlite3.Row
+    # Used by the jobs_fts triggers to index compressed job descriptions
+    conn.create_function("decompress", 1, _decompress, deterministic=True)
     return conn
 
 
+def _get_read_conn():
+    """
+    Read-only connection for the history API. Under WAL it reads a
+    snapshot and never takes the write lock, so it can't stall scans.
+    """
+    conn = sqlite3.connect(f"file:{config.DB_PATH}?mode=ro", uri=True, timeout=30)
+    conn.row_factory = sqlite3.Row
+    conn.create_function("decompress", 1, _decompress, deterministic=True)
+    conn.execute("PRAGMA query_only = ON")
+    return conn
+
+
+@_operation
 def init_db():
     conn = _get_conn()
+    # WAL lets the bot read while scrape workers write
+    conn.execute("PRAGMA journal_mode=WAL")
     cur = conn.cursor()
     cur.execute("""
         CREATE TABLE IF NOT EXISTS profile (
@@ -39,6 +73,164 @@ def init_db():
             location TEXT NOT NULL,
             url TEXT NOT NULL,
             status TEXT NOT NULL DEFAULT 'pending',
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            keyword TEXT
+        )
+    """)
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS job_details (
+            job_id TEXT PRIMARY KEY,
+            description BLOB NOT NULL,
+            seniority TEXT NOT NULL DEFAULT '',
+            employment_type TEXT NOT NULL DEFAULT '',
+            posted_at TEXT NOT NULL DEFAULT '',
+            fetched_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS job_fingerprints (
+            job_id TEXT PRIMARY KEY,
+            simhash INTEGER NOT NULL,
+            band0 INTEGER NOT NULL,
+            band1 INTEGER NOT NULL,
+            band2 INTEGER NOT NULL,
+            band3 INTEGER NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    for band in range(4):
+        cur.execute(
+            f"CREATE INDEX IF NOT EXISTS idx_job_fingerprints_band{band} "
+            f"ON job_fingerprints (band{band})"
+        )
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS job_liveness (
+            job_id TEXT PRIMARY KEY,
+            checked_at REAL NOT NULL,
+            live INTEGER
+        )
+    """)
+    _add_column(cur, "jobs", "keyword", "TEXT")
+    _add_column(cur, "jobs", "last_alerted_at", "REAL")
+    # ISO timestamp the posting went up, from its search card (NULL if unknown)
+    _add_column(cur, "jobs", "posted_at", "TEXT")
+    # jobs holds every chat's postings; 0 = followed only by other chats (see _init_chats)
+    _add_column(cur, "jobs", "in_primary", "INTEGER NOT NULL DEFAULT 1")
+    # Order the primary chat took each posting up in, for incremental exports; a
+    # posting stored earlier for another chat gets the next number when it joins
+    _add_column(cur, "jobs", "primary_seq", "INTEGER")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_jobs_by_primary_seq ON jobs (primary_seq)")
+    cur.execute("UPDATE jobs SET primary_seq = id WHERE primary_seq IS NULL AND in_primary = 1")
+    # Newest-first history listings, optionally narrowed to one status, keyword or company,
+    # and posting-time ranges
+    for column in ("created_at", "status, created_at", "keyword, created_at", "company, created_at", "posted_at"):
+        name = column.replace(", ", "_")
+        cur.execute(f"CREATE INDEX IF NOT EXISTS idx_jobs_by_{name} ON jobs ({column}, id)")
+    _init_search_index(cur)
+    _init_stats(cur)
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS query_schedule (
+            keyword TEXT NOT NULL,
+            location TEXT NOT NULL,
+            interval_minutes REAL NOT NULL,
+            rate_ewma REAL NOT NULL DEFAULT 0,
+            last_run_at REAL,
+            next_run_at REAL NOT NULL,
+            PRIMARY KEY (keyword, location)
+        )
+    """)
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS allocator_stats (
+            keyword TEXT NOT NULL,
+            location TEXT NOT NULL,
+            page INTEGER NOT NULL,
+            pulls REAL NOT NULL,
+            yield REAL NOT NULL,
+            PRIMARY KEY (keyword, location, page)
+        )
+    """)
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS scans (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            keywords TEXT NOT NULL,
+            location TEXT NOT NULL,
+            timeframe TEXT NOT NULL,
+            status TEXT NOT NULL DEFAULT 'running',
+            started_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            finished_at TIMESTAMP
+        )
+    """)
+    _add_column(cur, "scans", "instance", "TEXT NOT NULL DEFAULT ''")
+    _add_column(cur, "scans", "failures", "INTEGER NOT NULL DEFAULT 0")
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS instances (
+            instance_id TEXT PRIMARY KEY,
+            last_seen REAL NOT NULL
+        )
+    """)
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS query_leases (
+            keyword TEXT NOT NULL,
+            location TEXT NOT NULL,
+            holder TEXT NOT NULL,
+            expires_at REAL NOT NULL,
+            PRIMARY KEY (keyword, location)
+        )
+    """)
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS scan_units (
+            scan_id INTEGER NOT NULL,
+            keyword TEXT NOT NULL,
+            page INTEGER NOT NULL,
+            new_jobs INTEGER,
+            PRIMARY KEY (scan_id, keyword, page)
+        )
+    """)
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS scan_jobs (
+            scan_id INTEGER NOT NULL,
+            job_id TEXT NOT NULL,
+            job TEXT NOT NULL,
+            seq INTEGER NOT NULL,
+            PRIMARY KEY (scan_id, job_id)
+        )
+    """)
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS scrape_queue (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            keyword TEXT NOT NULL,
+            location TEXT NOT NULL,
+            timeframe TEXT NOT NULL,
+            page INTEGER NOT NULL,
+            spacing REAL NOT NULL DEFAULT 0,
+            status TEXT NOT NULL DEFAULT 'queued',
+            claimed_by TEXT,
+            claimed_at REAL
+        )
+    """)
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS scrape_results (
+            unit_id INTEGER PRIMARY KEY,
+            jobs TEXT,
+            rejected INTEGER NOT NULL DEFAULT 0
+        )
+    """)
+    # 1 when the worker's LinkedIn breaker turned the page away unfetched
+    _add_column(cur, "scrape_results", "blocked", "INTEGER NOT NULL DEFAULT 0")
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS scan_alerts (
+            scan_id INTEGER NOT NULL,
+            chat_id TEXT NOT NULL,
+            job_id TEXT NOT NULL,
+            PRIMARY KEY (scan_id, chat_id, job_id)
+        )
+    """)
+    _init_chats(cur)
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS job_verdicts (
+            job_id TEXT PRIMARY KEY,
+            fit INTEGER NOT NULL,
+            reason TEXT NOT NULL DEFAULT '',
             created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
         )
     """)
@@ -46,68 +238,1136 @@ def init_db():
     conn.close()
 
 
-def get_profile():
+def _add_column(cur, table, column, definition):
+    """Add a column to an existing table if an older schema lacks it."""
+    columns = [row[1] for row in cur.execute(f"PRAGMA table_info({table})")]
+    if column not in columns:
+        cur.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+
+
+def _init_chats(cur):
+    """
+    Per-chat state for chats other than the primary TELEGRAM_CHAT_ID.
+
+    The primary chat keeps using the original profile, settings and
+    job_verdicts tables, and its status, keyword and created_at on jobs;
+    every other chat gets its rows here. Postings themselves are shared:
+    each is stored once in jobs whichever chat it was scraped for, with
+    in_primary = 0 when the primary chat doesn't follow it, and chat_jobs
+    only holds other chats' status. Details and fingerprints are shared too.
+    """
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS chat_profiles (
+            chat_id TEXT PRIMARY KEY,
+            raw_text TEXT NOT NULL,
+            parsed_profile TEXT NOT NULL,
+            keywords TEXT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS chat_settings (
+            chat_id TEXT NOT NULL,
+            key TEXT NOT NULL,
+            value TEXT NOT NULL,
+            PRIMARY KEY (chat_id, key)
+        )
+    """)
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS chat_jobs (
+            chat_id TEXT NOT NULL,
+            job_id TEXT NOT NULL,
+            status TEXT NOT NULL DEFAULT 'pending',
+            keyword TEXT,
+            last_alerted_at REAL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (chat_id, job_id)
+        )
+    """)
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_chat_jobs_job_id ON chat_jobs (job_id)")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_chat_jobs_by_created_at ON chat_jobs (chat_id, created_at)")
+    # Per-chat insertion order, for incremental exports (jobs.id is shared across chats)
+    _add_column(cur, "chat_jobs", "seq", "INTEGER")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_chat_jobs_by_seq ON chat_jobs (chat_id, seq)")
+    cur.execute("UPDATE chat_jobs SET seq = rowid WHERE seq IS NULL")
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS chat_verdicts (
+            chat_id TEXT NOT NULL,
+            job_id TEXT NOT NULL,
+            fit INTEGER NOT NULL,
+            reason TEXT NOT NULL DEFAULT '',
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (chat_id, job_id)
+        )
+    """)
+
+
+def _init_stats(cur):
+    """Summary tables updated by insert_job/update_job_status, so /stats never scans jobs."""
+    exists = cur.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'stats_status'"
+    ).fetchone()
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS stats_keyword_daily (
+            keyword TEXT NOT NULL,
+            day TEXT NOT NULL,
+            jobs INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (keyword, day)
+        )
+    """)
+    for column in ("company", "location", "status"):
+        cur.execute(f"""
+            CREATE TABLE IF NOT EXISTS stats_{column} (
+                {column} TEXT PRIMARY KEY,
+                jobs INTEGER NOT NULL DEFAULT 0
+            )
+        """)
+    if not exists:
+        # First run on an existing database: aggregate the history once
+        cur.execute("""
+            INSERT INTO stats_keyword_daily (keyword, day, jobs)
+            SELECT keyword, date(created_at), COUNT(*) FROM jobs
+            WHERE keyword IS NOT NULL AND in_primary = 1 GROUP BY keyword, date(created_at)
+        """)
+        for column in ("company", "location", "status"):
+            cur.execute(f"""
+                INSERT INTO stats_{column} ({column}, jobs)
+                SELECT {column}, COUNT(*) FROM jobs WHERE in_primary = 1 GROUP BY {column}
+            """)
+
+
+def _init_search_index(cur):
+    """FTS5 mirror of jobs (plus descriptions), kept in sync by triggers. rowid = jobs.id."""
+    exists = cur.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'jobs_fts'"
+    ).fetchone()
+    cur.execute("""
+        CREATE VIRTUAL TABLE IF NOT EXISTS jobs_fts USING fts5(
+            title, company, location, description,
+            tokenize = 'unicode61 remove_diacritics 2'
+        )
+    """)
+    cur.execute("""
+        CREATE TRIGGER IF NOT EXISTS jobs_fts_insert AFTER INSERT ON jobs BEGIN
+            INSERT INTO jobs_fts (rowid, title, company, location, description)
+            VALUES (
+                new.id, new.title, new.company, new.location,
+                COALESCE((SELECT decompress(description) FROM job_details WHERE job_id = new.job_id), '')
+            );
+        END
+    """)
+    cur.execute("""
+        CREATE TRIGGER IF NOT EXISTS jobs_fts_update AFTER UPDATE OF title, company, location ON jobs BEGIN
+            UPDATE jobs_fts SET title = new.title, company = new.company, location = new.location
+            WHERE rowid = new.id;
+        END
+    """)
+    cur.execute("""
+        CREATE TRIGGER IF NOT EXISTS jobs_fts_delete AFTER DELETE ON jobs BEGIN
+            DELETE FROM jobs_fts WHERE rowid = old.id;
+        END
+    """)
+    cur.execute("""
+        CREATE TRIGGER IF NOT EXISTS job_details_fts_insert AFTER INSERT ON job_details BEGIN
+            UPDATE jobs_fts SET description = decompress(new.description)
+            WHERE rowid = (SELECT id FROM jobs WHERE job_id = new.job_id);
+        END
+    """)
+    if not exists:
+        # First run on an existing database: index the history once
+        cur.execute("""
+            INSERT INTO jobs_fts (rowid, title, company, location, description)
+            SELECT j.id, j.title, j.company, j.location, COALESCE(decompress(d.description), '')
+            FROM jobs j LEFT JOIN job_details d ON d.job_id = j.job_id
+        """)
+
+
+@_operation
+def get_profile(chat_id=None):
     conn = _get_conn()
-    row = conn.execute("SELECT * FROM profile ORDER BY id DESC LIMIT 1").fetchone()
+    if chats.is_primary(chat_id):
+        row = conn.execute("SELECT * FROM profile ORDER BY id DESC LIMIT 1").fetchone()
+    else:
+        row = conn.execute("SELECT * FROM chat_profiles WHERE chat_id = ?", (str(chat_id),)).fetchone()
     conn.close()
     return row
 
 
-def save_profile(raw_text, parsed_profile, keywords):
+@_operation
+def save_profile(raw_text, parsed_profile, keywords, chat_id=None):
     conn = _get_conn()
-    conn.execute(
-        "INSERT INTO profile (raw_text, parsed_profile, keywords) VALUES (?, ?, ?)",
-        (raw_text, parsed_profile, keywords),
-    )
+    if chats.is_primary(chat_id):
+        conn.execute(
+            "INSERT INTO profile (raw_text, parsed_profile, keywords) VALUES (?, ?, ?)",
+            (raw_text, parsed_profile, keywords),
+        )
+    else:
+        conn.execute(
+            "INSERT OR REPLACE INTO chat_profiles (chat_id, raw_text, parsed_profile, keywords) VALUES (?, ?, ?, ?)",
+            (str(chat_id), raw_text, parsed_profile, keywords),
+        )
     conn.commit()
     conn.close()
 
 
+@_operation
 def job_exists(job_id):
-    """Returns True only if job is viewed or ignored. Pending jobs are NOT skipped."""
+    """
+    Returns True only if every chat has viewed, ignored or suppressed the
+    job as a repost, or the posting has expired. Pending jobs are NOT skipped.
+    """
     conn = _get_conn()
     row = conn.execute(
-        "SELECT 1 FROM jobs WHERE job_id = ? AND status IN ('viewed', 'ignored')",
+        "SELECT 1 FROM jobs WHERE job_id = ? AND in_primary = 1 AND status IN ('viewed', 'ignored', 'expired', 'suppressed')",
         (job_id,),
     ).fetchone()
+    others = [chat_id for chat_id in chats.all_chats() if not chats.is_primary(chat_id)]
+    if row is not None and others:
+        placeholders = ",".join("?" * len(others))
+        dismissed = conn.execute(
+            f"""SELECT COUNT(*) FROM chat_jobs
+                WHERE job_id = ? AND status IN ('viewed', 'ignored', 'expired', 'suppressed')
+                  AND chat_id IN ({placeholders})""",
+            [job_id, *others],
+        ).fetchone()[0]
+        row = row if dismissed == len(others) else None
     conn.close()
     return row is not None
 
 
-def insert_job(job_id, title, company, location, url, status="pending"):
+@_operation
+def insert_job(job_id, title, company, location, url, status="pending", keyword=None, chat_id=None, posted_at=None):
+    """Insert a job unless its job_id is already stored for the chat. Returns True if it was new."""
+    return _insert_job(job_id, title, company, location, url, status, keyword, chat_id, posted_at)
+
+
+@_operation
+def insert_job_record(job, status="pending", chat_id=None):
+    """insert_job for a scraped Job."""
+    return _insert_job(
+        job.job_id, job.title, job.company, job.location, job.url, status, job.keyword, chat_id, job.posted_at
+    )
+
+
+def _insert_job(job_id, title, company, location, url, status, keyword, chat_id, posted_at):
+    conn = _get_conn()
+    primary = chats.is_primary(chat_id)
+    # The posting is stored once for every chat; only the primary chat's row counts as its own
+    next_primary_seq = "(SELECT COALESCE(MAX(primary_seq), 0) + 1 FROM jobs)" if primary else "NULL"
+    cur = conn.execute(
+        f"""INSERT OR IGNORE INTO jobs
+            (job_id, title, company, location, url, status, keyword, posted_at, in_primary, primary_seq)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, {next_primary_seq})""",
+        (job_id, title, company, location, url, status, keyword, posted_at, int(primary)),
+    )
+    if not primary:
+        cur = conn.execute(
+            """INSERT OR IGNORE INTO chat_jobs (chat_id, job_id, status, keyword, seq)
+               VALUES (?, ?, ?, ?, (SELECT COALESCE(MAX(seq), 0) + 1 FROM chat_jobs WHERE chat_id = ?))""",
+            (str(chat_id), job_id, status, keyword, str(chat_id)),
+        )
+        conn.commit()
+        conn.close()
+        return cur.rowcount == 1
+
+    inserted = cur.rowcount == 1
+    if not inserted:
+        # Stored earlier for another chat: the primary chat takes it up now
+        inserted = conn.execute(
+            f"""UPDATE jobs SET in_primary = 1, status = ?, keyword = ?, created_at = CURRENT_TIMESTAMP,
+                   primary_seq = {next_primary_seq}
+                WHERE job_id = ? AND in_primary = 0""",
+            (status, keyword, job_id),
+        ).rowcount == 1
+    if inserted:
+        _count_new_job(conn, keyword, company, location, status)
+    conn.commit()
+    conn.close()
+    return inserted
+
+
+@_operation
+def claim_job_alert(job_id, now, min_gap, chat_id=None):
+    """
+    Reserve the right to alert a stored job to a chat. Returns False if any
+    instance alerted it there less than min_gap seconds ago.
+    """
+    conn = _get_conn()
+    if chats.is_primary(chat_id):
+        cur = conn.execute(
+            """UPDATE jobs SET last_alerted_at = ?
+               WHERE job_id = ? AND in_primary = 1 AND (last_alerted_at IS NULL OR last_alerted_at <= ?)""",
+            (now, job_id, now - min_gap),
+        )
+    else:
+        cur = conn.execute(
+            """UPDATE chat_jobs SET last_alerted_at = ?
+               WHERE chat_id = ? AND job_id = ? AND (last_alerted_at IS NULL OR last_alerted_at <= ?)""",
+            (now, str(chat_id), job_id, now - min_gap),
+        )
+    claimed = cur.rowcount == 1
+    conn.commit()
+    conn.close()
+    return claimed
+
+
+@_operation
+def release_job_alert(job_id, claimed_at, chat_id=None):
+    """Give back a claim_job_alert made at claimed_at whose alert never went out."""
+    conn = _get_conn()
+    if chats.is_primary(chat_id):
+        conn.execute(
+            "UPDATE jobs SET last_alerted_at = NULL WHERE job_id = ? AND in_primary = 1 AND last_alerted_at = ?",
+            (job_id, claimed_at),
+        )
+    else:
+        conn.execute(
+            "UPDATE chat_jobs SET last_alerted_at = NULL WHERE chat_id = ? AND job_id = ? AND last_alerted_at = ?",
+            (str(chat_id), job_id, claimed_at),
+        )
+    conn.commit()
+    conn.close()
+
+
+@_operation
+def get_job_statuses(job_ids, chat_id=None):
+    """Return {job_id: status} for the given job IDs that are already stored for the chat."""
+    job_ids = list(job_ids)
+    statuses = {}
+    conn = _get_conn()
+    for i in range(0, len(job_ids), 500):
+        chunk = job_ids[i:i + 500]
+        placeholders = ",".join("?" * len(chunk))
+        if chats.is_primary(chat_id):
+            rows = conn.execute(
+                f"SELECT job_id, status FROM jobs WHERE in_primary = 1 AND job_id IN ({placeholders})",
+                chunk,
+            ).fetchall()
+        else:
+            rows = conn.execute(
+                f"SELECT job_id, status FROM chat_jobs WHERE chat_id = ? AND job_id IN ({placeholders})",
+                [str(chat_id), *chunk],
+            ).fetchall()
+        for row in rows:
+            statuses[row["job_id"]] = row["status"]
+    conn.close()
+    return statuses
+
+
+@_operation
+def get_known_job_ids(job_ids):
+    """Return the subset of job IDs that any chat has stored. chat_jobs covers rows stored before jobs held every chat's postings."""
+    job_ids = list(job_ids)
+    known = set()
+    conn = _get_conn()
+    for i in range(0, len(job_ids), 500):
+        chunk = job_ids[i:i + 500]
+        placeholders = ",".join("?" * len(chunk))
+        rows = conn.execute(
+            f"""SELECT job_id FROM jobs WHERE job_id IN ({placeholders})
+                UNION SELECT job_id FROM chat_jobs WHERE job_id IN ({placeholders})""",
+            chunk + chunk,
+        ).fetchall()
+        known.update(row["job_id"] for row in rows)
+    conn.close()
+    return known
+
+
+@_operation
+def update_job_status(job_id, status, chat_id=None):
+    conn = _get_conn()
+    if not chats.is_primary(chat_id):
+        conn.execute(
+            "UPDATE chat_jobs SET status = ? WHERE chat_id = ? AND job_id = ?",
+            (status, str(chat_id), job_id),
+        )
+        conn.commit()
+        conn.close()
+        return
+    row = conn.execute("SELECT status FROM jobs WHERE job_id = ? AND in_primary = 1", (job_id,)).fetchone()
+    if row and row["status"] != status:
+        conn.execute("UPDATE jobs SET status = ? WHERE job_id = ?", (status, job_id))
+        _bump(conn, "stats_status", "status", row["status"], -1)
+        _bump(conn, "stats_status", "status", status, 1)
+    conn.commit()
+    conn.close()
+
+
+@_operation
+def get_liveness_candidates(checked_before, limit):
+    """
+    Up to limit job IDs pending in any chat whose posting was never checked
+    for liveness or last checked before checked_before, least recently
+    checked first.
+    """
+    conn = _get_conn()
+    rows = conn.execute(
+        """SELECT p.job_id FROM (
+               SELECT job_id FROM jobs WHERE status = 'pending' AND in_primary = 1
+               UNION SELECT job_id FROM chat_jobs WHERE status = 'pending'
+           ) p
+           LEFT JOIN job_liveness l ON l.job_id = p.job_id
+           WHERE l.checked_at IS NULL OR l.checked_at < ?
+           ORDER BY COALESCE(l.checked_at, 0)
+           LIMIT ?""",
+        (checked_before, limit),
+    ).fetchall()
+    conn.close()
+    return [row["job_id"] for row in rows]
+
+
+@_operation
+def save_liveness_checks(checks, now):
+    """Record (job_id, live) results; live is None when the check was inconclusive."""
+    conn = _get_conn()
+    conn.executemany(
+        "INSERT OR REPLACE INTO job_liveness (job_id, checked_at, live) VALUES (?, ?, ?)",
+        [(job_id, now, None if live is None else int(live)) for job_id, live in checks],
+    )
+    conn.commit()
+    conn.close()
+
+
+@_operation
+def expire_jobs(job_ids):
+    """Mark jobs whose posting has closed as expired in every chat still pending on them. Returns the number changed."""
+    job_ids = list(job_ids)
+    if not job_ids:
+        return 0
+    placeholders = ",".join("?" * len(job_ids))
+    conn = _get_conn()
+    expired = conn.execute(
+        f"UPDATE jobs SET status = 'expired' WHERE status = 'pending' AND in_primary = 1 AND job_id IN ({placeholders})",
+        job_ids,
+    ).rowcount
+    if expired:
+        _bump(conn, "stats_status", "status", "pending", -expired)
+        _bump(conn, "stats_status", "status", "expired", expired)
+    expired += conn.execute(
+        f"UPDATE chat_jobs SET status = 'expired' WHERE status = 'pending' AND job_id IN ({placeholders})",
+        job_ids,
+    ).rowcount
+    conn.commit()
+    conn.close()
+    return expired
+
+
+# --- Incrementally maintained statistics ---
+
+def _bump(conn, table, column, value, delta):
+    conn.execute(
+        f"""INSERT INTO {table} ({column}, jobs) VALUES (?, ?)
+            ON CONFLICT ({column}) DO UPDATE SET jobs = jobs + excluded.jobs""",
+        (value, delta),
+    )
+
+
+def _count_new_job(conn, keyword, company, location, status):
+    if keyword:
+        conn.execute(
+            """INSERT INTO stats_keyword_daily (keyword, day, jobs) VALUES (?, date('now'), 1)
+               ON CONFLICT (keyword, day) DO UPDATE SET jobs = jobs + 1""",
+            (keyword,),
+        )
+    _bump(conn, "stats_company", "company", company, 1)
+    _bump(conn, "stats_location", "location", location, 1)
+    _bump(conn, "stats_status", "status", status, 1)
+
+
+@_operation
+def get_stats(days=7, top=5, chat_id=None):
+    """
+    Status counts and top keywords/companies/locations of a chat's jobs.
+
+    The primary chat's come from the summary tables; other chats, with far
+    smaller histories, are counted from chat_jobs directly.
+    """
+    if not chats.is_primary(chat_id):
+        return _get_chat_stats(str(chat_id), days, top)
+    conn = _get_conn()
+    stats = {
+        "status": conn.execute(
+            "SELECT status, jobs FROM stats_status WHERE jobs > 0 ORDER BY jobs DESC"
+        ).fetchall(),
+        "keywords": conn.execute(
+            """SELECT keyword, SUM(jobs) AS jobs FROM stats_keyword_daily
+               WHERE day >= date('now', ?)
+               GROUP BY keyword ORDER BY jobs DESC LIMIT ?""",
+            (f"-{days - 1} days", top),
+        ).fetchall(),
+        "companies": conn.execute(
+            "SELECT company, jobs FROM stats_company ORDER BY jobs DESC LIMIT ?", (top,)
+        ).fetchall(),
+        "locations": conn.execute(
+            "SELECT location, jobs FROM stats_location ORDER BY jobs DESC LIMIT ?", (top,)
+        ).fetchall(),
+    }
+    conn.close()
+    return stats
+
+
+def _get_chat_stats(chat_id, days, top):
+    conn = _get_conn()
+    top_postings = """SELECT j.{column}, COUNT(*) AS jobs FROM chat_jobs c JOIN jobs j ON j.job_id = c.job_id
+                      WHERE c.chat_id = ? GROUP BY j.{column} ORDER BY jobs DESC LIMIT ?"""
+    stats = {
+        "status": conn.execute(
+            "SELECT status, COUNT(*) AS jobs FROM chat_jobs WHERE chat_id = ? GROUP BY status ORDER BY jobs DESC",
+            (chat_id,),
+        ).fetchall(),
+        "keywords": conn.execute(
+            """SELECT keyword, COUNT(*) AS jobs FROM chat_jobs
+               WHERE chat_id = ? AND keyword IS NOT NULL AND created_at >= date('now', ?)
+               GROUP BY keyword ORDER BY jobs DESC LIMIT ?""",
+            (chat_id, f"-{days - 1} days", top),
+        ).fetchall(),
+        "companies": conn.execute(top_postings.format(column="company"), (chat_id, top)).fetchall(),
+        "locations": conn.execute(top_postings.format(column="location"), (chat_id, top)).fetchall(),
+    }
+    conn.close()
+    return stats
+
+
+@_operation
+def get_job_details(job_ids):
+    """Return stored job details as {job_id: dict} with descriptions decompressed."""
+    job_ids = list(job_ids)
+    details = {}
+    conn = _get_conn()
+    for i in range(0, len(job_ids), 500):
+        chunk = job_ids[i:i + 500]
+        placeholders = ",".join("?" * len(chunk))
+        rows = conn.execute(
+            f"SELECT * FROM job_details WHERE job_id IN ({placeholders})",
+            chunk,
+        ).fetchall()
+        for row in rows:
+            details[row["job_id"]] = {
+                "description": zlib.decompress(row["description"]).decode("utf-8"),
+                "seniority": row["seniority"],
+                "employment_type": row["employment_type"],
+                "posted_at": row["posted_at"],
+            }
+    conn.close()
+    return details
+
+
+@_operation
+def save_job_details(job_id, description, seniority="", employment_type="", posted_at=""):
+    """Store a job's details, zlib-compressing the description."""
     conn = _get_conn()
     conn.execute(
-        """INSERT OR IGNORE INTO jobs
-           (job_id, title, company, location, url, status)
+        """INSERT OR REPLACE INTO job_details
+           (job_id, description, seniority, employment_type, posted_at)
+           VALUES (?, ?, ?, ?, ?)""",
+        (job_id, zlib.compress(description.encode("utf-8")), seniority, employment_type, posted_at),
+    )
+    conn.commit()
+    conn.close()
+
+
+@_operation
+def save_fingerprints(entries):
+    """Store (job_id, simhash, bands) entries; bands are the four 16-bit LSH keys. First fingerprint wins."""
+    conn = _get_conn()
+    conn.executemany(
+        """INSERT OR IGNORE INTO job_fingerprints
+           (job_id, simhash, band0, band1, band2, band3)
            VALUES (?, ?, ?, ?, ?, ?)""",
-        (job_id, title, company, location, url, status),
+        [(job_id, simhash, *bands) for job_id, simhash, bands in entries],
     )
     conn.commit()
     conn.close()
 
 
-def update_job_status(job_id, status):
+@_operation
+def find_fingerprint_candidates(bands, exclude_job_id, chat_id=None):
+    """Return fingerprinted jobs sharing at least one LSH band, with their status in the chat. Expired postings are left out."""
+    conn = _get_conn()
+    if chats.is_primary(chat_id):
+        rows = conn.execute(
+            """SELECT f.job_id, f.simhash, j.status, j.created_at
+               FROM job_fingerprints f
+               JOIN jobs j ON j.job_id = f.job_id
+               WHERE (f.band0 = ? OR f.band1 = ? OR f.band2 = ? OR f.band3 = ?)
+                 AND f.job_id != ? AND j.in_primary = 1 AND j.status != 'expired'""",
+            (*bands, exclude_job_id),
+        ).fetchall()
+    else:
+        rows = conn.execute(
+            """SELECT f.job_id, f.simhash, c.status, c.created_at
+               FROM job_fingerprints f
+               JOIN chat_jobs c ON c.job_id = f.job_id AND c.chat_id = ?
+               WHERE (f.band0 = ? OR f.band1 = ? OR f.band2 = ? OR f.band3 = ?)
+                 AND f.job_id != ? AND c.status != 'expired'""",
+            (str(chat_id), *bands, exclude_job_id),
+        ).fetchall()
+    conn.close()
+    return rows
+
+
+@_operation
+def get_unfingerprinted_jobs(limit):
+    conn = _get_conn()
+    rows = conn.execute(
+        """SELECT j.* FROM jobs j
+           LEFT JOIN job_fingerprints f ON f.job_id = j.job_id
+           WHERE f.job_id IS NULL
+           LIMIT ?""",
+        (limit,),
+    ).fetchall()
+    conn.close()
+    return rows
+
+
+@_operation
+def get_query_schedules(location):
+    """Return {keyword: row} of adaptive scan schedules for a location."""
     conn = _get_conn()
-    conn.execute("UPDATE jobs SET status = ? WHERE job_id = ?", (status, job_id))
+    rows = conn.execute(
+        "SELECT * FROM query_schedule WHERE location = ?", (location,)
+    ).fetchall()
+    conn.close()
+    return {row["keyword"]: row for row in rows}
+
+
+@_operation
+def save_query_schedule(keyword, location, interval_minutes, rate_ewma, last_run_at, next_run_at):
+    conn = _get_conn()
+    conn.execute(
+        """INSERT OR REPLACE INTO query_schedule
+           (keyword, location, interval_minutes, rate_ewma, last_run_at, next_run_at)
+           VALUES (?, ?, ?, ?, ?, ?)""",
+        (keyword, location, interval_minutes, rate_ewma, last_run_at, next_run_at),
+    )
     conn.commit()
     conn.close()
 
 
-def get_setting(key):
+@_operation
+def get_allocator_stats(location):
+    """Return {(keyword, page): (pulls, yield)} of decayed fetch statistics."""
     conn = _get_conn()
-    row = conn.execute("SELECT value FROM settings WHERE key = ?", (key,)).fetchone()
+    rows = conn.execute(
+        "SELECT keyword, page, pulls, yield FROM allocator_stats WHERE location = ?",
+        (location,),
+    ).fetchall()
+    conn.close()
+    return {(row["keyword"], row["page"]): (row["pulls"], row["yield"]) for row in rows}
+
+
+@_operation
+def save_allocator_stats(location, entries):
+    """Store (keyword, page, pulls, yield) entries for a location."""
+    conn = _get_conn()
+    conn.executemany(
+        """INSERT OR REPLACE INTO allocator_stats (keyword, location, page, pulls, yield)
+           VALUES (?, ?, ?, ?, ?)""",
+        [(keyword, location, page, pulls, total) for keyword, page, pulls, total in entries],
+    )
+    conn.commit()
+    conn.close()
+
+
+# --- Scan checkpoints ---
+
+@_operation
+def create_scan(instance, keywords, location, timeframe):
+    """Start a scan record. This instance's scans still marked running are superseded and dropped."""
+    conn = _get_conn()
+    running = "SELECT id FROM scans WHERE status = 'running' AND instance = ?"
+    for table in ("scan_units", "scan_jobs", "scan_alerts"):
+        conn.execute(f"DELETE FROM {table} WHERE scan_id IN ({running})", (instance,))
+    conn.execute(
+        "UPDATE scans SET status = 'superseded' WHERE status = 'running' AND instance = ?", (instance,)
+    )
+    cur = conn.execute(
+        "INSERT INTO scans (instance, keywords, location, timeframe) VALUES (?, ?, ?, ?)",
+        (instance, json.dumps(keywords), location, timeframe),
+    )
+    conn.commit()
+    scan_id = cur.lastrowid
+    conn.close()
+    return scan_id
+
+
+@_operation
+def get_running_scan(instance):
+    """Return this instance's most recent scan that never finished, or None."""
+    conn = _get_conn()
+    row = conn.execute(
+        "SELECT * FROM scans WHERE status = 'running' AND instance = ? ORDER BY id DESC LIMIT 1",
+        (instance,),
+    ).fetchone()
+    conn.close()
+    return row
+
+
+@_operation
+def save_scan_unit(scan_id, keyword, page, new_jobs, jobs):
+    """Record a fetched (keyword, page) unit and the jobs it found in one transaction."""
+    conn = _get_conn()
+    seq = conn.execute(
+        "SELECT COUNT(*) FROM scan_jobs WHERE scan_id = ?", (scan_id,)
+    ).fetchone()[0]
+    conn.executemany(
+        "INSERT OR IGNORE INTO scan_jobs (scan_id, job_id, job, seq) VALUES (?, ?, ?, ?)",
+        [(scan_id, job.job_id, json.dumps(job.to_dict()), seq + i) for i, job in enumerate(jobs)],
+    )
+    conn.execute(
+        "INSERT OR REPLACE INTO scan_units (scan_id, keyword, page, new_jobs) VALUES (?, ?, ?, ?)",
+        (scan_id, keyword, page, new_jobs),
+    )
+    conn.commit()
+    conn.close()
+
+
+@_operation
+def get_scan_units(scan_id):
+    conn = _get_conn()
+    rows = conn.execute(
+        "SELECT keyword, page, new_jobs FROM scan_units WHERE scan_id = ? ORDER BY page",
+        (scan_id,),
+    ).fetchall()
+    conn.close()
+    return rows
+
+
+@_operation
+def get_scan_jobs(scan_id):
+    conn = _get_conn()
+    rows = conn.execute(
+        "SELECT job FROM scan_jobs WHERE scan_id = ? ORDER BY seq",
+        (scan_id,),
+    ).fetchall()
+    conn.close()
+    return [Job.from_dict(json.loads(row["job"])) for row in rows]
+
+
+@_operation
+def get_scan_alerted(scan_id, chat_id):
+    """Job IDs this scan has already alerted (or deliberately skipped) in the chat."""
+    conn = _get_conn()
+    rows = conn.execute(
+        "SELECT job_id FROM scan_alerts WHERE scan_id = ? AND chat_id = ?",
+        (scan_id, str(chat_id)),
+    ).fetchall()
+    conn.close()
+    return {row["job_id"] for row in rows}
+
+
+@_operation
+def mark_scan_job_alerted(scan_id, job_id, chat_id):
+    conn = _get_conn()
+    conn.execute(
+        "INSERT OR IGNORE INTO scan_alerts (scan_id, chat_id, job_id) VALUES (?, ?, ?)",
+        (scan_id, str(chat_id), job_id),
+    )
+    conn.commit()
     conn.close()
-    return row["value"] if row else None
 
 
-def set_setting(key, value):
+@_operation
+def record_scan_failure(scan_id):
+    """Count one more failed run of a scan. Returns its failures so far."""
+    conn = _get_conn()
+    conn.execute("UPDATE scans SET failures = failures + 1 WHERE id = ?", (scan_id,))
+    conn.commit()
+    failures = conn.execute("SELECT failures FROM scans WHERE id = ?", (scan_id,)).fetchone()[0]
+    conn.close()
+    return failures
+
+
+@_operation
+def finish_scan(scan_id, status="done"):
+    """Mark a scan done (or abandoned) and drop its checkpoint rows."""
     conn = _get_conn()
     conn.execute(
-        "INSERT OR REPLACE INTO settings (key, value) VALUES (?, ?)",
-        (key, value),
+        "UPDATE scans SET status = ?, finished_at = CURRENT_TIMESTAMP WHERE id = ?",
+        (status, scan_id),
     )
+    for table in ("scan_units", "scan_jobs", "scan_alerts"):
+        conn.execute(f"DELETE FROM {table} WHERE scan_id = ?", (scan_id,))
+    conn.commit()
+    conn.close()
+
+
+# --- Query leases ---
+
+@_operation
+def acquire_query_leases(instance, queries, now, ttl):
+    """
+    Take this instance's fair share of the (keyword, location) queries.
+
+    Records a heartbeat, then, in one write transaction so instances never
+    race: keeps and renews leases it holds, releases any above its share
+    of len(queries) / live instances so newcomers can take them, and takes
+    unheld or expired leases up to that share. Returns the queries held.
+    """
+    conn = _get_conn()
+    conn.isolation_level = None
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        conn.execute(
+            "INSERT OR REPLACE INTO instances (instance_id, last_seen) VALUES (?, ?)", (instance, now)
+        )
+        live = conn.execute(
+            "SELECT COUNT(*) FROM instances WHERE last_seen > ?", (now - ttl,)
+        ).fetchone()[0]
+        share = -(-len(queries) // max(live, 1))
+
+        leases = {
+            (row["keyword"], row["location"]): row
+            for row in conn.execute("SELECT * FROM query_leases").fetchall()
+        }
+        held = [
+            query for query in queries
+            if query in leases and leases[query]["holder"] == instance and leases[query]["expires_at"] > now
+        ]
+        for query in held[share:]:
+            conn.execute(
+                "DELETE FROM query_leases WHERE keyword = ? AND location = ? AND holder = ?",
+                (*query, instance),
+            )
+        held = held[:share]
+        for query in queries:
+            if len(held) >= share:
+                break
+            if query in leases and leases[query]["expires_at"] > now:
+                continue
+            held.append(query)
+        conn.executemany(
+            "INSERT OR REPLACE INTO query_leases (keyword, location, holder, expires_at) VALUES (?, ?, ?, ?)",
+            [(keyword, location, instance, now + ttl) for keyword, location in held],
+        )
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    finally:
+        conn.close()
+    return held
+
+
+@_operation
+def renew_query_leases(instance, now, ttl):
+    """Heartbeat: extend every lease this instance holds. Returns how many it holds."""
+    conn = _get_conn()
+    conn.execute(
+        "INSERT OR REPLACE INTO instances (instance_id, last_seen) VALUES (?, ?)", (instance, now)
+    )
+    cur = conn.execute(
+        "UPDATE query_leases SET expires_at = ? WHERE holder = ? AND expires_at > ?",
+        (now + ttl, instance, now),
+    )
+    conn.commit()
+    conn.close()
+    return cur.rowcount
+
+
+@_operation
+def release_query_leases(instance):
+    """Give up all leases at shutdown so other instances take over at once."""
+    conn = _get_conn()
+    conn.execute("DELETE FROM query_leases WHERE holder = ?", (instance,))
+    conn.execute("DELETE FROM instances WHERE instance_id = ?", (instance,))
+    conn.commit()
+    conn.close()
+
+
+# --- Scrape work queue ---
+
+@_operation
+def enqueue_scrape_units(units):
+    """Queue (keyword, location, timeframe, page, spacing) units. Returns their ids in order."""
+    conn = _get_conn()
+    ids = [
+        conn.execute(
+            "INSERT INTO scrape_queue (keyword, location, timeframe, page, spacing) VALUES (?, ?, ?, ?, ?)",
+            unit,
+        ).lastrowid
+        for unit in units
+    ]
+    conn.commit()
+    conn.close()
+    return ids
+
+
+@_operation
+def claim_scrape_unit(worker, now, stale_before):
+    """
+    Atomically claim the oldest queued unit, or one whose claim went stale
+    (its worker died). Returns the row, or None if the queue is empty.
+    """
+    conn = _get_conn()
+    row = conn.execute(
+        """
+        UPDATE scrape_queue SET status = 'claimed', claimed_by = ?, claimed_at = ?
+        WHERE id = (
+            SELECT id FROM scrape_queue
+            WHERE status = 'queued' OR (status = 'claimed' AND claimed_at < ?)
+            ORDER BY id LIMIT 1
+        )
+        RETURNING *
+        """,
+        (worker, now, stale_before),
+    ).fetchone()
+    conn.commit()
+    conn.close()
+    return row
+
+
+@_operation
+def save_scrape_result(unit_id, jobs, rejected, blocked=False):
+    """
+    Store a unit's jobs (None for an empty, failed or blocked page) unless
+    the unit was withdrawn.
+    """
+    conn = _get_conn()
+    cur = conn.execute(
+        "UPDATE scrape_queue SET status = 'done' WHERE id = ? AND status != 'done'", (unit_id,)
+    )
+    if cur.rowcount:
+        conn.execute(
+            "INSERT OR REPLACE INTO scrape_results (unit_id, jobs, rejected, blocked) VALUES (?, ?, ?, ?)",
+            (unit_id, None if jobs is None else json.dumps([job.to_dict() for job in jobs]), rejected, int(blocked)),
+        )
+    conn.commit()
+    conn.close()
+
+
+@_operation
+def get_scrape_results(unit_ids):
+    """Return {unit_id: (jobs or None, rejected, blocked)} for the units that are done."""
+    unit_ids = list(unit_ids)
+    results = {}
+    conn = _get_conn()
+    for i in range(0, len(unit_ids), 500):
+        chunk = unit_ids[i:i + 500]
+        placeholders = ",".join("?" * len(chunk))
+        rows = conn.execute(
+            f"SELECT unit_id, jobs, rejected, blocked FROM scrape_results WHERE unit_id IN ({placeholders})",
+            chunk,
+        ).fetchall()
+        for row in rows:
+            jobs = None if row["jobs"] is None else [Job.from_dict(job) for job in json.loads(row["jobs"])]
+            results[row["unit_id"]] = (jobs, row["rejected"], bool(row["blocked"]))
+    conn.close()
+    return results
+
+
+@_operation
+def delete_scrape_units(unit_ids):
+    """Drop units and their results once the coordinator has read them or given up."""
+    unit_ids = list(unit_ids)
+    conn = _get_conn()
+    for i in range(0, len(unit_ids), 500):
+        chunk = unit_ids[i:i + 500]
+        placeholders = ",".join("?" * len(chunk))
+        conn.execute(f"DELETE FROM scrape_queue WHERE id IN ({placeholders})", chunk)
+        conn.execute(f"DELETE FROM scrape_results WHERE unit_id IN ({placeholders})", chunk)
+    conn.commit()
+    conn.close()
+
+
+@_operation
+def get_verdicts(job_ids, chat_id=None):
+    """Return cached triage verdicts as {job_id: row} for the given job IDs."""
+    job_ids = list(job_ids)
+    verdicts = {}
+    conn = _get_conn()
+    # Stay well under SQLite's bound-parameter limit
+    for i in range(0, len(job_ids), 500):
+        chunk = job_ids[i:i + 500]
+        placeholders = ",".join("?" * len(chunk))
+        if chats.is_primary(chat_id):
+            rows = conn.execute(
+                f"SELECT * FROM job_verdicts WHERE job_id IN ({placeholders})",
+                chunk,
+            ).fetchall()
+        else:
+            rows = conn.execute(
+                f"SELECT * FROM chat_verdicts WHERE chat_id = ? AND job_id IN ({placeholders})",
+                [str(chat_id), *chunk],
+            ).fetchall()
+        for row in rows:
+            verdicts[row["job_id"]] = row
+    conn.close()
+    return verdicts
+
+
+@_operation
+def save_verdicts(verdicts, chat_id=None):
+    """Cache triage verdicts given as (job_id, fit, reason) tuples."""
+    conn = _get_conn()
+    if chats.is_primary(chat_id):
+        conn.executemany(
+            "INSERT OR REPLACE INTO job_verdicts (job_id, fit, reason) VALUES (?, ?, ?)",
+            [(job_id, int(bool(fit)), reason) for job_id, fit, reason in verdicts],
+        )
+    else:
+        conn.executemany(
+            "INSERT OR REPLACE INTO chat_verdicts (chat_id, job_id, fit, reason) VALUES (?, ?, ?, ?)",
+            [(str(chat_id), job_id, int(bool(fit)), reason) for job_id, fit, reason in verdicts],
+        )
+    conn.commit()
+    conn.close()
+
+
+def _fts_query(text):
+    """Turn free text into a safe FTS5 query: every word, prefix-matched."""
+    words = re.findall(r"\w+", text)
+    return " ".join(f'"{word}"*' for word in words)
+
+
+@_operation
+def search_jobs(text, limit=5, after=None, chat_id=None):
+    """
+    Full-text search over a chat's job history, best bm25 match first.
+
+    Title hits weigh most, then company, location and description. Pages
+    are keyset-paginated: pass the (score, id) of the last row of the
+    previous page as after.
+    """
+    query = _fts_query(text)
+    if not query:
+        return []
+    last_score, last_id = after if after else (float("-inf"), 0)
+    if chats.is_primary(chat_id):
+        columns, join, scope, params = "j.*", "", "j.in_primary = 1", []
+    else:
+        columns = "j.id, j.job_id, j.title, j.company, j.location, j.url, j.posted_at, c.status, c.keyword, c.created_at"
+        join, scope, params = "JOIN chat_jobs c ON c.job_id = j.job_id", "c.chat_id = ?", [str(chat_id)]
+    conn = _get_conn()
+    rows = conn.execute(
+        f"""SELECT {columns}, s.score FROM (
+               SELECT rowid, rank AS score FROM jobs_fts
+               WHERE jobs_fts MATCH ? AND rank MATCH 'bm25(10.0, 5.0, 2.0, 1.0)'
+           ) s
+           JOIN jobs j ON j.id = s.rowid
+           {join}
+           WHERE (s.score, j.id) > (?, ?) AND {scope}
+           ORDER BY s.score, j.id
+           LIMIT ?""",
+        (query, last_score, last_id, *params, limit),
+    ).fetchall()
+    conn.close()
+    return rows
+
+
+def _chat_jobs(chat_id):
+    """
+    A chat's job history as (FROM clause, alias of its status/keyword/created_at
+    columns, WHERE clauses, parameters); postings are always alias j.
+    """
+    if chats.is_primary(chat_id):
+        return "FROM jobs j", "j", ["j.in_primary = 1"], []
+    return "FROM chat_jobs c JOIN jobs j ON j.job_id = c.job_id", "c", ["c.chat_id = ?"], [str(chat_id)]
+
+
+@_operation
+def list_jobs(status=None, keyword=None, company=None, since=None, until=None, before=None, limit=100,
+              posted_since=None, posted_until=None, chat_id=None):
+    """
+    A chat's job history newest first, on a read-only connection.
+
+    since/until bound created_at ('YYYY-MM-DD HH:MM:SS', inclusive/exclusive)
+    and posted_since/posted_until bound posted_at ('YYYY-MM-DDTHH:MM:SS');
+    jobs with no known posting time never match a posted_at bound.
+    Pages are keyset-paginated: pass the (created_at, id) of the last row
+    of the previous page as before.
+    """
+    source, s, clauses, params = _chat_jobs(chat_id)
+    for column, value in ((f"{s}.status", status), (f"{s}.keyword", keyword), ("j.company", company)):
+        if value is not None:
+            clauses.append(f"{column} = ?")
+            params.append(value)
+    for column, lower, upper in ((f"{s}.created_at", since, until), ("j.posted_at", posted_since, posted_until)):
+        if lower is not None:
+            clauses.append(f"{column} >= ?")
+            params.append(lower)
+        if upper is not None:
+            clauses.append(f"{column} < ?")
+            params.append(upper)
+    if before is not None:
+        clauses.append(f"({s}.created_at, j.id) < (?, ?)")
+        params.extend(before)
+    conn = _get_read_conn()
+    rows = conn.execute(
+        f"""SELECT j.id, j.job_id, j.title, j.company, j.location, j.url, {s}.status, {s}.keyword, {s}.created_at,
+                   j.posted_at
+            {source}
+            WHERE {' AND '.join(clauses)}
+            ORDER BY {s}.created_at DESC, j.id DESC
+            LIMIT ?""",
+        [*params, limit],
+    ).fetchall()
+    conn.close()
+    return rows
+
+
+@_operation
+def get_export_rows(after_seq=0, limit=5000, chat_id=None):
+    """
+    The next limit jobs a chat took up after position after_seq of its
+    history, in that order, joined with their details and the chat's triage
+    verdict where present. Each row's seq is its position. Read-only
+    connection.
+    """
+    source, s, clauses, params = _chat_jobs(chat_id)
+    if chats.is_primary(chat_id):
+        seq = "j.primary_seq"
+        verdicts = "LEFT JOIN job_verdicts v ON v.job_id = j.job_id"
+    else:
+        seq = "c.seq"
+        verdicts = "LEFT JOIN chat_verdicts v ON v.job_id = j.job_id AND v.chat_id = c.chat_id"
+    conn = _get_read_conn()
+    rows = conn.execute(
+        f"""SELECT {seq} AS seq, j.id, j.job_id, j.title, j.company, j.location, j.url,
+                   {s}.status, {s}.keyword, {s}.created_at,
+                   decompress(d.description) AS description, d.seniority, d.employment_type,
+                   COALESCE(j.posted_at, NULLIF(d.posted_at, '')) AS posted_at,
+                   v.fit, v.reason
+            {source}
+            LEFT JOIN job_details d ON d.job_id = j.job_id
+            {verdicts}
+            WHERE {' AND '.join(clauses)} AND {seq} > ?
+            ORDER BY {seq}
+            LIMIT ?""",
+        [*params, after_seq, limit],
+    ).fetchall()
+    conn.close()
+    return rows
+
+
+@_operation
+def get_setting(key, chat_id=None):
+    conn = _get_conn()
+    if chats.is_primary(chat_id):
+        row = conn.execute("SELECT value FROM settings WHERE key = ?", (key,)).fetchone()
+    else:
+        row = conn.execute(
+            "SELECT value FROM chat_settings WHERE chat_id = ? AND key = ?", (str(chat_id), key)
+        ).fetchone()
+    conn.close()
+    return row["value"] if row else None
+
+
+@_operation
+def set_setting(key, value, chat_id=None):
+    conn = _get_conn()
+    if chats.is_primary(chat_id):
+        conn.execute(
+            "INSERT OR REPLACE INTO settings (key, value) VALUES (?, ?)",
+            (key, value),
+        )
+    else:
+        conn.execute(
+            "INSERT OR REPLACE INTO chat_settings (chat_id, key, value) VALUES (?, ?, ?)",
+            (str(chat_id), key, value),
+        )
     conn.commit()
     conn.close()
 
 if __name__=="__main__":
-    init_db()
\ No newline at end of file
+    init_db()
@@ -0,0 +1,170 @@
+import hashlib
+import logging
+from datetime import datetime, timedelta
+
+import config
+import db
+import metrics
+import tracing
+from filters import normalize
+
+logger = logging.getLogger(__name__)
+
+# Four 16-bit bands: two hashes within 3 differing bits always share a band
+BANDS = 4
+BAND_BITS = 16
+
+# Title and company identify a role far more than boilerplate description text
+FIELD_WEIGHTS = {"title": 4, "company": 3, "location": 1}
+DESCRIPTION_SHINGLE = 3
+
+
+def _feature_hash(feature):
+    digest = hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big")
+
+
+def _features(job):
+    features = {}
+    for field, weight in FIELD_WEIGHTS.items():
+        tokens = normalize(job.get(field) or "")
+        for token in tokens:
+            key = f"{field}:{token}"
+            features[key] = features.get(key, 0) + weight
+        for pair in zip(tokens, tokens[1:]):
+            key = f"{field}:{' '.join(pair)}"
+            features[key] = features.get(key, 0) + weight
+
+    tokens = normalize(job.get("description") or "")
+    for i in range(len(tokens) - DESCRIPTION_SHINGLE + 1):
+        key = "desc:" + " ".join(tokens[i:i + DESCRIPTION_SHINGLE])
+        features[key] = features.get(key, 0) + 1
+    return features
+
+
+def simhash(job):
+    """64-bit SimHash over normalized title, company, location and description."""
+    totals = [0] * 64
+    for feature, weight in _features(job).items():
+        h = _feature_hash(feature)
+        for bit in range(64):
+            totals[bit] += weight if h >> bit & 1 else -weight
+    value = 0
+    for bit, total in enumerate(totals):
+        if total > 0:
+            value |= 1 << bit
+    return value
+
+
+def bands(value):
+    mask = (1 << BAND_BITS) - 1
+    return tuple(value >> (i * BAND_BITS) & mask for i in range(BANDS))
+
+
+def _to_signed(value):
+    """SQLite integers are signed 64-bit."""
+    return value - (1 << 64) if value >= 1 << 63 else value
+
+
+def _from_signed(value):
+    return value + (1 << 64) if value < 0 else value
+
+
+def hamming(a, b):
+    return bin(a ^ b).count("1")
+
+
+def find_near_duplicate(job, value, chat_id=None):
+    """Return the job this one reposts, if the chat viewed, ignored or was recently alerted to it."""
+    cutoff = (datetime.utcnow() - timedelta(days=config.NEAR_DUP_WINDOW_DAYS)).strftime("%Y-%m-%d %H:%M:%S")
+    for row in db.find_fingerprint_candidates(bands(value), job["job_id"], chat_id):
+        if hamming(value, _from_signed(row["simhash"])) > config.NEAR_DUP_MAX_DISTANCE:
+            continue
+        if row["status"] in ("viewed", "ignored"):
+            return row
+        if row["status"] == "pending" and row["created_at"] >= cutoff:
+            return row
+    return None
+
+
+@tracing.traced("dedup")
+def suppress_near_duplicates(jobs, chat_id=None):
+    """
+    Drop jobs that repost something the chat has already seen.
+
+    A repost of a viewed or ignored job is saved with that same status, and
+    a repost of a pending one as suppressed, so later scans skip it on the
+    cheap exact job_id check. Near-duplicates within the same batch keep
+    only the first occurrence. Jobs that are already stored were judged
+    when first seen and pass through.
+    """
+    stored = db.get_job_statuses((job["job_id"] for job in jobs), chat_id)
+    kept = []
+    batch_hashes = []
+    merged = 0
+    for job in jobs:
+        value = simhash(job)
+        job["simhash"] = value
+
+        if job["job_id"] in stored:
+            kept.append(job)
+            batch_hashes.append(value)
+            continue
+
+        if any(hamming(value, other) <= config.NEAR_DUP_MAX_DISTANCE for other in batch_hashes):
+            metrics.DEDUP_SUPPRESSED.inc("batch")
+            continue
+
+        match = find_near_duplicate(job, value, chat_id)
+        if match is None:
+            kept.append(job)
+            batch_hashes.append(value)
+            continue
+
+        metrics.DEDUP_SUPPRESSED.inc("repost")
+        merge = match["status"] in ("viewed", "ignored")
+        db.insert_job(
+            job_id=job["job_id"],
+            title=job["title"],
+            company=job["company"],
+            location=job["location"],
+            url=job["url"],
+            status=match["status"] if merge else "suppressed",
+            keyword=job.get("keyword"),
+            posted_at=job.get("posted_at"),
+            chat_id=chat_id,
+        )
+        record_fingerprint(job)
+        merged += merge
+
+    if len(kept) < len(jobs):
+        logger.info(
+            f"Near-duplicates: suppressed {len(jobs) - len(kept)} of {len(jobs)} jobs "
+            f"({merged} merged into viewed/ignored originals)."
+        )
+    return kept
+
+
+def _fingerprint_entry(job):
+    value = job.get("simhash")
+    if value is None:
+        value = simhash(job)
+    return job["job_id"], _to_signed(value), bands(value)
+
+
+def record_fingerprint(job):
+    db.save_fingerprints([_fingerprint_entry(job)])
+
+
+def backfill_fingerprints(batch_size=1000):
+    """Fingerprint jobs stored before the index existed. Returns the number added."""
+    total = 0
+    while True:
+        rows = db.get_unfingerprinted_jobs(batch_size)
+        if not rows:
+            break
+        db.save_fingerprints([_fingerprint_entry(dict(row)) for row in rows])
+        total += len(rows)
+    if total:
+        logger.info(f"Fingerprinted {total} existing jobs.")
+    return total
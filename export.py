@@ -0,0 +1,148 @@
+import argparse
+import csv
+import json
+import logging
+import os
+from datetime import datetime
+
+import config
+import db
+
+logger = logging.getLogger(__name__)
+
+FORMATS = ("csv", "ndjson", "parquet")
+COLUMNS = [
+    "id", "job_id", "title", "company", "location", "url", "status", "keyword", "created_at",
+    "description", "seniority", "employment_type", "posted_at", "fit", "reason",
+]
+# Rows read and written per step; memory use is bounded by one chunk
+CHUNK_ROWS = 5000
+
+
+class _CsvWriter:
+    def __init__(self, path):
+        self._file = open(path, "w", newline="", encoding="utf-8")
+        self._writer = csv.DictWriter(self._file, COLUMNS)
+        self._writer.writeheader()
+
+    def write(self, records):
+        self._writer.writerows(records)
+
+    def close(self):
+        self._file.close()
+
+
+class _NdjsonWriter:
+    def __init__(self, path):
+        self._file = open(path, "w", encoding="utf-8")
+
+    def write(self, records):
+        self._file.writelines(json.dumps(record, ensure_ascii=False) + "\n" for record in records)
+
+    def close(self):
+        self._file.close()
+
+
+class _ParquetWriter:
+    """One row group per chunk, so a file of any size is written chunk by chunk."""
+
+    def __init__(self, path):
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError:
+            raise RuntimeError("Parquet export needs pyarrow: pip install pyarrow") from None
+        types = {"id": pyarrow.int64(), "fit": pyarrow.bool_()}
+        self._pyarrow = pyarrow
+        self._schema = pyarrow.schema([(name, types.get(name, pyarrow.string())) for name in COLUMNS])
+        self._writer = pyarrow.parquet.ParquetWriter(path, self._schema, compression="zstd")
+
+    def write(self, records):
+        self._writer.write_table(self._pyarrow.Table.from_pylist(records, schema=self._schema))
+
+    def close(self):
+        self._writer.close()
+
+
+_WRITERS = {"csv": _CsvWriter, "ndjson": _NdjsonWriter, "parquet": _ParquetWriter}
+
+
+def _record(row):
+    record = dict(row)
+    del record["seq"]
+    if record["fit"] is not None:
+        record["fit"] = bool(record["fit"])
+    return record
+
+
+def _watermark_key(fmt):
+    return f"export_watermark_{fmt}"
+
+
+def default_path(fmt):
+    """data/exports/jobs-<UTC timestamp>.<format>, next to the database; unique down to the microsecond."""
+    directory = os.path.join(os.path.dirname(config.DB_PATH), "exports")
+    return os.path.join(directory, f"jobs-{datetime.utcnow():%Y%m%dT%H%M%S-%f}.{fmt}")
+
+
+def export_jobs(path, fmt="csv", incremental=False, chunk_rows=CHUNK_ROWS, chat_id=None):
+    """
+    Stream a chat's job history (the primary chat's by default), with
+    details and its triage verdicts where present, to path in chunks of
+    chunk_rows. Rows are read on read-only connections, in id order.
+
+    With incremental, only jobs stored since the chat's last incremental
+    export in this format are written, and its watermark moves forward once
+    the file is complete. The file appears at path only when fully written.
+
+    Returns (rows written, position in the chat's history exported up to).
+    """
+    if fmt not in _WRITERS:
+        raise ValueError(f"Unknown export format '{fmt}'; use one of {', '.join(FORMATS)}")
+    after_seq = int(db.get_setting(_watermark_key(fmt), chat_id) or 0) if incremental else 0
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    partial = f"{path}.partial"
+    writer = _WRITERS[fmt](partial)
+    count, last_seq = 0, after_seq
+    try:
+        while True:
+            rows = db.get_export_rows(last_seq, chunk_rows, chat_id)
+            if not rows:
+                break
+            writer.write([_record(row) for row in rows])
+            count += len(rows)
+            last_seq = rows[-1]["seq"]
+    except BaseException:
+        writer.close()
+        os.remove(partial)
+        raise
+    writer.close()
+    os.replace(partial, path)
+
+    if incremental:
+        db.set_setting(_watermark_key(fmt), str(last_seq), chat_id)
+    logger.info(f"Exported {count} jobs to {path}.")
+    return count, last_seq
+
+
+def main_cli(argv=None):
+    parser = argparse.ArgumentParser(description="Export job history for offline analysis.")
+    parser.add_argument("--format", choices=FORMATS, default="csv")
+    parser.add_argument("--output", help="file to write (default: data/exports/jobs-<timestamp>.<format>)")
+    parser.add_argument("--incremental", action="store_true",
+                        help="only jobs stored since the last incremental export in this format")
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS, help="rows per read/write step")
+    parser.add_argument("--chat", help="chat whose history to export (default: TELEGRAM_CHAT_ID)")
+    args = parser.parse_args(argv)
+
+    db.init_db()
+    path = args.output or default_path(args.format)
+    count, last_seq = export_jobs(path, args.format, args.incremental, args.chunk_rows, args.chat)
+    print(f"Exported {count} jobs to {path} (watermark {last_seq})")
+    return 0
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+    raise SystemExit(main_cli())
@@ -0,0 +1,149 @@
+import json
+import re
+import unicodedata
+
+import chats
+import db
+
+FIELDS = ("title", "company", "location", "any")
+ACTIONS = ("include", "exclude")
+JOB_FIELDS = ("title", "company", "location")
+
+SETTINGS_KEY = "filter_rules"
+
+
+def normalize(text):
+    """Lowercase, strip accents and punctuation, and split into word tokens."""
+    text = unicodedata.normalize("NFKD", text)
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    return tuple(re.findall(r"[a-z0-9]+", text.lower()))
+
+
+class JobFilter:
+    """
+    Include/exclude rules compiled into one phrase index per field.
+
+    Each rule pattern is a word phrase ("intern", "talent acquisition").
+    Matching looks up every word n-gram of a field in a set, so the cost
+    depends on the length of the field text, not on the number of rules.
+
+    A job is rejected if any exclude rule matches. If include rules exist
+    for a field, the job must also match at least one of them.
+    """
+
+    def __init__(self, rules):
+        self.rules = rules
+        # (action, field) -> set of token tuples
+        self._phrases = {}
+        self._max_len = {}
+        for rule in rules:
+            tokens = normalize(rule["pattern"])
+            if not tokens:
+                continue
+            key = (rule["action"], rule["field"])
+            self._phrases.setdefault(key, set()).add(tokens)
+            self._max_len[key] = max(self._max_len.get(key, 0), len(tokens))
+
+    def _matches(self, key, tokens):
+        phrases = self._phrases.get(key)
+        if not phrases:
+            return False
+        max_len = self._max_len[key]
+        for start in range(len(tokens)):
+            for end in range(start + 1, min(start + max_len, len(tokens)) + 1):
+                if tokens[start:end] in phrases:
+                    return True
+        return False
+
+    def rejects(self, job):
+        if not self._phrases:
+            return False
+
+        tokens = {field: normalize(job.get(field) or "") for field in JOB_FIELDS}
+
+        for field in JOB_FIELDS:
+            if self._matches(("exclude", field), tokens[field]):
+                return True
+            if self._matches(("exclude", "any"), tokens[field]):
+                return True
+
+        for field in JOB_FIELDS:
+            if ("include", field) in self._phrases and not self._matches(("include", field), tokens[field]):
+                return True
+        if ("include", "any") in self._phrases:
+            if not any(self._matches(("include", "any"), tokens[field]) for field in JOB_FIELDS):
+                return True
+
+        return False
+
+
+class CombinedFilter:
+    """Rejects a job only if every one of the given filters rejects it."""
+
+    def __init__(self, job_filters):
+        self.job_filters = job_filters
+
+    def rejects(self, job):
+        return all(job_filter.rejects(job) for job_filter in self.job_filters)
+
+
+def get_rules(chat_id=None):
+    raw = db.get_setting(SETTINGS_KEY, chat_id)
+    return json.loads(raw) if raw else []
+
+
+def _save_rules(rules, chat_id=None):
+    db.set_setting(SETTINGS_KEY, json.dumps(rules), chat_id)
+
+
+def add_rule(action, field, pattern, chat_id=None):
+    if action not in ACTIONS:
+        raise ValueError(f"Unknown action: {action}")
+    if field not in FIELDS:
+        raise ValueError(f"Unknown field: {field}")
+    if not normalize(pattern):
+        raise ValueError("Pattern must contain at least one word")
+
+    rules = get_rules(chat_id)
+    rule = {"action": action, "field": field, "pattern": pattern.strip()}
+    if rule not in rules:
+        rules.append(rule)
+        _save_rules(rules, chat_id)
+    return rules
+
+
+def remove_rule(index, chat_id=None):
+    """Remove a rule by its 1-based position in get_rules(). Returns the removed rule."""
+    rules = get_rules(chat_id)
+    if not 1 <= index <= len(rules):
+        raise IndexError(f"No rule #{index}")
+    removed = rules.pop(index - 1)
+    _save_rules(rules, chat_id)
+    return removed
+
+
+# chat key -> (raw rules JSON, compiled filter)
+_compiled = {}
+
+
+def load_filter(chat_id=None):
+    """Return a chat's compiled filter, recompiling only when its stored rules change."""
+    key = None if chats.is_primary(chat_id) else str(chat_id)
+    raw = db.get_setting(SETTINGS_KEY, chat_id)
+    cached = _compiled.get(key)
+    if cached is None or cached[0] != raw:
+        cached = (raw, JobFilter(json.loads(raw) if raw else []))
+        _compiled[key] = cached
+    return cached[1]
+
+
+def load_scrape_filter():
+    """
+    The filter applied to search cards while scraping. Shared scrapes serve
+    several chats, so a card is dropped only if every chat's rules reject it;
+    each chat's own rules are applied again when its alerts are built.
+    """
+    chat_filters = [load_filter(chat_id) for chat_id in chats.all_chats()] or [load_filter()]
+    if len(chat_filters) == 1:
+        return chat_filters[0]
+    return CombinedFilter(chat_filters)
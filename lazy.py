@@ -0,0 +1,28 @@
+import importlib.util
+import sys
+import threading
+
+_lock = threading.Lock()
+
+
+def lazy_import(name):
+    """
+    Return module `name`, executing it only when one of its attributes is
+    first used. Keeps heavy dependencies (ollama, bs4, requests) off the
+    startup path of code that may never need them.
+
+    The module is registered in sys.modules right away, so later plain
+    imports and mock.patch("module.attr") see the same object.
+    """
+    with _lock:
+        if name in sys.modules:
+            return sys.modules[name]
+        spec = importlib.util.find_spec(name)
+        if spec is None:
+            raise ModuleNotFoundError(f"No module named '{name}'", name=name)
+        loader = importlib.util.LazyLoader(spec.loader)
+        spec.loader = loader
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[name] = module
+        loader.exec_module(module)
+        return module
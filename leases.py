@@ -0,0 +1,34 @@
+import logging
+import time
+
+import config
+import db
+
+logger = logging.getLogger(__name__)
+
+
+def acquire(keywords, location, now=None):
+    """
+    The keywords this instance should scan in location.
+
+    Queries are split evenly across live instances through leases in the
+    shared database. A lease lapses LEASE_SECONDS after its holder's last
+    heartbeat, and another instance then takes it over.
+    """
+    now = time.time() if now is None else now
+    queries = [(keyword, location) for keyword in sorted(keywords)]
+    held = db.acquire_query_leases(config.INSTANCE_ID, queries, now, config.LEASE_SECONDS)
+    held_keywords = {keyword for keyword, _ in held}
+    if len(held) < len(queries):
+        logger.info(f"Instance {config.INSTANCE_ID} holds {len(held)}/{len(queries)} queries in {location}.")
+    return [keyword for keyword in keywords if keyword in held_keywords]
+
+
+def heartbeat(now=None):
+    """Keep this instance's leases alive while a long scan runs."""
+    now = time.time() if now is None else now
+    return db.renew_query_leases(config.INSTANCE_ID, now, config.LEASE_SECONDS)
+
+
+def release():
+    db.release_query_leases(config.INSTANCE_ID)
@@ -0,0 +1,41 @@
+import logging
+import time
+
+import config
+import db
+import metrics
+import scraper
+
+logger = logging.getLogger(__name__)
+
+
+def check_pending(batch_size=None, should_stop=None):
+    """
+    Probe one bounded batch of pending postings and mark the closed ones
+    expired in every chat.
+
+    Postings never checked come first, then the least recently checked;
+    none is checked again within LIVENESS_RECHECK_HOURS. Inconclusive
+    checks count as checks, so a posting that keeps failing doesn't hold up
+    the rest. Checks skipped because should_stop() became true are not
+    recorded and come first next time.
+
+    Returns (postings checked, jobs expired).
+    """
+    batch_size = config.LIVENESS_BATCH_SIZE if batch_size is None else batch_size
+    now = time.time()
+    job_ids = db.get_liveness_candidates(now - config.LIVENESS_RECHECK_HOURS * 3600, batch_size)
+    if not job_ids:
+        return 0, 0
+
+    results = scraper.LinkedInJobScraper().check_liveness(job_ids, config.LIVENESS_WORKERS, should_stop)
+    db.save_liveness_checks(results.items(), now)
+    expired = db.expire_jobs(job_id for job_id, live in results.items() if live is False)
+    metrics.JOBS_EXPIRED.inc(amount=expired)
+
+    inconclusive = sum(1 for live in results.values() if live is None)
+    logger.info(
+        f"Liveness: checked {len(results)}/{len(job_ids)} pending postings, "
+        f"expired {expired} jobs, {inconclusive} inconclusive."
+    )
+    return len(results), expired
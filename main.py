@@ -1,15 +1,28 @@
 import asyncio
 import logging
+import random
 import signal
-import sys
+import time
+from datetime import datetime, timedelta
 
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 
+import api
+import breakers
 import config
 import db
+import dedup
+import leases
+import liveness
+import metrics
+import pipeline
+import planner
 import resume_parser
+import scheduling
 import scraper
 import telegram_bot
+import workers
+from checkpoint import ScanCheckpoint
 
 logging.basicConfig(
     level=logging.INFO,
@@ -18,68 +31,98 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
-async def run_job_scan(application):
-    """Scrape LinkedIn, save new jobs, and send Telegram alerts."""
-    # Read live settings from DB each scan
-    keywords_str = db.get_setting("keywords")
-    location = db.get_setting("location")
-    timeframe = db.get_setting("timeframe") or "r604800"
+async def _run_checkpointed(application, checkpoint, subscribers, spread):
+    """Run one scan group. Returns (found, sent), or None if it failed or was interrupted."""
+    try:
+        result = await pipeline.run_scan(application, checkpoint, spread_seconds=spread, subscribers=subscribers)
+    except breakers.CircuitOpen as e:
+        # Not the scan's fault; it resumes once LinkedIn answers again
+        logger.warning(f"Scan skipped: {e}")
+        return None
+    except Exception as e:
+        failures = checkpoint.record_failure()
+        if failures >= config.SCAN_MAX_FAILURES:
+            # Resuming it forever would keep every other due query waiting
+            checkpoint.abandon()
+            logger.error(f"Scan failed {failures} times; abandoning it: {e}")
+        else:
+            logger.error(f"Scan failed, will resume on the next run: {e}")
+        return None
+    if result is None:
+        logger.info("Scan interrupted by shutdown; progress is checkpointed.")
+    return result
+
 
-    if not keywords_str:
+async def run_job_scan(application):
+    """Scrape LinkedIn for queries that are due, save new jobs, and send Telegram alerts."""
+    # Read live settings of every chat each scan; identical queries are scraped once
+    groups = planner.plan()
+    if not groups:
         logger.warning("No keywords set. Skipping scan. Use /keywords in Telegram.")
         return
-    if not location:
-        logger.warning("No location set. Skipping scan. Use /location in Telegram.")
-        return
 
-    keywords = [k.strip() for k in keywords_str.split(",") if k.strip()]
-    logger.info(f"Starting job scan — keywords: {keywords}, location: {location}, timeframe: {timeframe}")
+    # Pace this scan's fetches over most of the tick rather than bursting them
+    spread = config.SCAN_TICK_MINUTES * 60 * config.SCAN_SPREAD_FRACTION
+    found = sent = 0
 
-    try:
-        new_jobs = scraper.scrape_new_jobs(keywords, location, timeframe)
-    except Exception as e:
-        logger.error(f"Scraping failed: {e}")
-        return
+    async with pipeline.scan_lock:
+        checkpoint = ScanCheckpoint.interrupted()
+        if checkpoint:
+            logger.info(f"Resuming interrupted scan — keywords: {checkpoint.keywords}, location: {checkpoint.location}")
+            subscribers = groups.get((checkpoint.location, checkpoint.timeframe), {})
+            result = await _run_checkpointed(application, checkpoint, subscribers, spread)
+            if result is None:
+                return
+            found, sent = result
+        else:
+            due = []
+            for (location, timeframe), subscribers in groups.items():
+                keywords = scheduling.due_keywords(leases.acquire(list(subscribers), location), location)
+                if keywords:
+                    due.append((location, timeframe, {keyword: subscribers[keyword] for keyword in keywords}))
 
-    sent = 0
-    for job in new_jobs:
-        db.insert_job(
-            job_id=job["job_id"],
-            title=job["title"],
-            company=job["company"],
-            location=job["location"],
-            url=job["url"],
-            status="pending",
-        )
+            for location, timeframe, subscribers in due:
+                keywords = list(subscribers)
+                logger.info(f"Starting job scan — keywords: {keywords}, location: {location}, timeframe: {timeframe}")
+                checkpoint = ScanCheckpoint.start(keywords, location, timeframe)
+                result = await _run_checkpointed(application, checkpoint, subscribers, spread / len(due))
+                if result is None:
+                    return
+                found += result[0]
+                sent += result[1]
+            if not due:
+                return
 
-        try:
-            await telegram_bot.send_job_alert(application, job)
-            sent += 1
-        except Exception as e:
-            logger.error(f"Failed to send alert for {job['title']}: {e}")
+    logger.info(
+        f"Scan complete. Found {found} new jobs, sent {sent} alerts. "
+        f"LinkedIn request rate: {scraper.rate_limiter.requests_per_minute():.1f}/min."
+    )
 
-    logger.info(f"Scan complete. Found {len(new_jobs)} new jobs, sent {sent} alerts.")
 
+async def run_liveness_check():
+    """Expire pending jobs whose postings have closed, in the gaps between scans."""
+    if pipeline.scan_lock.locked():
+        logger.info("Scan running; skipping this liveness check.")
+        return
 
-async def main():
-    # 1. Initialize database
-    db.init_db()
-    logger.info("Database initialized.")
+    def scan_waiting():
+        # Yield to a scan (or shutdown) as soon as it starts
+        return pipeline.scan_lock.locked() or scraper.stop_event.is_set()
 
-    # 2. Parse resume and seed initial settings
-    logger.info("Loading candidate profile...")
     try:
-        profile, keywords = resume_parser.get_or_create_profile()
+        await asyncio.to_thread(liveness.check_pending, None, scan_waiting)
     except Exception as e:
-        logger.error(f"Failed to parse resume: {e}")
-        sys.exit(1)
+        logger.error(f"Liveness check failed: {e}")
+
 
+def _seed_settings(keywords):
+    """Fill in keywords, location and timeframe the first time the radar runs."""
     # Seed keywords from resume if not already set
-    if not db.get_setting("keywords"):
+    if db.get_setting("keywords"):
+        logger.info(f"Using existing keywords: {db.get_setting('keywords')}")
+    elif keywords:
         db.set_setting("keywords", ",".join(keywords))
         logger.info(f"Initial keywords from resume: {keywords}")
-    else:
-        logger.info(f"Using existing keywords: {db.get_setting('keywords')}")
 
     # Seed location from config if not already set
     if not db.get_setting("location"):
@@ -95,37 +138,135 @@ async def main():
     else:
         logger.info(f"Using existing timeframe: {db.get_setting('timeframe')}")
 
-    # 3. Create Telegram bot application
-    application = telegram_bot.create_application()
 
-    # 4. Set up scheduler
-    scheduler = AsyncIOScheduler()
+async def _prepare_settings(application):
+    """Fingerprint backfill, loading the resume profile (which may need Ollama) and seeding settings."""
+    try:
+        added = await asyncio.to_thread(dedup.backfill_fingerprints)
+    except Exception as e:
+        # Only reposts of older jobs go unmatched; retried on the next start
+        logger.error(f"Fingerprint backfill failed: {e}")
+    else:
+        if added:
+            logger.info(f"Fingerprinted {added} jobs stored before near-dup detection.")
+
+    logger.info("Loading candidate profile...")
+    try:
+        profile, keywords = await asyncio.to_thread(resume_parser.get_or_create_profile)
+    except Exception as e:
+        # Keep serving: saved keywords still scan, and /profile refresh can fix the profile
+        logger.error(f"Failed to load resume profile: {e}")
+        keywords = []
+        try:
+            await application.bot.send_message(
+                chat_id=config.TELEGRAM_CHAT_ID,
+                text=f"Couldn't load your resume profile: {e}\nUse /profile refresh <Google Docs links> to retry.",
+            )
+        except Exception as send_error:
+            logger.error(f"Failed to report profile error: {send_error}")
+    _seed_settings(keywords)
+
+
+async def _deferred_startup(application, scheduler):
+    """
+    Work that used to hold up startup, done once the bot already answers:
+    preparing settings, then scheduling scans.
+    """
+    try:
+        await _prepare_settings(application)
+    except Exception as e:
+        # Scans must start regardless; they run on whatever settings are saved
+        logger.error(f"Startup preparation failed; scanning with saved settings: {e}")
+
+    # Each tick scans only the queries that are due; per-query intervals
+    # adapt to their yield (see scheduling.py)
     scheduler.add_job(
         run_job_scan,
         "interval",
-        minutes=config.SCRAPE_INTERVAL_MINUTES,
+        minutes=config.SCAN_TICK_MINUTES,
         args=[application],
+        max_instances=1,
+        coalesce=True,
+        # First scan after a random delay, so restarts don't all fire at once
+        next_run_time=datetime.now() + timedelta(seconds=random.uniform(0, config.STARTUP_JITTER_SECONDS)),
+    )
+    logger.info(
+        f"Scans scheduled. Query intervals adapt between "
+        f"{config.SCAN_MIN_INTERVAL_MINUTES:g} and {config.SCAN_MAX_INTERVAL_MINUTES:g} minutes."
     )
 
-    # 5. Start everything
+
+def _report_startup_failure(task):
+    """Done callback: a failed deferred startup means no scans, so never let it pass silently."""
+    if not task.cancelled() and task.exception() is not None:
+        logger.error(f"Deferred startup failed; no scans are scheduled: {task.exception()!r}")
+
+
+async def _stop_scans(scheduler):
+    """
+    Wait up to SHUTDOWN_GRACE_SECONDS for the in-flight scan, already told to
+    stop, to reach a checkpoint, then shut the scheduler down.
+    """
+    # No new runs meanwhile; shutdown() itself would cancel the running scan
+    # mid-alert, before the checkpoint records it
+    scheduler.pause()
+    try:
+        await asyncio.wait_for(pipeline.scan_lock.acquire(), config.SHUTDOWN_GRACE_SECONDS)
+    except asyncio.TimeoutError:
+        logger.warning("Scan still running at shutdown; it will resume from its last checkpoint.")
+    scheduler.shutdown(wait=False)
+
+
+async def main():
+    started = time.perf_counter()
+
+    # 1. Initialize database
+    db.init_db()
+    logger.info("Database initialized.")
+
+    # 2. Create Telegram bot application
+    application = telegram_bot.create_application()
+
+    # 3. Set up scheduler; scans are added once the profile is loaded
+    scheduler = AsyncIOScheduler()
+    # Renew query leases more often than they expire, even during a long scan
+    scheduler.add_job(leases.heartbeat, "interval", seconds=config.LEASE_SECONDS / 3)
+    if config.LIVENESS_BATCH_SIZE:
+        # First run one interval after startup, clear of the first scan
+        scheduler.add_job(
+            run_liveness_check, "interval", minutes=config.LIVENESS_INTERVAL_MINUTES, max_instances=1, coalesce=True,
+        )
+
+    # 4. Start everything
+    metrics_server = None
+    if config.METRICS_PORT:
+        metrics_server = metrics.start_server(config.METRICS_HOST, config.METRICS_PORT)
+    api_server = None
+    if config.API_PORT:
+        api_server = api.start_server(config.API_HOST, config.API_PORT)
+
+    worker_pool = None
+    if config.SCRAPE_WORKERS:
+        worker_pool = workers.start_workers(config.SCRAPE_WORKERS)
+        logger.info(f"Started {config.SCRAPE_WORKERS} scrape worker processes.")
+
     async with application:
         await application.start()
         await application.updater.start_polling()
-        logger.info("Telegram bot started.")
-
         scheduler.start()
-        logger.info(
-            f"Scheduler started. Scanning every {config.SCRAPE_INTERVAL_MINUTES} minutes."
-        )
+        logger.info(f"Telegram bot started in {time.perf_counter() - started:.2f}s.")
 
-        # Run first scan immediately
-        await run_job_scan(application)
+        # 5. Profile, settings and the first scan, without holding up the bot
+        startup = asyncio.create_task(_deferred_startup(application, scheduler))
+        startup.add_done_callback(_report_startup_failure)
 
         # Keep running until interrupted
         stop_event = asyncio.Event()
 
         def _handle_signal():
             logger.info("Shutting down...")
+            # Ask a running scan to stop at its next page fetch or alert
+            scraper.stop_event.set()
             stop_event.set()
 
         loop = asyncio.get_event_loop()
@@ -134,8 +275,16 @@ async def main():
 
         await stop_event.wait()
 
-        # Cleanup
-        scheduler.shutdown()
+        # Cleanup: let the in-flight scan reach a checkpoint, then stop
+        startup.cancel()
+        await _stop_scans(scheduler)
+        if worker_pool:
+            await asyncio.to_thread(workers.stop_workers, *worker_pool)
+        leases.release()
+        if metrics_server:
+            metrics_server.shutdown()
+        if api_server:
+            api_server.shutdown()
         await application.updater.stop()
         await application.stop()
         logger.info("Shutdown complete.")
@@ -0,0 +1,195 @@
+import bisect
+import functools
+import logging
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+logger = logging.getLogger(__name__)
+
+# Seconds; covers a fast SQLite call up to a slow LLM call
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+_registry = []
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _label_text(names, values, extra=()):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    pairs += [f'{name}="{value}"' for name, value in extra]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_number(value):
+    return f"{value:g}" if value != int(value) or abs(value) >= 1e15 else str(int(value))
+
+
+class Counter:
+    """A monotonically increasing count, optionally split by label values."""
+
+    def __init__(self, name, help, labels=()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def inc(self, *label_values, amount=1.0):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0.0) + amount
+
+    def value(self, *label_values):
+        return self._values.get(label_values, 0.0)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for label_values, value in items:
+            lines.append(f"{self.name}{_label_text(self.labels, label_values)} {_format_number(value)}")
+        return lines
+
+
+class Histogram:
+    """Observations counted into fixed cumulative buckets, with their sum and count."""
+
+    def __init__(self, name, help, labels=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [per-bucket counts (+Inf last), sum, count]
+        self._series = {}
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def observe(self, value, *label_values):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def time(self, *label_values):
+        """Context manager observing the duration of its block."""
+        return _Timer(self, label_values)
+
+    def count(self, *label_values):
+        series = self._series.get(label_values)
+        return series[2] if series else 0
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = sorted((key, (list(series[0]), series[1], series[2])) for key, series in self._series.items())
+        for label_values, (counts, total, count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = "+Inf" if bound == float("inf") else _format_number(bound)
+                labels = _label_text(self.labels, label_values, [("le", le)])
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _label_text(self.labels, label_values)
+            lines.append(f"{self.name}_sum{labels} {total:g}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+class _Timer:
+    def __init__(self, histogram, label_values):
+        self.histogram = histogram
+        self.label_values = label_values
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.start, *self.label_values)
+        return False
+
+
+def timed(histogram, *label_values):
+    """Decorator observing each call's duration in histogram."""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                histogram.observe(time.perf_counter() - start, *label_values)
+        return wrapper
+    return decorator
+
+
+def render():
+    """Every metric in the Prometheus text exposition format."""
+    lines = []
+    for metric in _registry:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+# --- Metrics recorded by the scraper, pipeline and bot ---
+
+LINKEDIN_REQUEST_SECONDS = Histogram(
+    "radar_linkedin_request_seconds", "LinkedIn request latency.", ["kind"])
+LINKEDIN_RESPONSES = Counter(
+    "radar_linkedin_responses_total", "LinkedIn responses by HTTP status (error = no response).", ["kind", "status"])
+PARSE_SECONDS = Histogram(
+    "radar_parse_seconds", "Time to parse one search page into jobs.")
+DEDUP_SUPPRESSED = Counter(
+    "radar_dedup_suppressed_total", "Near-duplicate jobs suppressed.", ["reason"])
+DB_SECONDS = Histogram(
+    "radar_db_call_seconds", "Latency of db.py operations.", ["operation"])
+TELEGRAM_SEND_SECONDS = Histogram(
+    "radar_telegram_send_seconds", "Telegram job alert send latency.")
+TELEGRAM_SEND_FAILURES = Counter(
+    "radar_telegram_send_failures_total", "Job alerts that failed to send.")
+OLLAMA_SECONDS = Histogram(
+    "radar_ollama_call_seconds", "Ollama call duration.", ["purpose"])
+SCAN_SECONDS = Histogram(
+    "radar_scan_seconds", "Duration of one scan, from first fetch to last alert.")
+SCAN_JOBS = Counter(
+    "radar_scan_jobs_total", "Jobs found by scans.")
+ALERTS_SENT = Counter(
+    "radar_alerts_sent_total", "Job alerts sent.")
+JOBS_EXPIRED = Counter(
+    "radar_jobs_expired_total", "Pending jobs marked expired after their posting closed.")
+BREAKER_TRIPS = Counter(
+    "radar_breaker_trips_total", "Times a dependency's circuit breaker opened.", ["dependency"])
+BREAKER_REJECTED = Counter(
+    "radar_breaker_rejected_total", "Calls failed fast by an open circuit breaker.", ["dependency"])
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?", 1)[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_server(host, port):
+    """Serve /metrics from a daemon thread. Returns the server; call shutdown() to stop it."""
+    server = ThreadingHTTPServer((host, port), _Handler)
+    thread = threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True)
+    thread.start()
+    logger.info(f"Metrics served at http://{host}:{server.server_address[1]}/metrics")
+    return server
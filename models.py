@@ -0,0 +1,66 @@
+import sys
+from dataclasses import dataclass, fields
+from typing import Optional
+
+
+@dataclass(slots=True)
+class Job:
+    """
+    One scraped job posting, from _parse_job_card to the alert.
+
+    Slotted, so a job carries no per-instance dict. Company, location and
+    keyword strings are interned: a scan sees the same few values over and
+    over, and every job shares one copy of each. Details and the simhash are
+    filled in later in the pipeline.
+
+    Jobs also read like the dicts they replaced (job["title"],
+    job.get("description")), so code that takes either keeps working.
+    """
+
+    job_id: str
+    title: str
+    company: str
+    location: str
+    url: str
+    keyword: Optional[str] = None
+    description: Optional[str] = None
+    seniority: Optional[str] = None
+    employment_type: Optional[str] = None
+    posted_at: Optional[str] = None
+    simhash: Optional[int] = None
+
+    def __post_init__(self):
+        self.company = sys.intern(self.company)
+        self.location = sys.intern(self.location)
+        if self.keyword is not None:
+            self.keyword = sys.intern(self.keyword)
+
+    def __getitem__(self, key):
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def __setitem__(self, key, value):
+        if key not in _FIELDS:
+            raise KeyError(key)
+        setattr(self, key, value)
+
+    def get(self, key, default=None):
+        value = getattr(self, key, None)
+        return default if value is None else value
+
+    def update(self, values):
+        for key, value in values.items():
+            self[key] = value
+
+    def to_dict(self):
+        """Set fields only, for JSON storage in checkpoints and the scrape queue."""
+        return {name: getattr(self, name) for name in _FIELDS if getattr(self, name) is not None}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(**{key: value for key, value in data.items() if key in _FIELDS})
+
+
+_FIELDS = tuple(field.name for field in fields(Job))
@@ -0,0 +1,193 @@
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta
+
+import breakers
+import chats
+import config
+import db
+import dedup
+import filters
+import metrics
+import scraper
+import telegram_bot
+import tracing
+import scheduling
+import triage
+
+logger = logging.getLogger(__name__)
+
+# Scheduled and settings-triggered scans take turns instead of overlapping
+scan_lock = asyncio.Lock()
+
+
+async def process_new_jobs(application, jobs, checkpoint=None, subscribers=None):
+    """
+    Enrich freshly scraped jobs once, then filter, de-duplicate, triage,
+    save and alert them separately for every chat that follows them.
+
+    subscribers maps keyword -> chat IDs following it; without it every
+    job goes to the primary chat. With a checkpoint, jobs it already
+    alerted to a chat are skipped and each alert is recorded as it is
+    sent, so a resumed scan never repeats one.
+
+    Returns (alerts sent, {keyword: number of jobs no chat had stored before}).
+    """
+    # search_jobs already dropped what is stale for every chat; newest-first
+    # order still spends detail page lookups on the freshest postings first
+    jobs = freshest_first(jobs)
+    by_chat = {}
+    for job in jobs:
+        if subscribers is None:
+            chat_ids = [chats.primary()]
+        else:
+            chat_ids = subscribers.get(job.keyword, [])
+        for chat_id in chat_ids:
+            by_chat.setdefault(chat_id, []).append(job)
+
+    if checkpoint is not None:
+        for chat_id, chat_jobs in by_chat.items():
+            alerted = checkpoint.alerted_ids(chat_id)
+            by_chat[chat_id] = [job for job in chat_jobs if job.job_id not in alerted]
+
+    if config.FETCH_JOB_DETAILS:
+        pending = {job.job_id: job for chat_jobs in by_chat.values() for job in chat_jobs}
+        with tracing.span("details", jobs=len(pending)):
+            await asyncio.to_thread(scraper.attach_job_details, list(pending.values()))
+
+    # A job new to one chat may be old news to another; yield counts market-new jobs only
+    known = db.get_known_job_ids(job.job_id for job in jobs)
+    sent = 0
+    new_ids = {}
+    for chat_id, chat_jobs in by_chat.items():
+        if scraper.stop_event.is_set():
+            break
+        sent += await _deliver(application, chat_id, chat_jobs, checkpoint, new_ids)
+
+    new_counts = {}
+    for job_id, keyword in new_ids.items():
+        if keyword and job_id not in known:
+            new_counts[keyword] = new_counts.get(keyword, 0) + 1
+    return sent, new_counts
+
+
+def max_posting_age_hours(chat_id=None):
+    """The chat's /freshness threshold in hours, or MAX_POSTING_AGE_HOURS. 0 means off."""
+    value = db.get_setting("max_age_hours", chat_id)
+    return float(value) if value is not None else config.MAX_POSTING_AGE_HOURS
+
+
+def _loosest_max_age_hours(subscribers=None):
+    """The most permissive /freshness threshold among a scan's chats; 0 (off) if any chat has none."""
+    if subscribers is None:
+        followers = {chats.primary()}
+    else:
+        followers = {chat_id for chat_ids in subscribers.values() for chat_id in chat_ids}
+    thresholds = [max_posting_age_hours(chat_id) for chat_id in followers]
+    return max(thresholds) if thresholds and all(thresholds) else 0
+
+
+def freshest_first(jobs, max_age_hours=0, now=None):
+    """
+    Jobs newest posting first, without those posted more than max_age_hours
+    ago. Jobs with no known posting time are kept, after the dated ones.
+    """
+    if max_age_hours:
+        now = now or datetime.utcnow()
+        cutoff = (now - timedelta(hours=max_age_hours)).replace(microsecond=0).isoformat()
+        # posted_at is ISO text, so string order is time order
+        jobs = [job for job in jobs if job.posted_at is None or job.posted_at >= cutoff]
+    return sorted(jobs, key=lambda job: job.posted_at or "", reverse=True)
+
+
+async def _deliver(application, chat_id, jobs, checkpoint, new_ids):
+    """Run one chat's share of a scan through its own state. Returns alerts sent."""
+    # Stale postings cost no DB or Telegram work; newest first also keeps the
+    # latest of a batch's reposts when near-duplicates are suppressed
+    jobs = freshest_first(jobs, max_posting_age_hours(chat_id))
+    if not jobs:
+        return 0
+    statuses = db.get_job_statuses((job.job_id for job in jobs), chat_id)
+    job_filter = filters.load_filter(chat_id)
+    jobs = [
+        job for job in jobs
+        if statuses.get(job.job_id) not in ("viewed", "ignored", "expired", "suppressed")
+        and not job_filter.rejects(job)
+    ]
+
+    if config.NEAR_DUP_ENABLED:
+        jobs = dedup.suppress_near_duplicates(jobs, chat_id)
+
+    if config.TRIAGE_ENABLED:
+        # Ollama calls block for seconds; keep the bot responsive meanwhile
+        jobs = await asyncio.to_thread(triage.triage_jobs, jobs, None, chat_id)
+
+    sent = 0
+    for job in jobs:
+        if scraper.stop_event.is_set():
+            break
+        inserted = db.insert_job_record(job, status="pending", chat_id=chat_id)
+        dedup.record_fingerprint(job)
+        if inserted:
+            new_ids[job.job_id] = job.keyword
+
+        # Another instance, or an overlapping query, may have just alerted this job
+        now = time.time()
+        if db.claim_job_alert(job.job_id, now, config.SCAN_MIN_INTERVAL_MINUTES * 60, chat_id):
+            try:
+                with metrics.TELEGRAM_SEND_SECONDS.time(), tracing.span("telegram.send", chat=str(chat_id)):
+                    await telegram_bot.send_job_alert(application, job, chat_id)
+                sent += 1
+                metrics.ALERTS_SENT.inc()
+            except breakers.CircuitOpen as e:
+                # Never sent: give the claim back, so this job and the rest, all
+                # still pending and unmarked, go out on the next scan
+                db.release_job_alert(job.job_id, now, chat_id)
+                logger.warning(f"Holding alerts for chat {chat_id}: {e}")
+                break
+            except Exception as e:
+                metrics.TELEGRAM_SEND_FAILURES.inc()
+                logger.error(f"Failed to send alert for {job.title} to chat {chat_id}: {e}")
+        if checkpoint is not None:
+            checkpoint.mark_alerted(job.job_id, chat_id)
+
+    return sent
+
+
+async def run_scan(application, checkpoint, spread_seconds=0.0, subscribers=None):
+    """
+    Scrape, process and reschedule the queries of one checkpointed scan.
+
+    Returns (jobs found, alerts sent), or None if shutdown interrupted the
+    scan. An interrupted or failed scan stays checkpointed and is resumed
+    by the next scheduled run; so does one whose page fetches the LinkedIn
+    breaker all turned away (breakers.CircuitOpen), without recording any
+    yields.
+    """
+    start = time.perf_counter()
+    with tracing.scan(f"{', '.join(checkpoint.keywords)} @ {checkpoint.location}"):
+        with tracing.span("scrape", keywords=len(checkpoint.keywords)):
+            jobs = await asyncio.to_thread(
+                scraper.scrape_new_jobs,
+                checkpoint.keywords,
+                checkpoint.location,
+                checkpoint.timeframe,
+                spread_seconds=spread_seconds,
+                checkpoint=checkpoint,
+                # Postings too old for every chat are dropped before they are
+                # checkpointed or counted as yield; _deliver applies each chat's own cut
+                max_age_hours=_loosest_max_age_hours(subscribers),
+            )
+        if scraper.stop_event.is_set():
+            return None
+
+        sent, new_counts = await process_new_jobs(application, jobs, checkpoint, subscribers)
+        if scraper.stop_event.is_set():
+            return None
+
+    scheduling.record_yields(checkpoint.keywords, checkpoint.location, new_counts)
+    checkpoint.finish()
+    metrics.SCAN_SECONDS.observe(time.perf_counter() - start)
+    metrics.SCAN_JOBS.inc(amount=len(jobs))
+    return len(jobs), sent
@@ -0,0 +1,52 @@
+import chats
+import config
+import db
+
+
+def chat_queries(chat_id=None):
+    """(keywords, location, timeframe) from a chat's settings, or None if it has no keywords."""
+    keywords_str = db.get_setting("keywords", chat_id)
+    if not keywords_str:
+        return None
+    keywords = [k.strip() for k in keywords_str.split(",") if k.strip()]
+    location = db.get_setting("location", chat_id) or config.JOB_LOCATION
+    timeframe = db.get_setting("timeframe", chat_id) or config.JOB_TIMEFRAME
+    return keywords, location, timeframe
+
+
+def plan(chat_ids=None):
+    """
+    Merge every chat's queries into one scrape per distinct query.
+
+    Returns {(location, timeframe): {keyword: [chat IDs]}}. Keywords that
+    differ only in case are the same LinkedIn search, so they are merged
+    under the first spelling seen; each scraped job is then fanned out to
+    the chats listed for its keyword.
+    """
+    groups = {}
+    spellings = {}
+    for chat_id in chat_ids if chat_ids is not None else chats.all_chats():
+        queries = chat_queries(chat_id)
+        if queries is None:
+            continue
+        keywords, location, timeframe = queries
+        subscribers = groups.setdefault((location, timeframe), {})
+        for keyword in keywords:
+            keyword = spellings.setdefault((location, timeframe, keyword.lower()), keyword)
+            chat_list = subscribers.setdefault(keyword, [])
+            if str(chat_id) not in chat_list:
+                chat_list.append(str(chat_id))
+    return groups
+
+
+def chat_subscriptions(chat_id=None):
+    """The merged query group holding a chat's own keywords: (location, timeframe, {keyword: [chat IDs]})."""
+    queries = chat_queries(chat_id)
+    if queries is None:
+        return None
+    _, location, timeframe = queries
+    chat_id = chats.primary() if chat_id is None else str(chat_id)
+    subscribers = plan().get((location, timeframe), {})
+    return location, timeframe, {
+        keyword: chat_ids for keyword, chat_ids in subscribers.items() if chat_id in chat_ids
+    }
@@ -1,11 +1,26 @@
 import json
 import re
 
-import requests
-import ollama
-
+import breakers
+import chats
 import config
 import db
+import metrics
+from lazy import lazy_import
+
+ollama = lazy_import("ollama")
+transport = lazy_import("transport")
+
+
+def _is_outage(exc):
+    """A 4xx other than 429 means Google answered: the link is wrong or not shared, not that Docs is down."""
+    response = getattr(exc, "response", None)
+    return response is None or response.status_code == 429 or response.status_code >= 500
+
+
+google_docs_breaker = breakers.breaker("google_docs", is_failure=_is_outage)
+# Shared with triage: one breaker per Ollama server
+ollama_breaker = breakers.breaker("ollama")
 
 
 def _extract_doc_id(url):
@@ -20,7 +35,11 @@ def fetch_google_doc(url):
     """Fetch plain text from a Google Doc (must be shared as 'anyone with link can view')."""
     doc_id = _extract_doc_id(url)
     export_url = f"https://docs.google.com/document/d/{doc_id}/export?format=txt"
-    resp = requests.get(export_url, timeout=30)
+    return google_docs_breaker.call(_download, export_url)
+
+
+def _download(url):
+    resp = transport.new_session().get(url, timeout=30)
     resp.raise_for_status()
     return resp.text
 
@@ -34,6 +53,15 @@ def fetch_all_resumes(links):
     return "\n\n---\n\n".join(all_text)
 
 
+def strip_code_fences(content):
+    """Strip markdown code fences that LLMs like to wrap JSON in."""
+    if content.startswith("```"):
+        lines = content.split("\n")
+        lines = [l for l in lines if not l.startswith("```")]
+        content = "\n".join(lines)
+    return content
+
+
 def parse_resume(raw_text):
     prompt = f"""You are a career analyst. Analyze this resume and return a JSON object with exactly two keys:
 
@@ -58,40 +86,46 @@ Resume:
 
 Respond ONLY with valid JSON. No markdown, no explanation."""
 
-    response = ollama.chat(
-        model=config.OLLAMA_MODEL,
-        messages=[{"role": "user", "content": prompt}],
-    )
+    with metrics.OLLAMA_SECONDS.time("resume"):
+        response = ollama_breaker.call(
+            ollama.chat,
+            model=config.OLLAMA_MODEL,
+            messages=[{"role": "user", "content": prompt}],
+        )
 
-    content = response["message"]["content"]
-
-    # Strip markdown code fences if present
-    if content.startswith("```"):
-        lines = content.split("\n")
-        lines = [l for l in lines if not l.startswith("```")]
-        content = "\n".join(lines)
+    content = strip_code_fences(response["message"]["content"])
 
     result = json.loads(content)
     return result["profile"], result["keywords"]
 
 
-def get_or_create_profile(overwrite=False):
-    existing = db.get_profile()
+def resume_links(chat_id=None):
+    """A chat's resume links: set with /profile refresh <links>, else RESUME_LINKS for the primary chat."""
+    stored = db.get_setting("resume_links", chat_id)
+    if stored:
+        return stored.split(",")
+    return config.RESUME_LINKS if chats.is_primary(chat_id) else []
+
+
+def get_or_create_profile(overwrite=False, chat_id=None):
+    existing = db.get_profile(chat_id)
     if existing and not overwrite:
         keywords = existing["keywords"].split(",")
         return existing["parsed_profile"], keywords
 
-    if not config.RESUME_LINKS:
+    links = resume_links(chat_id)
+    if not links:
         raise ValueError(
             "No resume links configured. "
-            "Set RESUME_LINKS in .env with your Google Docs URLs."
+            "Set RESUME_LINKS in .env with your Google Docs URLs, "
+            "or send /profile refresh <Google Docs links>."
         )
 
-    raw_text = fetch_all_resumes(config.RESUME_LINKS)
+    raw_text = fetch_all_resumes(links)
     parsed_profile, keywords = parse_resume(raw_text)
 
     keywords_str = ",".join(keywords)
-    db.save_profile(raw_text, parsed_profile, keywords_str)
+    db.save_profile(raw_text, parsed_profile, keywords_str, chat_id)
 
     print(f"Resume parsed. Extracted keywords: {keywords}")
     return parsed_profile, keywords
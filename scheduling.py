@@ -0,0 +1,63 @@
+import logging
+import random
+import time
+
+import config
+import db
+
+logger = logging.getLogger(__name__)
+
+# Weight of the latest observation in the per-query yield rate
+RATE_ALPHA = 0.3
+# Never change an interval by more than this factor in one step
+MAX_STEP = 2.0
+
+
+def due_keywords(keywords, location, now=None):
+    """Keywords whose query is due; queries never scanned before are always due."""
+    now = time.time() if now is None else now
+    schedules = db.get_query_schedules(location)
+    return [
+        keyword for keyword in keywords
+        if keyword not in schedules or schedules[keyword]["next_run_at"] <= now
+    ]
+
+
+def _next_interval(interval, rate):
+    """Aim for SCAN_TARGET_YIELD new jobs per scan given the observed jobs/minute."""
+    if rate > 0:
+        target = config.SCAN_TARGET_YIELD / rate
+    else:
+        target = interval * MAX_STEP
+    target = min(max(target, interval / MAX_STEP), interval * MAX_STEP)
+    return min(max(target, config.SCAN_MIN_INTERVAL_MINUTES), config.SCAN_MAX_INTERVAL_MINUTES)
+
+
+def record_yields(keywords, location, new_counts, now=None):
+    """
+    Update each scanned query's yield rate and reschedule it.
+
+    new_counts maps keyword -> number of genuinely new jobs the scan stored;
+    keywords missing from it yielded nothing.
+    """
+    now = time.time() if now is None else now
+    schedules = db.get_query_schedules(location)
+    for keyword in keywords:
+        row = schedules.get(keyword)
+        if row:
+            interval, rate, last_run_at = row["interval_minutes"], row["rate_ewma"], row["last_run_at"]
+        else:
+            interval, rate, last_run_at = float(config.SCRAPE_INTERVAL_MINUTES), 0.0, None
+
+        elapsed = (now - last_run_at) / 60 if last_run_at else interval
+        observed = new_counts.get(keyword, 0) / max(elapsed, config.SCAN_MIN_INTERVAL_MINUTES)
+        rate = observed if row is None else RATE_ALPHA * observed + (1 - RATE_ALPHA) * rate
+
+        interval = _next_interval(interval, rate)
+        # Jitter keeps queries that started together from staying in lockstep
+        delay = interval * 60 * random.uniform(1 - config.SCHEDULE_JITTER, 1 + config.SCHEDULE_JITTER)
+        db.save_query_schedule(keyword, location, interval, rate, now, now + delay)
+        logger.info(
+            f"Schedule '{keyword}' in {location}: {new_counts.get(keyword, 0)} new, "
+            f"next scan in {interval:.0f} min."
+        )
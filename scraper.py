@@ -1,19 +1,140 @@
+import random
 import re
+import threading
 import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
 from typing import List, Dict, Optional
 
-import requests
-from bs4 import BeautifulSoup
-
+import breakers
+import config
 import db
+import filters
+import metrics
+import tracing
+import workers
+from allocator import BudgetAllocator
+from lazy import lazy_import
+from models import Job
+
+# Loaded on first use: the bot answers commands without them
+bs4 = lazy_import("bs4")
+requests = lazy_import("requests")
+transport = lazy_import("transport")
+
+
+class RateLimiter:
+    """
+    Spaces out requests, shared across threads.
+
+    Each wait() reserves the next slot: at least min_interval after the
+    previous one, or a caller-chosen pacing interval when that is longer.
+    Gaps are jittered by +/- jitter so requests do not fall into a fixed
+    rhythm. Recent slots are kept to report the effective request rate.
+    """
+
+    def __init__(self, min_interval: float, jitter: float = 0.0):
+        self.min_interval = min_interval
+        self.jitter = jitter
+        self._lock = threading.Lock()
+        self._next_at = 0.0
+        self._history = deque(maxlen=10000)
+
+    def wait(self, interval: float = 0.0):
+        with self._lock:
+            now = time.monotonic()
+            start_at = max(now, self._next_at)
+            base = max(interval, self.min_interval)
+            gap = base * random.uniform(1 - self.jitter, 1 + self.jitter)
+            self._next_at = start_at + max(gap, self.min_interval)
+            self._history.append(start_at)
+        if start_at > now:
+            time.sleep(start_at - now)
+
+    def requests_per_minute(self, window: float = 300.0) -> float:
+        """Requests actually started per minute over the last window seconds."""
+        now = time.monotonic()
+        with self._lock:
+            count = sum(1 for t in self._history if now - window <= t <= now)
+        return count / (window / 60)
+
+
+# One limiter for every LinkedIn request made by this process
+rate_limiter = RateLimiter(config.REQUEST_INTERVAL_SECONDS, config.REQUEST_JITTER)
+
+# Set on shutdown; a running search stops before its next page fetch
+stop_event = threading.Event()
+
+# Opens while LinkedIn is blocking us or unreachable; every request goes through it
+linkedin_breaker = breakers.breaker("linkedin")
+# Rate limited, blocked (LinkedIn's 999) or failing server-side
+_BLOCKED_STATUSES = {429, 999, *range(500, 600)}
+
+# Shown on the posting fragment of a job that no longer takes applications
+_CLOSED_MARKERS = ("No longer accepting applications", "closed-job")
+# The closed banner sits in the top card; the rest of the page is never read
+_LIVENESS_READ_BYTES = 32 * 1024
+_SKIPPED = object()
+
+_RELATIVE_TIME_UNITS = {
+    "minute": timedelta(minutes=1),
+    "hour": timedelta(hours=1),
+    "day": timedelta(days=1),
+    "week": timedelta(weeks=1),
+    "month": timedelta(days=30),
+}
+
+
+def _parse_relative_time(text: str, now: Optional[datetime] = None) -> str:
+    """Turn LinkedIn's "3 days ago" into an approximate ISO timestamp."""
+    match = re.search(r"(\d+)\s+(minute|hour|day|week|month)s?\s+ago", text.lower())
+    if not match:
+        return ""
+    now = now or datetime.utcnow()
+    posted = now - int(match.group(1)) * _RELATIVE_TIME_UNITS[match.group(2)]
+    return posted.replace(microsecond=0).isoformat()
+
+
+def _parse_card_time(time_elem, now: Optional[datetime] = None) -> Optional[str]:
+    """
+    Posting time of a search card's <time> element as an ISO timestamp.
+
+    The datetime attribute only holds the date, so "10 minutes ago" or
+    "3 hours ago" text is used when present. Coarser text ("2 days ago") adds
+    nothing over the date, and the date keeps the value stable from one
+    scan to the next.
+    """
+    if time_elem is None:
+        return None
+    text = time_elem.get_text(strip=True)
+    if re.search(r"\b(minute|hour)s?\b", text.lower()):
+        posted = _parse_relative_time(text, now)
+        if posted:
+            return posted
+    match = re.match(r"\d{4}-\d{2}-\d{2}$", time_elem.get("datetime", ""))
+    if match:
+        return f"{match.group(0)}T00:00:00"
+    return _parse_relative_time(text, now) or None
 
 
 class LinkedInJobScraper:
     """Scrapes public LinkedIn job listings. No authentication required."""
 
     def __init__(self):
-        self.base_url = "https://www.linkedin.com/jobs/search"
-        self.session = requests.Session()
+        self.base_url = f"{config.LINKEDIN_URL}/jobs/search"
+        self.view_url = f"{config.LINKEDIN_URL}/jobs/view"
+        self.posting_url = f"{config.LINKEDIN_URL}/jobs-guest/jobs/api/jobPosting"
+        self.job_filter = filters.load_scrape_filter()
+        self.rejected = 0
+        # Search-page fetches tried, and those the LinkedIn breaker turned away
+        self.attempted = 0
+        self.blocked = 0
+        # Cards dropped as older than the scan's max_age_hours
+        self.stale = 0
+        # Pacing interval between search-page fetches, set per scan
+        self.spacing = 0.0
+        self.session = transport.new_session()
         self.session.headers.update({
             "User-Agent": (
                 "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
@@ -45,7 +166,7 @@ class LinkedInJobScraper:
             return match.group(1)
         return ""
 
-    def _parse_job_card(self, card) -> Optional[Dict]:
+    def _parse_job_card(self, card) -> Optional[Job]:
         try:
             link_elem = (
                 card.find("a", class_="base-card__full-link")
@@ -79,96 +200,384 @@ class LinkedInJobScraper:
             location = location_elem.get_text(strip=True) if location_elem else "Unknown"
 
             url = f"https://www.linkedin.com{job_link}" if job_link.startswith("/") else job_link
+            posted_at = _parse_card_time(card.find("time"))
 
-            return {
-                "job_id": job_id,
-                "title": title,
-                "company": company,
-                "location": location,
-                "url": url,
-            }
+            return Job(job_id, title, company, location, url, posted_at=posted_at)
         except Exception as e:
             print(f"Error parsing job card: {e}")
             return None
 
-    def _search_single_keyword(self, keyword: str, location: str, timeframe: str, limit: int) -> List[Dict]:
-        """Search LinkedIn for a single keyword and return new jobs."""
+    def _get(self, kind: str, url: str, pace: float = 0.0, **kwargs):
+        """
+        session.get under the shared rate limit (pace as in RateLimiter.wait),
+        with latency and status-code metrics; raises like session.get.
+
+        Raises breakers.CircuitOpen, without waiting for a request slot,
+        while LinkedIn is known to be down.
+        """
+        linkedin_breaker.guard()
+        rate_limiter.wait(pace)
+        start = time.perf_counter()
+        try:
+            with tracing.span(f"fetch.{kind}", url=url):
+                response = self.session.get(url, timeout=15, **kwargs)
+        except requests.exceptions.RequestException as e:
+            metrics.LINKEDIN_RESPONSES.inc(kind, "error")
+            linkedin_breaker.failure(e)
+            raise
+        finally:
+            metrics.LINKEDIN_REQUEST_SECONDS.observe(time.perf_counter() - start, kind)
+        metrics.LINKEDIN_RESPONSES.inc(kind, str(response.status_code))
+        if response.status_code in _BLOCKED_STATUSES:
+            linkedin_breaker.failure(f"HTTP {response.status_code}")
+        else:
+            linkedin_breaker.success()
+        return response
+
+    def _fetch_page(self, keyword: str, location: str, timeframe: str, page: int) -> Optional[List[Job]]:
+        """Fetch one search page. Returns its new jobs, or None if the page is empty or failed."""
         params = {
             "keywords": keyword,
             "location": location,
             "f_TPR": timeframe,
-            "start": 0,
+            "start": page * 25,
         }
 
-        jobs = []
-        page = 0
+        self.attempted += 1
+        try:
+            response = self._get("search", self.base_url, pace=self.spacing, params=params)
+            response.raise_for_status()
+        except breakers.CircuitOpen:
+            self.blocked += 1
+            return None
+        except requests.exceptions.RequestException as e:
+            print(f"Request error for '{keyword}': {e}")
+            return None
 
-        while len(jobs) < limit:
-            params["start"] = page * 25
+        with metrics.PARSE_SECONDS.time(), tracing.span("parse", keyword=keyword, page=page):
+            soup = bs4.BeautifulSoup(response.text, "html.parser")
+            job_cards = soup.find_all("div", class_="base-card") or \
+                        soup.find_all("div", class_="job-search-card")
+            if not job_cards:
+                return None
 
-            try:
-                response = self.session.get(self.base_url, params=params, timeout=15)
-                response.raise_for_status()
+            jobs = []
+            for card in job_cards:
+                job = self._parse_job_card(card)
+                if job is None:
+                    continue
+                if self.job_filter.rejects(job):
+                    self.rejected += 1
+                    continue
+                jobs.append(job)
+        return jobs
 
-                soup = BeautifulSoup(response.text, "html.parser")
-                job_cards = soup.find_all("div", class_="base-card") or \
-                            soup.find_all("div", class_="job-search-card")
+    def _fetch_pages(self, arms: List[tuple], location: str, timeframe: str) -> List[Optional[List[Job]]]:
+        """
+        Fetch (keyword, page) pairs here, or through the worker queue when
+        SCRAPE_WORKERS is set. Pages the LinkedIn breaker turned away come
+        back as workers.BLOCKED, and count in attempted and blocked either way.
+        """
+        if config.SCRAPE_WORKERS:
+            # Fetches happen in the worker processes; only the wait is traced here
+            with tracing.span("fetch.queue", units=len(arms)):
+                results, rejected = workers.fetch_via_queue(arms, location, timeframe, self.spacing)
+            self.rejected += rejected
+            self.attempted += sum(1 for jobs in results if jobs is not workers.UNFINISHED)
+            self.blocked += sum(1 for jobs in results if jobs is workers.BLOCKED)
+            return results
+        results = []
+        for keyword, page in arms:
+            blocked = self.blocked
+            jobs = self._fetch_page(keyword, location, timeframe, page)
+            results.append(workers.BLOCKED if self.blocked > blocked else jobs)
+        return results
+
+    def _search_single_keyword(self, keyword: str, location: str, timeframe: str, limit: int) -> List[Job]:
+        """Search LinkedIn for a single keyword and return new jobs."""
+        jobs = []
+        page = 0
 
-                if not job_cards:
-                    break
-                for card in job_cards:
-                    if len(jobs) >= limit:
-                        break
-                    job = self._parse_job_card(card)
-                    if job:
-                        jobs.append(job)
-
-                page += 1
-                time.sleep(2)
-
-            except requests.exceptions.RequestException as e:
-                print(f"Request error for '{keyword}': {e}")
+        while len(jobs) < limit:
+            page_jobs = self._fetch_page(keyword, location, timeframe, page)
+            if page_jobs is None:
                 break
+            jobs.extend(page_jobs)
+            page += 1
 
+        del jobs[limit:]
         return jobs
 
-    def search_jobs(self, keywords: List[str], location: str, timeframe: str = "r604800", limit: int = 25) -> List[Dict]:
+    def search_jobs(
+        self,
+        keywords: List[str],
+        location: str,
+        timeframe: str = "r604800",
+        limit: Optional[int] = None,
+        budget: Optional[int] = None,
+        spread_seconds: float = 0.0,
+        checkpoint=None,
+        max_age_hours: float = 0,
+    ) -> List[Job]:
         """
         Search for jobs on LinkedIn's public jobs page.
         Searches each keyword separately to get better results.
 
+        Page fetches are capped by a per-scan request budget. A bandit
+        allocator spends it on the (keyword, page) pairs that have yielded
+        the most never-seen jobs per fetch. A keyword stops going deeper
+        once a page is empty, fails, or yields nothing new.
+
         Args:
             keywords: List of keyword strings (each searched independently)
             location: Location string
             timeframe: LinkedIn f_TPR value (r86400=24h, r172800=48h, r604800=week)
-            limit: Max total jobs to return
+            limit: Max total jobs to return (None for no cap)
+            budget: Max page fetches (defaults to config.SCAN_REQUEST_BUDGET)
+            spread_seconds: Spread the budgeted fetches evenly over this many
+                seconds instead of sending them back to back
+            checkpoint: Optional ScanCheckpoint. Each fetched page is recorded
+                in it, and pages it already holds are not fetched again.
+                The search stops early when stop_event is set.
+            max_age_hours: Drop postings older than this (0 = keep all) before
+                they are checkpointed or counted as yield. Postings with no
+                known posting time are kept.
 
         Returns:
-            List of new job dicts (not already in DB)
+            List of new Jobs (not already in DB), each tagged with its keyword
         """
+        budget = config.SCAN_REQUEST_BUDGET if budget is None else budget
+        self.spacing = spread_seconds / budget if budget else 0.0
+        # posted_at is ISO text, so string order is time order
+        cutoff = (datetime.utcnow() - timedelta(hours=max_age_hours)).replace(microsecond=0).isoformat() \
+            if max_age_hours else None
+        allocator = BudgetAllocator(location)
+        next_page = {keyword: 0 for keyword in keywords}
+
         all_jobs = []
         seen_ids = set()
-        per_keyword_limit = max(limit // len(keywords), 10) if keywords else limit
-
-        for keyword in keywords:
-            print(f"Searching: '{keyword}' in {location}...")
-            jobs = self._search_single_keyword(keyword, location, timeframe, per_keyword_limit)
+        fetches = 0
+
+        if checkpoint is not None:
+            # Replay the units an interrupted run already fetched
+            for keyword, page, new_count in checkpoint.done_units():
+                fetches += 1
+                if keyword not in next_page:
+                    continue
+                if new_count is None:
+                    del next_page[keyword]
+                    continue
+                allocator.record(keyword, page, new_count)
+                if new_count:
+                    next_page[keyword] = page + 1
+                else:
+                    del next_page[keyword]
+            for job in checkpoint.jobs():
+                seen_ids.add(job.job_id)
+                all_jobs.append(job)
+            if fetches:
+                print(f"Resuming scan: {fetches} page fetches and {len(all_jobs)} jobs already done")
+
+        while fetches < budget and next_page:
+            if stop_event.is_set():
+                # Leave the allocator unsaved; the checkpoint replays these fetches
+                print(f"Scan stopped after {fetches}/{budget} page fetches")
+                return all_jobs
+            if limit is not None and len(all_jobs) >= limit:
+                break
+            # With worker processes, fetch several keywords' next pages at once
+            width = min(config.SCRAPE_WORKERS, budget - fetches) if config.SCRAPE_WORKERS else 1
+            arms = allocator.rank(list(next_page.items()), width)
+            for keyword, page in arms:
+                print(f"Searching: '{keyword}' page {page} in {location}...")
+            results = self._fetch_pages(arms, location, timeframe)
+            fetches += len(arms)
+
+            for (keyword, page), jobs in zip(arms, results):
+                if jobs is workers.UNFINISHED:
+                    # Shutdown came first; the checkpoint leaves this unit to the resumed scan
+                    continue
+                if jobs is workers.BLOCKED:
+                    # Never fetched; the checkpoint leaves it to a resumed scan
+                    del next_page[keyword]
+                    continue
+                if jobs is None:
+                    if checkpoint is not None:
+                        checkpoint.record_unit(keyword, page, None, [])
+                    del next_page[keyword]
+                    continue
+
+                fresh = []
+                for job in jobs:
+                    if cutoff and job.posted_at is not None and job.posted_at < cutoff:
+                        self.stale += 1
+                        continue
+                    if job.job_id not in seen_ids:
+                        seen_ids.add(job.job_id)
+                        job.keyword = keyword
+                        fresh.append(job)
+                all_jobs += fresh
+                # Pending jobs come back every scan; only never-stored ones count as yield
+                known = db.get_known_job_ids(job.job_id for job in fresh)
+                new_count = sum(1 for job in fresh if job.job_id not in known)
+                allocator.record(keyword, page, new_count)
+                if checkpoint is not None:
+                    checkpoint.record_unit(keyword, page, new_count, fresh)
+
+                if new_count:
+                    next_page[keyword] = page + 1
+                else:
+                    del next_page[keyword]
+
+        allocator.save()
+        print(
+            f"Used {fetches}/{budget} page fetches, "
+            f"{rate_limiter.requests_per_minute():.1f} requests/min over the last 5 min"
+        )
+        if limit is not None:
+            del all_jobs[limit:]
+        return all_jobs
+
+    def _parse_job_details(self, html: str) -> Dict:
+        soup = bs4.BeautifulSoup(html, "html.parser")
+
+        desc_elem = (
+            soup.find("div", class_="show-more-less-html__markup")
+            or soup.find("div", class_="description__text")
+        )
+        description = desc_elem.get_text("\n", strip=True) if desc_elem else ""
+
+        criteria = {}
+        for item in soup.find_all("li", class_="description__job-criteria-item"):
+            header = item.find("h3", class_="description__job-criteria-subheader")
+            value = item.find("span", class_="description__job-criteria-text")
+            if header and value:
+                criteria[header.get_text(strip=True).lower()] = value.get_text(strip=True)
+
+        posted_elem = soup.find("span", class_="posted-time-ago__text")
+        posted_at = _parse_relative_time(posted_elem.get_text(strip=True)) if posted_elem else ""
+
+        return {
+            "description": description,
+            "seniority": criteria.get("seniority level", ""),
+            "employment_type": criteria.get("employment type", ""),
+            "posted_at": posted_at,
+        }
 
-            for job in jobs:
-                if job["job_id"] not in seen_ids:
-                    seen_ids.add(job["job_id"])
-                    all_jobs.append(job)
+    def _fetch_job_details(self, job_id: str) -> Optional[Dict]:
+        try:
+            response = self._get("detail", f"{self.view_url}/{job_id}")
+            response.raise_for_status()
+        except breakers.CircuitOpen:
+            return None
+        except requests.exceptions.RequestException as e:
+            print(f"Request error for job {job_id}: {e}")
+            return None
+        return self._parse_job_details(response.text)
 
-            time.sleep(2)
+    def fetch_job_details(self, job_ids: List[str], workers: int = 4) -> Dict[str, Dict]:
+        """Fetch /jobs/view/<id> pages concurrently. Failed fetches are left out."""
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            results = pool.map(self._fetch_job_details, job_ids)
+            return {job_id: details for job_id, details in zip(job_ids, results) if details}
 
-        return all_jobs[:limit]
+    def _check_liveness(self, job_id: str) -> Optional[bool]:
+        """
+        Whether a posting still takes applications: True, False, or None
+        when the check failed or was rate limited. _SKIPPED while LinkedIn's
+        breaker is open, so the posting is checked again soon after.
 
+        Uses the small guest posting fragment rather than the full job page,
+        streamed and cut off after its top card.
+        """
+        try:
+            response = self._get("liveness", f"{self.posting_url}/{job_id}", stream=True, allow_redirects=False)
+        except breakers.CircuitOpen:
+            return _SKIPPED
+        except requests.exceptions.RequestException as e:
+            print(f"Liveness check error for job {job_id}: {e}")
+            return None
+        try:
+            if response.status_code in (404, 410):
+                return False
+            if response.status_code != 200:
+                return None
+            head = b""
+            for chunk in response.iter_content(8192):
+                head += chunk
+                if len(head) >= _LIVENESS_READ_BYTES:
+                    break
+        finally:
+            response.close()
+        text = head.decode("utf-8", "ignore")
+        return not any(marker in text for marker in _CLOSED_MARKERS)
 
-def scrape_new_jobs(keywords: List[str], location: str, timeframe: str = "r604800", limit: int = 25) -> List[Dict]:
-    """Top-level function called by main.py."""
+    def check_liveness(self, job_ids: List[str], workers: int = 2, should_stop=None) -> Dict[str, Optional[bool]]:
+        """
+        Check postings concurrently under the shared rate limit. Once
+        should_stop() is true no further checks start; those jobs, and any
+        turned away by an open LinkedIn breaker, are left out of the result.
+        """
+        def check(job_id):
+            if should_stop is not None and should_stop():
+                return _SKIPPED
+            return self._check_liveness(job_id)
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            results = pool.map(check, job_ids)
+            return {job_id: live for job_id, live in zip(job_ids, results) if live is not _SKIPPED}
+
+
+def scrape_new_jobs(
+    keywords: List[str],
+    location: str,
+    timeframe: str = "r604800",
+    limit: Optional[int] = None,
+    spread_seconds: float = 0.0,
+    checkpoint=None,
+    max_age_hours: float = 0,
+) -> List[Job]:
+    """
+    Top-level function called by main.py.
+
+    Raises breakers.CircuitOpen if the LinkedIn breaker turned away every
+    page fetch, so an empty result is never mistaken for a scan that ran.
+    """
     scraper = LinkedInJobScraper()
-    jobs = scraper.search_jobs(keywords, location, timeframe, limit)
-    print(f"Found {len(jobs)} new jobs")
+    jobs = scraper.search_jobs(
+        keywords, location, timeframe, limit,
+        spread_seconds=spread_seconds, checkpoint=checkpoint, max_age_hours=max_age_hours,
+    )
+    if scraper.attempted and scraper.blocked == scraper.attempted:
+        raise breakers.CircuitOpen(linkedin_breaker.name, linkedin_breaker.snapshot()["retry_in"])
+    print(f"Found {len(jobs)} new jobs ({scraper.rejected} dropped by filters, {scraper.stale} stale)")
+    return jobs
+
+
+def attach_job_details(jobs: List[Job]) -> List[Job]:
+    """
+    Add description, seniority, employment_type and posted_at to each job.
+
+    Details are cached in the job_details table, so only jobs never seen
+    before cost a request.
+    """
+    job_ids = [job.job_id for job in jobs]
+    details = db.get_job_details(job_ids)
+
+    missing = [job_id for job_id in job_ids if job_id not in details]
+    if missing:
+        fetched = LinkedInJobScraper().fetch_job_details(missing, config.DETAIL_WORKERS)
+        for job_id, job_details in fetched.items():
+            db.save_job_details(job_id, **job_details)
+        details.update(fetched)
+        print(f"Fetched details for {len(fetched)}/{len(missing)} new jobs")
+
+    for job in jobs:
+        job_details = details.get(job.job_id, {})
+        # Keep the search card's timestamp when it had one; it was read earlier
+        if job.posted_at or not job_details.get("posted_at"):
+            job_details = {key: value for key, value in job_details.items() if key != "posted_at"}
+        job.update(job_details)
     return jobs
 
 
@@ -176,5 +585,5 @@ if __name__ == "__main__":
     db.init_db()
     jobs = scrape_new_jobs(["AI Engineer"], "Singapore", limit=5)
     for job in jobs:
-        print(f"  {job['title']} — {job['company']} ({job['location']})")
-        print(f"    {job['url']}")
+        print(f"  {job.title} — {job.company} ({job.location})")
+        print(f"    {job.url}")
@@ -1,9 +1,30 @@
+import asyncio
+import io
+import json
+import os
+import shutil
+import tempfile
+
 from telegram import InlineKeyboardButton, InlineKeyboardMarkup, Update
 from telegram.ext import Application, CallbackQueryHandler, CommandHandler, ContextTypes
+from telegram.error import BadRequest, Forbidden
+from telegram.ext import filters as tg_filters
 
+import breakers
+import chats
 import config
 import db
+import export
+import filters
+import leases
+import pipeline
+import planner
 import scraper
+import tracing
+from checkpoint import ScanCheckpoint
+
+# A rejected message or a chat that blocked the bot says nothing about Telegram being down
+telegram_breaker = breakers.breaker("telegram", is_failure=lambda exc: not isinstance(exc, (BadRequest, Forbidden)))
 
 
 def _build_message(job):
@@ -31,13 +52,17 @@ def _build_keyboard(job_id):
     ])
 
 
-async def send_job_alert(application, job):
-    """Send a job alert message to the configured Telegram chat."""
+async def send_job_alert(application, job, chat_id=None):
+    """
+    Send a job alert message to a chat (the configured primary chat by default).
+    Raises breakers.CircuitOpen while Telegram is known to be down.
+    """
     message = _build_message(job)
     keyboard = _build_keyboard(job["job_id"])
 
-    await application.bot.send_message(
-        chat_id=config.TELEGRAM_CHAT_ID,
+    await telegram_breaker.call_async(
+        application.bot.send_message,
+        chat_id=chat_id or config.TELEGRAM_CHAT_ID,
         text=message,
         parse_mode="MarkdownV2",
         reply_markup=keyboard,
@@ -45,45 +70,39 @@ async def send_job_alert(application, job):
     )
 
 
-async def _trigger_scan(application):
-    """Run a scan and send results. Called after settings change."""
-    keywords_str = db.get_setting("keywords")
-    location = db.get_setting("location")
-    timeframe = db.get_setting("timeframe") or "r604800"
-
-    if not keywords_str or not location:
+async def _trigger_scan(application, chat_id=None):
+    """Run a scan of a chat's queries and report to it. Called after its settings change."""
+    subscriptions = planner.chat_subscriptions(chat_id)
+    if subscriptions is None:
         return
+    location, timeframe, subscribers = subscriptions
+    chat_id = chat_id or config.TELEGRAM_CHAT_ID
+
+    # Waits for any scan already running instead of doubling the request rate
+    async with pipeline.scan_lock:
+        # Only this instance's share of the queries; other instances scan the rest
+        keywords = leases.acquire(list(subscribers), location)
+        if not keywords:
+            return
+        # Other chats following the same queries get the results too
+        subscribers = {keyword: subscribers[keyword] for keyword in keywords}
+        checkpoint = ScanCheckpoint.start(keywords, location, timeframe)
+        try:
+            result = await pipeline.run_scan(application, checkpoint, subscribers=subscribers)
+        except Exception as e:
+            await application.bot.send_message(
+                chat_id=chat_id,
+                text=f"Scan failed: {e}",
+            )
+            return
 
-    keywords = [k.strip() for k in keywords_str.split(",") if k.strip()]
-
-    try:
-        new_jobs = scraper.scrape_new_jobs(keywords, location, timeframe)
-    except Exception as e:
-        await application.bot.send_message(
-            chat_id=config.TELEGRAM_CHAT_ID,
-            text=f"Scan failed: {e}",
-        )
+    if result is None:
         return
 
-    sent = 0
-    for job in new_jobs:
-        db.insert_job(
-            job_id=job["job_id"],
-            title=job["title"],
-            company=job["company"],
-            location=job["location"],
-            url=job["url"],
-            status="pending",
-        )
-        try:
-            await send_job_alert(application, job)
-            sent += 1
-        except Exception:
-            pass
-
+    found, sent = result
     await application.bot.send_message(
-        chat_id=config.TELEGRAM_CHAT_ID,
-        text=f"Scan complete. Found {len(new_jobs)} new jobs, sent {sent} alerts.",
+        chat_id=chat_id,
+        text=f"Scan complete. Found {found} new jobs, sent {sent} alerts.",
     )
 
 
@@ -101,6 +120,17 @@ TIMEFRAME_LABELS = {
     "r604800": "Past week",
 }
 
+FRESHNESS_USAGE = "Usage: /freshness 6h, /freshness 2d, or /freshness off"
+
+
+def _format_age(hours):
+    if not hours:
+        return "off (any posting inside the timeframe)"
+    if hours % 24 == 0:
+        return f"{hours / 24:g} days"
+    return f"{hours:g} hours"
+
+
 # --- Preset locations ---
 
 LOCATION_PRESETS = [
@@ -118,29 +148,44 @@ async def handle_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Handle all inline button presses."""
     query = update.callback_query
     await query.answer()
+    # Callback queries can't be given the chat filter commands get; check here
+    if not chats.is_served(update.effective_chat.id):
+        return
 
     data = query.data
+    chat_id = update.effective_chat.id
 
     # Timeframe buttons
     if data.startswith("tf:"):
         value = data.split(":", 1)[1]
-        db.set_setting("timeframe", value)
+        db.set_setting("timeframe", value, chat_id)
         label = TIMEFRAME_LABELS.get(value, value)
         await query.edit_message_text(f"Timeframe updated: {label}\n\nRunning scan...")
-        await _trigger_scan(context.application)
+        await _trigger_scan(context.application, chat_id)
         return
 
     # Location buttons
     if data.startswith("loc:"):
         location = data.split(":", 1)[1]
-        db.set_setting("location", location)
+        db.set_setting("location", location, chat_id)
         await query.edit_message_text(f"Location updated: {location}\n\nRunning scan...")
-        await _trigger_scan(context.application)
+        await _trigger_scan(context.application, chat_id)
+        return
+
+    # Search paging buttons
+    if data.startswith("srch:"):
+        _, score, last_id = data.split(":", 2)
+        text = context.chat_data.get("search_query")
+        if not text:
+            await query.edit_message_text("Search expired. Run /search again.")
+            return
+        message, keyboard = _build_search_page(text, (float(score), int(last_id)), chat_id)
+        await query.edit_message_text(message, reply_markup=keyboard, disable_web_page_preview=True)
         return
 
     # Job Viewed/Ignore buttons
     action, job_id = data.split(":", 1)
-    db.update_job_status(job_id, action)
+    db.update_job_status(job_id, action, chat_id)
 
     if action == "viewed":
         label = "\u2705 Marked as Viewed"
@@ -160,9 +205,10 @@ async def handle_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
 async def handle_keywords(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Handle /keywords command. Show current or update."""
     args = context.args
+    chat_id = update.effective_chat.id
 
     if not args:
-        current = db.get_setting("keywords")
+        current = db.get_setting("keywords", chat_id)
         if current:
             keywords = current.split(",")
             formatted = ", ".join(keywords)
@@ -179,19 +225,20 @@ async def handle_keywords(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
     raw = " ".join(args)
     keywords = [k.strip() for k in raw.split(",") if k.strip()]
-    db.set_setting("keywords", ",".join(keywords))
+    db.set_setting("keywords", ",".join(keywords), chat_id)
 
     formatted = ", ".join(keywords)
     await update.message.reply_text(f"Keywords updated:\n{formatted}\n\nRunning scan...")
-    await _trigger_scan(context.application)
+    await _trigger_scan(context.application, chat_id)
 
 
 async def handle_location(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Handle /location command. Show buttons or update with text."""
     args = context.args
+    chat_id = update.effective_chat.id
 
     if not args:
-        current = db.get_setting("location") or "Not set"
+        current = db.get_setting("location", chat_id) or "Not set"
 
         buttons = []
         row = []
@@ -212,17 +259,18 @@ async def handle_location(update: Update, context: ContextTypes.DEFAULT_TYPE):
         return
 
     location = " ".join(args).strip()
-    db.set_setting("location", location)
+    db.set_setting("location", location, chat_id)
     await update.message.reply_text(f"Location updated: {location}\n\nRunning scan...")
-    await _trigger_scan(context.application)
+    await _trigger_scan(context.application, chat_id)
 
 
 async def handle_timeframe(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Handle /timeframe command. Show buttons or update with text."""
     args = context.args
+    chat_id = update.effective_chat.id
 
     if not args:
-        current = db.get_setting("timeframe") or "r604800"
+        current = db.get_setting("timeframe", chat_id) or "r604800"
 
         buttons = []
         for key, value in TIMEFRAME_OPTIONS.items():
@@ -245,18 +293,47 @@ async def handle_timeframe(update: Update, context: ContextTypes.DEFAULT_TYPE):
         return
 
     value = TIMEFRAME_OPTIONS[choice]
-    db.set_setting("timeframe", value)
+    db.set_setting("timeframe", value, chat_id)
     label = TIMEFRAME_LABELS[value]
     await update.message.reply_text(f"Timeframe updated: {label}\n\nRunning scan...")
-    await _trigger_scan(context.application)
+    await _trigger_scan(context.application, chat_id)
+
+
+async def handle_freshness(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Handle /freshness command. Show or set the maximum age of alerted postings."""
+    args = context.args
+    chat_id = update.effective_chat.id
+
+    if not args:
+        current = pipeline.max_posting_age_hours(chat_id)
+        await update.message.reply_text(f"Max posting age: {_format_age(current)}\n\n{FRESHNESS_USAGE}")
+        return
+
+    choice = args[0].lower().strip()
+    if choice == "off":
+        hours = 0.0
+    else:
+        unit = choice[-1:]
+        try:
+            hours = float(choice[:-1]) * {"h": 1, "d": 24}[unit]
+        except (KeyError, ValueError):
+            await update.message.reply_text(f"Invalid age. {FRESHNESS_USAGE}")
+            return
+        if hours <= 0:
+            await update.message.reply_text(f"Invalid age. {FRESHNESS_USAGE}")
+            return
+
+    db.set_setting("max_age_hours", f"{hours:g}", chat_id)
+    await update.message.reply_text(f"Max posting age updated: {_format_age(hours)}")
 
 
 async def handle_profile(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Handle /profile command. Show current profile or re-parse resume."""
     args = context.args
+    chat_id = update.effective_chat.id
 
     if not args:
-        profile = db.get_profile()
+        profile = db.get_profile(chat_id)
         if profile:
             keywords = profile["keywords"]
             text = (
@@ -273,12 +350,15 @@ async def handle_profile(update: Update, context: ContextTypes.DEFAULT_TYPE):
         return
 
     if args[0].lower() == "refresh":
+        links = [link.strip() for link in " ".join(args[1:]).split(",") if link.strip()]
+        if links:
+            db.set_setting("resume_links", ",".join(links), chat_id)
         await update.message.reply_text("Re-parsing resume from Google Docs... This may take a moment.")
 
         try:
             import resume_parser
-            profile, keywords = resume_parser.get_or_create_profile(overwrite=True)
-            db.set_setting("keywords", ",".join(keywords))
+            profile, keywords = resume_parser.get_or_create_profile(overwrite=True, chat_id=chat_id)
+            db.set_setting("keywords", ",".join(keywords), chat_id)
 
             await update.message.reply_text(
                 f"Profile updated!\n\n"
@@ -286,20 +366,298 @@ async def handle_profile(update: Update, context: ContextTypes.DEFAULT_TYPE):
                 f"New keywords: {', '.join(keywords)}\n\n"
                 f"Running scan..."
             )
-            await _trigger_scan(context.application)
+            await _trigger_scan(context.application, chat_id)
         except Exception as e:
             await update.message.reply_text(f"Failed to refresh profile: {e}")
         return
 
-    await update.message.reply_text("Usage:\n  /profile — view current\n  /profile refresh — re-parse resume")
+    await update.message.reply_text(
+        "Usage:\n  /profile — view current\n  /profile refresh — re-parse resume\n"
+        "  /profile refresh <Google Docs links> — use these resume links from now on"
+    )
+
+
+# --- Search ---
+
+SEARCH_PAGE_SIZE = 5
+
+
+def _build_search_page(text, after=None, chat_id=None):
+    """Render one page of a chat's /search results and a Next button if more may follow."""
+    rows = db.search_jobs(text, limit=SEARCH_PAGE_SIZE + 1, after=after, chat_id=chat_id)
+    has_more = len(rows) > SEARCH_PAGE_SIZE
+    rows = rows[:SEARCH_PAGE_SIZE]
+
+    if not rows:
+        return (f'No more results for "{text}".' if after else f'No jobs found for "{text}".'), None
+
+    lines = [f'Results for "{text}":']
+    for row in rows:
+        lines.append(
+            f"\n{row['title']} — {row['company']} ({row['location']})\n"
+            f"{row['status']} · {row['created_at'][:10]}\n"
+            f"{row['url']}"
+        )
+
+    keyboard = None
+    if has_more:
+        last = rows[-1]
+        keyboard = InlineKeyboardMarkup([[
+            InlineKeyboardButton("Next \u25b6", callback_data=f"srch:{last['score']!r}:{last['id']}")
+        ]])
+    return "\n".join(lines), keyboard
+
+
+async def handle_search(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Handle /search command. Full-text search over job history."""
+    text = " ".join(context.args).strip()
+    if not text:
+        await update.message.reply_text("Usage: /search staff ml engineer")
+        return
+
+    # Paging buttons only carry the keyset cursor; the query lives here
+    context.chat_data["search_query"] = text
+    message, keyboard = _build_search_page(text, chat_id=update.effective_chat.id)
+    await update.message.reply_text(message, reply_markup=keyboard, disable_web_page_preview=True)
+
+
+# --- Stats ---
+
+async def handle_stats(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Handle /stats command. Summarize the chat's job yield."""
+    stats = db.get_stats(days=7, top=5, chat_id=update.effective_chat.id)
+
+    def section(title, rows, key):
+        if not rows:
+            return f"{title}:\n  none yet"
+        return f"{title}:\n" + "\n".join(f"  {row[key]}: {row['jobs']}" for row in rows)
+
+    await update.message.reply_text("\n\n".join([
+        section("Jobs by status", stats["status"], "status"),
+        section("New jobs by keyword (7 days)", stats["keywords"], "keyword"),
+        section("Top companies", stats["companies"], "company"),
+        section("Top locations", stats["locations"], "location"),
+        f"LinkedIn requests: {scraper.rate_limiter.requests_per_minute():.1f}/min (last 5 min)",
+    ]))
+
+
+def _format_breaker(state):
+    line = f"{state['name']}: {state['state']}"
+    if state["state"] == breakers.OPEN:
+        line += f", next probe in {state['retry_in']:.0f}s"
+    elif state["failures"]:
+        line += f", {state['failures']} recent failures"
+    if state["last_error"] and state["state"] != breakers.CLOSED:
+        line += f"\n  last error: {state['last_error']}"
+    return line
+
+
+async def handle_breakers(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Handle /breakers command. Show which dependencies are failing fast."""
+    states = sorted((circuit.snapshot() for circuit in breakers.all_breakers()), key=lambda state: state["name"])
+    if not states:
+        await update.message.reply_text("No dependencies called yet.")
+        return
+    await update.message.reply_text("Circuit breakers:\n" + "\n".join(_format_breaker(state) for state in states))
+
+
+# --- Performance ---
+
+PERF_USAGE = (
+    "Usage:\n"
+    "  /perf — slowest stages of recent scans\n"
+    "  /perf trace — latest scan as a Chrome trace (chrome://tracing, ui.perfetto.dev)\n"
+    "  /perf profile — run a scan now with the stack-sampling profiler"
+)
+
+
+def _format_perf(traces, top=8):
+    durations = ", ".join(f"{trace.duration:.1f}s" for trace in traces[-5:])
+    lines = [f"Last {len(traces)} traced scans (latest: {durations})", "", "Slowest stages (total / count / max):"]
+    for name, count, total, longest in tracing.stage_summary(traces)[:top]:
+        lines.append(f"  {name}: {total:.2f}s / {count} / {longest:.2f}s")
+
+    profiled = tracing.latest_profiled()
+    if profiled:
+        samples = sum(profiled.profile.values()) or 1
+        lines += ["", f"Profile of '{profiled.label}' (hottest functions):"]
+        for function, count in tracing.top_functions(profiled.profile, top):
+            lines.append(f"  {function}: {100 * count / samples:.0f}%")
+    return "\n".join(lines)
+
+
+async def handle_perf(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Handle /perf command. Summarize, export or profile scan traces."""
+    action = context.args[0].lower() if context.args else ""
+
+    if action == "profile":
+        tracing.profile_next_scan()
+        await update.message.reply_text("Profiling the next scan. Starting one now...")
+        await _trigger_scan(context.application, update.effective_chat.id)
+        return
+
+    traces = tracing.recent()
+    if action and action != "trace":
+        await update.message.reply_text(PERF_USAGE)
+        return
+    if not traces:
+        hint = "" if config.TRACING else " Set TRACING=true or use /perf profile."
+        await update.message.reply_text(f"No traced scans yet.{hint}")
+        return
+
+    if action == "trace":
+        data = json.dumps(traces[-1].to_chrome()).encode("utf-8")
+        await update.message.reply_document(
+            document=io.BytesIO(data),
+            filename=f"scan-trace-{int(traces[-1].started_at)}.json",
+        )
+        return
+
+    await update.message.reply_text(f"{_format_perf(traces)}\n\n{PERF_USAGE}")
+
+
+# --- Export ---
+
+EXPORT_USAGE = (
+    "Usage:\n"
+    "  /export [csv|ndjson|parquet] — job history as a file (CSV by default)\n"
+    "  /export parquet new — only jobs stored since the last /export new in that format"
+)
+# Bot API upload limit
+MAX_DOCUMENT_BYTES = 50 * 1024 * 1024
+
+
+async def handle_export(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Handle /export command. Send the chat's job history, with details and verdicts, as a file."""
+    args = [arg.lower() for arg in context.args]
+    if any(arg not in export.FORMATS and arg != "new" for arg in args):
+        await update.message.reply_text(EXPORT_USAGE)
+        return
+    fmt = next((arg for arg in args if arg in export.FORMATS), "csv")
+    incremental = "new" in args
+
+    # Written to a scratch directory that goes away once sent; only a file
+    # too large for Telegram is kept, under data/exports
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, os.path.basename(export.default_path(fmt)))
+        try:
+            count, _ = await asyncio.to_thread(
+                export.export_jobs, path, fmt, incremental, export.CHUNK_ROWS, update.effective_chat.id
+            )
+        except RuntimeError as e:
+            await update.message.reply_text(str(e))
+            return
+
+        if incremental and not count:
+            await update.message.reply_text("No new jobs since the last export.")
+            return
+        if os.path.getsize(path) > MAX_DOCUMENT_BYTES:
+            kept = export.default_path(fmt)
+            os.makedirs(os.path.dirname(kept), exist_ok=True)
+            shutil.move(path, kept)
+            await update.message.reply_text(f"Exported {count} jobs to {kept}; too large to send here.")
+            return
+        with open(path, "rb") as f:
+            await update.message.reply_document(document=f, filename=os.path.basename(path), caption=f"{count} jobs")
+
+
+# --- Filter rules ---
+
+FILTER_USAGE = (
+    "Usage:\n"
+    "  /exclude [title|company|location] words — drop matching jobs\n"
+    "  /include [title|company|location] words — only keep matching jobs\n"
+    "  /unfilter 2 — remove rule #2\n"
+    "Without a field, the rule matches any of them."
+)
+
+
+def _format_rules(rules):
+    if not rules:
+        return "No filter rules."
+    lines = [
+        f"{i}. {rule['action']} {rule['field']}: {rule['pattern']}"
+        for i, rule in enumerate(rules, 1)
+    ]
+    return "Filter rules:\n" + "\n".join(lines)
+
+
+async def handle_filters(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Handle /filters command. List current include/exclude rules."""
+    rules = filters.get_rules(update.effective_chat.id)
+    await update.message.reply_text(f"{_format_rules(rules)}\n\n{FILTER_USAGE}")
+
+
+async def _add_filter_rule(update, context, action):
+    args = list(context.args)
+    if not args:
+        await update.message.reply_text(FILTER_USAGE)
+        return
+
+    field = "any"
+    if len(args) > 1 and args[0].lower() in filters.FIELDS:
+        field = args.pop(0).lower()
+
+    try:
+        rules = filters.add_rule(action, field, " ".join(args), update.effective_chat.id)
+    except ValueError as e:
+        await update.message.reply_text(f"Invalid rule: {e}")
+        return
+
+    await update.message.reply_text(_format_rules(rules))
+
+
+async def handle_exclude(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Handle /exclude command. Add a rule that drops matching jobs."""
+    await _add_filter_rule(update, context, "exclude")
+
+
+async def handle_include(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Handle /include command. Add a rule that jobs must match."""
+    await _add_filter_rule(update, context, "include")
+
+
+async def handle_unfilter(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Handle /unfilter command. Remove a rule by number."""
+    args = context.args
+    chat_id = update.effective_chat.id
+    if not args or not args[0].isdigit():
+        await update.message.reply_text(f"{_format_rules(filters.get_rules(chat_id))}\n\nUsage: /unfilter 2")
+        return
+
+    try:
+        removed = filters.remove_rule(int(args[0]), chat_id)
+    except IndexError as e:
+        await update.message.reply_text(str(e))
+        return
+
+    await update.message.reply_text(
+        f"Removed: {removed['action']} {removed['field']}: {removed['pattern']}\n\n"
+        f"{_format_rules(filters.get_rules(chat_id))}"
+    )
 
 
 def create_application():
     """Create and configure the Telegram bot application."""
-    app = Application.builder().token(config.TELEGRAM_BOT_TOKEN).build()
-    app.add_handler(CommandHandler("keywords", handle_keywords))
-    app.add_handler(CommandHandler("location", handle_location))
-    app.add_handler(CommandHandler("timeframe", handle_timeframe))
-    app.add_handler(CommandHandler("profile", handle_profile))
+    if not config.TELEGRAM_CHAT_ID:
+        # The chat filter below would then let no one in, without saying why
+        raise ValueError("TELEGRAM_CHAT_ID is not set; set it in .env to the chat the bot should serve")
+    app = Application.builder().token(config.TELEGRAM_BOT_TOKEN).base_url(config.TELEGRAM_API_URL).build()
+    # Only the configured chats can use the bot
+    allowed = tg_filters.Chat(chat_id=[int(chat_id) for chat_id in chats.all_chats()])
+    app.add_handler(CommandHandler("keywords", handle_keywords, filters=allowed))
+    app.add_handler(CommandHandler("location", handle_location, filters=allowed))
+    app.add_handler(CommandHandler("timeframe", handle_timeframe, filters=allowed))
+    app.add_handler(CommandHandler("freshness", handle_freshness, filters=allowed))
+    app.add_handler(CommandHandler("profile", handle_profile, filters=allowed))
+    app.add_handler(CommandHandler("search", handle_search, filters=allowed))
+    app.add_handler(CommandHandler("stats", handle_stats, filters=allowed))
+    app.add_handler(CommandHandler("breakers", handle_breakers, filters=allowed))
+    app.add_handler(CommandHandler("perf", handle_perf, filters=allowed))
+    app.add_handler(CommandHandler("export", handle_export, filters=allowed))
+    app.add_handler(CommandHandler("filters", handle_filters, filters=allowed))
+    app.add_handler(CommandHandler("exclude", handle_exclude, filters=allowed))
+    app.add_handler(CommandHandler("include", handle_include, filters=allowed))
+    app.add_handler(CommandHandler("unfilter", handle_unfilter, filters=allowed))
     app.add_handler(CallbackQueryHandler(handle_callback))
     return app
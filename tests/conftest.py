@@ -2,6 +2,7 @@ import os
 import tempfile
 import pytest
 
+import breakers
 import config
 import db
 
@@ -13,3 +14,10 @@ def tmp_db(tmp_path, monkeypatch):
     monkeypatch.setattr(config, "DB_PATH", db_path)
     db.init_db()
     yield db_path
+
+
+@pytest.fixture(autouse=True)
+def closed_breakers():
+    """Breakers are process-wide; don't let one test's failures trip them for the next."""
+    yield
+    breakers.reset_all()
@@ -0,0 +1,84 @@
+from unittest.mock import patch
+
+from allocator import BudgetAllocator
+from models import Job
+from scraper import LinkedInJobScraper
+
+
+def _fake_market(new_per_page):
+    """new_per_page: {keyword: [new jobs on page 0, page 1, ...]}. Returns a fake _fetch_page."""
+    counter = {"n": 0, "calls": []}
+
+    def fetch(keyword, location, timeframe, page):
+        counter["calls"].append((keyword, page))
+        pages = new_per_page.get(keyword, [])
+        if page >= len(pages):
+            return None
+        jobs = []
+        for _ in range(pages[page]):
+            counter["n"] += 1
+            jobs.append(Job(str(counter["n"]), "t", "c", "l", "u"))
+        return jobs
+
+    return fetch, counter
+
+
+def test_unfetched_page_zero_is_explored_first():
+    allocator = BudgetAllocator("SG")
+    allocator.record("Python", 0, 10)
+    assert allocator.choose([("Python", 1), ("Go", 0)]) == ("Go", 0)
+
+
+def test_higher_yield_arm_preferred():
+    allocator = BudgetAllocator("SG")
+    for _ in range(5):
+        allocator.record("Python", 0, 10)
+        allocator.record("COBOL", 0, 0)
+    assert allocator.choose([("Python", 0), ("COBOL", 0)]) == ("Python", 0)
+
+
+def test_stats_persist_per_location():
+    allocator = BudgetAllocator("SG")
+    allocator.record("Python", 0, 4)
+    allocator.save()
+    assert BudgetAllocator("SG").stats == {("Python", 0): (0.9, 3.6)}
+    assert BudgetAllocator("Remote").stats == {}
+
+
+def test_search_jobs_respects_budget_and_stops_dry_keywords():
+    fetch, counter = _fake_market({"A": [25] * 10, "B": [0, 25]})
+    li = LinkedInJobScraper()
+    with patch.object(li, "_fetch_page", side_effect=fetch):
+        jobs = li.search_jobs(["A", "B"], "SG", budget=4)
+
+    assert len(counter["calls"]) == 4
+    # B yielded nothing on page 0, so its deeper pages are never fetched
+    assert ("B", 1) not in counter["calls"]
+    assert len(jobs) == 75
+    assert {job["keyword"] for job in jobs} == {"A"}
+
+
+def test_budget_shifts_toward_productive_keywords():
+    market = {"hot": [25, 25, 25, 25, 25], "warm": [5], "dead1": [0], "dead2": [0]}
+    totals = []
+    for _ in range(6):
+        fetch, counter = _fake_market(market)
+        li = LinkedInJobScraper()
+        with patch.object(li, "_fetch_page", side_effect=fetch):
+            totals.append(len(li.search_jobs(list(market), "SG", budget=5)))
+
+    # First scan explores every keyword; later scans spend the cap on "hot"
+    assert totals[-1] > totals[0]
+
+
+def test_idle_arms_are_eventually_rechecked():
+    market = {"hot": [25] * 5, "dead": [0]}
+    calls = []
+    for _ in range(30):
+        fetch, counter = _fake_market(market)
+        li = LinkedInJobScraper()
+        with patch.object(li, "_fetch_page", side_effect=fetch):
+            li.search_jobs(list(market), "SG", budget=3)
+        calls.extend(counter["calls"])
+
+    assert calls.count(("dead", 0)) > 1
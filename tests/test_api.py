@@ -0,0 +1,113 @@
+import gzip
+import json
+import urllib.error
+import urllib.request
+
+import pytest
+
+import api
+import config
+import db
+
+
+def _store(count, **kwargs):
+    for i in range(1, count + 1):
+        db.insert_job(str(i), f"Engineer {i}", "Acme", "SG", f"https://x/{i}", **kwargs)
+
+
+def _set_created_at(job_id, created_at):
+    conn = db._get_conn()
+    conn.execute("UPDATE jobs SET created_at = ? WHERE job_id = ?", (created_at, job_id))
+    conn.commit()
+    conn.close()
+
+
+@pytest.fixture
+def server():
+    server = api.start_server("127.0.0.1", 0)
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+
+
+def _get(url, **headers):
+    with urllib.request.urlopen(urllib.request.Request(url, headers=headers)) as response:
+        return response.status, response.headers, response.read()
+
+
+def test_pages_walk_history_newest_first_without_gaps():
+    _store(7)
+    ids, cursor = [], None
+    while True:
+        query = {"limit": ["3"]}
+        if cursor:
+            query["cursor"] = [cursor]
+        page = api.list_jobs(query)
+        ids += [job["job_id"] for job in page["jobs"]]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    # Same-second rows fall back to id order
+    assert ids == ["7", "6", "5", "4", "3", "2", "1"]
+
+
+def test_filters():
+    _store(3, keyword="Python")
+    db.insert_job("9", "Go Dev", "Globex", "SG", "https://x/9", status="viewed", keyword="Go")
+    _set_created_at("1", "2024-01-01 10:00:00")
+
+    def job_ids(**params):
+        return [job["job_id"] for job in api.list_jobs({k: [v] for k, v in params.items()})["jobs"]]
+
+    assert job_ids(keyword="Go") == ["9"]
+    assert job_ids(status="viewed") == ["9"]
+    assert job_ids(company="Acme", keyword="Python") == ["3", "2", "1"]
+    assert job_ids(until="2024-01-02") == ["1"]
+    assert "1" not in job_ids(since="2024-01-01T10:00:01")
+
+
+def test_bad_parameters_are_rejected():
+    with pytest.raises(api.BadRequest):
+        api.list_jobs({"limit": ["0"]})
+    with pytest.raises(api.BadRequest):
+        api.list_jobs({"cursor": ["not-a-cursor"]})
+    with pytest.raises(api.BadRequest):
+        api.list_jobs({"since": ["yesterday"]})
+
+
+def test_server_etag_and_gzip(server):
+    _store(30)
+    status, headers, body = _get(f"{server}/jobs?limit=20", **{"Accept-Encoding": "gzip"})
+    assert status == 200
+    assert headers["Content-Encoding"] == "gzip"
+    page = json.loads(gzip.decompress(body))
+    assert len(page["jobs"]) == 20 and page["next_cursor"]
+    # Same tag for the identity body, so it must be weak
+    assert headers["ETag"].startswith('W/"')
+    assert _get(f"{server}/jobs?limit=20")[1]["ETag"] == headers["ETag"]
+
+    with pytest.raises(urllib.error.HTTPError) as not_modified:
+        _get(f"{server}/jobs?limit=20", **{"If-None-Match": headers["ETag"]})
+    assert not_modified.value.code == 304
+
+    db.insert_job("31", "New", "Acme", "SG", "https://x/31")
+    status, headers_after, _ = _get(f"{server}/jobs?limit=20", **{"If-None-Match": headers["ETag"]})
+    assert status == 200 and headers_after["ETag"] != headers["ETag"]
+
+
+def test_server_reports_bad_requests(server):
+    with pytest.raises(urllib.error.HTTPError) as error:
+        _get(f"{server}/jobs?limit=abc")
+    assert error.value.code == 400
+    assert "limit" in json.loads(error.value.read())["error"]
+
+
+def test_chat_selects_whose_history_is_listed(monkeypatch):
+    monkeypatch.setattr(config, "TELEGRAM_EXTRA_CHAT_IDS", ["200"])
+    db.insert_job("1", "Engineer", "Acme", "SG", "https://x/1")
+    db.insert_job("2", "Go Dev", "Globex", "SG", "https://x/2", chat_id=200)
+
+    assert [job["job_id"] for job in api.list_jobs({})["jobs"]] == ["1"]
+    assert [job["job_id"] for job in api.list_jobs({"chat": ["200"]})["jobs"]] == ["2"]
+    with pytest.raises(api.BadRequest):
+        api.list_jobs({"chat": ["300"]})
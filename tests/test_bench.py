@@ -0,0 +1,60 @@
+import json
+
+import config
+import triage
+from bench import fakes, memory
+from bench.load import _keywords, percentiles
+from bench.run import compare
+from scraper import LinkedInJobScraper
+
+
+def test_fake_linkedin_pages_parse(monkeypatch):
+    monkeypatch.setattr("scraper.rate_limiter.wait", lambda interval=0.0: None)
+    with fakes.FakeLinkedIn(jobs_per_keyword=30) as linkedin:
+        monkeypatch.setattr(config, "LINKEDIN_URL", linkedin.url)
+        li = LinkedInJobScraper()
+        first = li._fetch_page("Python", "SG", "r604800", 0)
+        second = li._fetch_page("Python", "SG", "r604800", 1)
+        assert li._fetch_page("Python", "SG", "r604800", 2) is None
+
+    assert len(first) == 25 and len(second) == 5
+    assert first[0]["job_id"] == fakes.job_id_for("Python", 30)
+    assert "Python" in first[0]["title"]
+
+
+def test_fake_linkedin_rate_limits():
+    linkedin = fakes.FakeLinkedIn(max_rps=2)
+    assert [linkedin.admit() for _ in range(3)] == [200, 200, 429]
+
+
+def test_compare_flags_regressions_over_threshold():
+    baseline = {"a": {"seconds": 1.0}, "b": {"seconds": 1.0}, "gone": {"seconds": 1.0}}
+    results = {"a": {"seconds": 1.2}, "b": {"seconds": 1.5}, "new": {"seconds": 9.0}}
+
+    assert compare(results, baseline, 0.25) == [("b", 1.0, 1.5, 1.5)]
+
+
+def test_load_keywords_have_distinct_job_ids():
+    names = _keywords(50)
+    assert len(set(fakes.keyword_slot(name) for name in names)) == 50
+
+
+def test_load_percentiles():
+    assert percentiles(list(range(1, 101))) == {"p50": 51, "p90": 90, "p99": 99}
+    assert percentiles([]) == {"p50": None, "p90": None, "p99": None}
+
+
+def test_fake_ollama_answers_triage_prompts():
+    model = fakes.FakeOllama(fit_rate=1.0)
+    jobs = [{"job_id": "1", "title": "Dev", "company": "Acme", "location": "SG"}]
+    verdicts = triage._parse_verdicts(model.answer(triage._build_prompt("profile", jobs)))
+    assert verdicts == {"1": (True, "benchmark")}
+    assert json.loads(model.answer("Parse this resume"))["keywords"]
+
+
+def test_job_records_hold_less_memory_than_dicts(monkeypatch):
+    monkeypatch.setattr(config, "LINKEDIN_URL", "http://127.0.0.1:9")
+    footprint = memory.job_footprint(200)
+    assert footprint["jobs"] == 200
+    assert footprint["job"]["bytes"] < footprint["dict"]["bytes"]
+    assert footprint["job"]["blocks"] < footprint["dict"]["blocks"]
@@ -0,0 +1,159 @@
+import time
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+import requests
+
+import breakers
+import config
+import db
+import main
+import pipeline
+import resume_parser
+import scraper
+from checkpoint import ScanCheckpoint
+from models import Job
+from telegram_bot import handle_breakers, telegram_breaker
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _breaker(clock, **kwargs):
+    return breakers.CircuitBreaker("dep", failure_threshold=2, reset_seconds=10, max_reset_seconds=30,
+                                   clock=clock, **kwargs)
+
+
+def _fail(circuit):
+    with pytest.raises(ValueError):
+        circuit.call(lambda: (_ for _ in ()).throw(ValueError("down")))
+
+
+def test_opens_after_consecutive_failures_and_fails_fast():
+    clock = Clock()
+    circuit = _breaker(clock)
+    _fail(circuit)
+    circuit.call(lambda: "ok")
+    _fail(circuit)
+    assert circuit.state == breakers.CLOSED
+
+    _fail(circuit)
+    assert circuit.state == breakers.OPEN
+    called = MagicMock()
+    with pytest.raises(breakers.CircuitOpen):
+        circuit.call(called)
+    called.assert_not_called()
+
+
+def test_half_open_admits_one_probe_and_backs_off_when_it_fails():
+    clock = Clock()
+    circuit = _breaker(clock)
+    _fail(circuit)
+    _fail(circuit)
+
+    clock.now = 10
+    assert circuit.state == breakers.HALF_OPEN
+    circuit.guard()
+    with pytest.raises(breakers.CircuitOpen):
+        circuit.guard()  # the probe is still out
+    circuit.failure("still down")
+
+    clock.now = 29
+    assert circuit.state == breakers.OPEN  # open twice as long now
+    clock.now = 30
+    assert circuit.call(lambda: "ok") == "ok"
+    assert circuit.snapshot()["state"] == breakers.CLOSED
+
+
+def test_ignored_errors_do_not_count():
+    circuit = _breaker(Clock(), is_failure=lambda exc: not isinstance(exc, KeyError))
+    for _ in range(3):
+        with pytest.raises(KeyError):
+            circuit.call(lambda: {}["missing"])
+    assert circuit.state == breakers.CLOSED
+
+
+def test_scraper_fails_fast_while_linkedin_is_down(monkeypatch):
+    monkeypatch.setattr(scraper.rate_limiter, "min_interval", 0)
+    li = scraper.LinkedInJobScraper()
+    blocked = MagicMock(status_code=429)
+    blocked.raise_for_status.side_effect = requests.exceptions.HTTPError("429")
+
+    with patch.object(li.session, "get", return_value=blocked) as get:
+        for page in range(config.BREAKER_FAILURE_THRESHOLD):
+            assert li._fetch_page("Python", "SG", "r604800", page) is None
+        assert scraper.linkedin_breaker.state == breakers.OPEN
+
+        # Open: no requests, no waiting for request slots
+        monkeypatch.setattr(scraper.rate_limiter, "min_interval", 60)
+        start = time.perf_counter()
+        jobs = li.search_jobs(["Python", "Go", "Rust"], "SG", budget=15)
+        assert time.perf_counter() - start < 1
+    assert jobs == []
+    assert get.call_count == config.BREAKER_FAILURE_THRESHOLD
+
+
+def test_missing_google_doc_does_not_trip_the_breaker():
+    response = MagicMock(status_code=404)
+    response.raise_for_status.side_effect = requests.exceptions.HTTPError("404", response=response)
+    with patch("transport.new_session") as session:
+        session.return_value.get.return_value = response
+        for _ in range(config.BREAKER_FAILURE_THRESHOLD):
+            with pytest.raises(requests.exceptions.HTTPError):
+                resume_parser.fetch_google_doc("https://docs.google.com/document/d/abc/edit")
+    assert resume_parser.google_docs_breaker.state == breakers.CLOSED
+
+
+@pytest.mark.asyncio
+async def test_open_telegram_breaker_holds_alerts_as_pending():
+    for _ in range(config.BREAKER_FAILURE_THRESHOLD):
+        telegram_breaker.failure("timed out")
+    jobs = [Job(str(i), "Engineer", "Acme", "SG", f"https://x/{i}", keyword="Python") for i in (1, 2)]
+    application = MagicMock()
+    application.bot.send_message = AsyncMock()
+
+    sent, _ = await pipeline.process_new_jobs(application, jobs)
+
+    assert sent == 0
+    application.bot.send_message.assert_not_called()
+    # Only the first got as far as being stored; nothing was marked as dismissed
+    assert db.get_job_statuses(["1", "2"]) == {"1": "pending"}
+    # Its claim was given back, so the next scan may alert it right away
+    assert db.claim_job_alert("1", time.time(), config.SCAN_MIN_INTERVAL_MINUTES * 60)
+
+
+@pytest.mark.asyncio
+async def test_handle_breakers_reports_open_dependencies():
+    for _ in range(config.BREAKER_FAILURE_THRESHOLD):
+        scraper.linkedin_breaker.failure("HTTP 999")
+    update = MagicMock()
+    update.effective_chat.id = config.TELEGRAM_CHAT_ID
+    update.message = AsyncMock()
+
+    await handle_breakers(update, MagicMock())
+
+    text = update.message.reply_text.call_args[0][0]
+    assert "linkedin: open, next probe in" in text
+    assert "HTTP 999" in text
+    assert "telegram: closed" in text
+
+
+@pytest.mark.asyncio
+async def test_scan_rejected_by_open_breaker_stays_checkpointed():
+    for _ in range(config.BREAKER_FAILURE_THRESHOLD):
+        scraper.linkedin_breaker.failure("HTTP 999")
+    checkpoint = ScanCheckpoint.start(["Python"], "SG", "r604800")
+
+    with patch("scheduling.record_yields") as record_yields:
+        assert await main._run_checkpointed(None, checkpoint, {"Python": [None]}, 0) is None
+
+    record_yields.assert_not_called()
+    # Resumed later with nothing marked as fetched, and not held against the scan
+    assert ScanCheckpoint.interrupted().scan_id == checkpoint.scan_id
+    assert checkpoint.done_units() == []
+    assert checkpoint.record_failure() == 1
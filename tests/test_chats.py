@@ -0,0 +1,169 @@
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import config
+import db
+import filters
+import pipeline
+import planner
+import telegram_bot
+from models import Job
+from telegram_bot import handle_stats
+
+
+@pytest.fixture(autouse=True)
+def two_chats(monkeypatch):
+    monkeypatch.setattr(config, "TELEGRAM_CHAT_ID", "100")
+    monkeypatch.setattr(config, "TELEGRAM_EXTRA_CHAT_IDS", ["200"])
+
+
+def _job(job_id, keyword="Python", title="Python Engineer", company="Acme"):
+    return Job(job_id, title, company, "SG", f"https://x/{job_id}", keyword=keyword)
+
+
+def test_settings_and_profiles_are_per_chat():
+    db.set_setting("keywords", "Python")
+    db.set_setting("keywords", "Go", chat_id=200)
+    db.save_profile("raw", "primary profile", "Python")
+    db.save_profile("raw", "team profile", "Go", chat_id=200)
+
+    # The primary chat keeps the original tables
+    assert db.get_setting("keywords", chat_id=100) == "Python"
+    assert db.get_setting("keywords", chat_id=200) == "Go"
+    assert db.get_profile()["parsed_profile"] == "primary profile"
+    assert db.get_profile(200)["parsed_profile"] == "team profile"
+
+
+def test_plan_merges_identical_queries():
+    db.set_setting("keywords", "Python,Go")
+    db.set_setting("location", "SG")
+    db.set_setting("keywords", "python,Rust", chat_id=200)
+    db.set_setting("location", "SG", chat_id=200)
+
+    groups = planner.plan()
+
+    assert list(groups) == [("SG", config.JOB_TIMEFRAME)]
+    assert groups[("SG", config.JOB_TIMEFRAME)] == {
+        "Python": ["100", "200"],
+        "Go": ["100"],
+        "Rust": ["200"],
+    }
+
+
+def test_plan_keeps_different_locations_apart():
+    db.set_setting("keywords", "Python")
+    db.set_setting("location", "SG")
+    db.set_setting("keywords", "Python", chat_id=200)
+    db.set_setting("location", "Remote", chat_id=200)
+
+    groups = planner.plan()
+
+    assert groups[("SG", config.JOB_TIMEFRAME)] == {"Python": ["100"]}
+    assert groups[("Remote", config.JOB_TIMEFRAME)] == {"Python": ["200"]}
+
+
+@pytest.mark.asyncio
+async def test_scraped_jobs_fan_out_with_per_chat_state():
+    db.insert_job("1", "Python Engineer", "Acme", "SG", "https://x/1")
+    db.update_job_status("1", "ignored")
+    filters.add_rule("exclude", "title", "intern", chat_id=200)
+
+    jobs = [_job("1"), _job("2", title="Python Intern"), _job("3", keyword="Go", title="Go Developer", company="Globex")]
+    subscribers = {"Python": ["100", "200"], "Go": ["200"]}
+    sent = []
+
+    async def send(application, job, chat_id=None):
+        sent.append((chat_id, job["job_id"]))
+
+    with patch("telegram_bot.send_job_alert", new=AsyncMock(side_effect=send)):
+        total, new_counts = await pipeline.process_new_jobs(None, jobs, subscribers=subscribers)
+
+    # 100 ignored job 1; 200 excludes interns and is the only chat following Go
+    assert sorted(sent) == [("100", "2"), ("200", "1"), ("200", "3")]
+    assert total == 3
+    assert new_counts == {"Python": 1, "Go": 1}
+    assert db.get_job_statuses(["1", "2", "3"], chat_id=200) == {"1": "pending", "3": "pending"}
+
+    db.update_job_status("3", "viewed", chat_id=200)
+    assert db.get_job_statuses(["3"], chat_id=200) == {"3": "viewed"}
+    assert db.get_known_job_ids(["1", "2", "3", "4"]) == {"1", "2", "3"}
+
+
+def test_card_skipped_only_when_every_chat_dismissed_it():
+    db.insert_job("1", "Python Engineer", "Acme", "SG", "https://x/1", status="ignored")
+    assert not db.job_exists("1")
+
+    db.insert_job("1", "Python Engineer", "Acme", "SG", "https://x/1", status="viewed", chat_id=200)
+    assert db.job_exists("1")
+
+
+def test_scrape_filter_drops_only_what_every_chat_rejects():
+    filters.add_rule("exclude", "title", "intern")
+    filters.add_rule("exclude", "title", "intern", chat_id=200)
+    filters.add_rule("exclude", "company", "Acme", chat_id=200)
+
+    scrape_filter = filters.load_scrape_filter()
+
+    assert scrape_filter.rejects(_job("1", title="Python Intern"))
+    assert not scrape_filter.rejects(_job("2"))
+    assert filters.load_filter(200).rejects(_job("2"))
+
+
+def test_postings_are_shared_and_history_is_per_chat():
+    db.insert_job("1", "Python Engineer", "Acme", "SG", "https://x/1", keyword="Python", chat_id=200)
+
+    # Stored once with its details, but not part of the primary chat's history
+    assert [row["title"] for row in db.list_jobs(chat_id=200)] == ["Python Engineer"]
+    assert db.list_jobs() == []
+    assert db.get_job_statuses(["1"]) == {}
+    assert db.get_stats()["status"] == []
+
+    # The primary chat taking the posting up later counts as new there
+    assert db.insert_job("1", "Python Engineer", "Acme", "SG", "https://x/1", status="viewed", keyword="Python")
+    assert not db.insert_job("1", "Python Engineer", "Acme", "SG", "https://x/1", keyword="Python")
+    assert [row["status"] for row in db.list_jobs()] == ["viewed"]
+    assert [row["status"] for row in db.list_jobs(chat_id=200)] == ["pending"]
+
+
+@pytest.mark.asyncio
+async def test_search_and_stats_cover_only_the_calling_chat():
+    db.insert_job("1", "Python Engineer", "Acme", "SG", "https://x/1", keyword="Python")
+    db.insert_job("2", "Python Developer", "Globex", "Remote", "https://x/2", keyword="Python", chat_id=200)
+
+    assert [row["job_id"] for row in db.search_jobs("python")] == ["1"]
+    assert [row["job_id"] for row in db.search_jobs("python", chat_id=200)] == ["2"]
+
+    update = MagicMock()
+    update.effective_chat.id = 200
+    update.message = AsyncMock()
+    await handle_stats(update, MagicMock())
+
+    text = update.message.reply_text.call_args[0][0]
+    assert "Globex: 1" in text
+    assert "Remote: 1" in text
+    assert "Python: 1" in text
+    assert "Acme" not in text
+
+
+def test_chat_ids_must_be_numeric(monkeypatch):
+    assert config._chat_id("TELEGRAM_CHAT_ID", "-1001234") == "-1001234"
+    with pytest.raises(ValueError, match="TELEGRAM_EXTRA_CHAT_IDS"):
+        config._chat_id("TELEGRAM_EXTRA_CHAT_IDS", "@team")
+
+    monkeypatch.setattr(config, "TELEGRAM_CHAT_ID", "")
+    with pytest.raises(ValueError, match="TELEGRAM_CHAT_ID is not set"):
+        telegram_bot.create_application()
+
+
+@pytest.mark.asyncio
+async def test_buttons_from_other_chats_are_ignored():
+    db.insert_job("1", "Python Engineer", "Acme", "SG", "https://x/1")
+    update = MagicMock()
+    update.effective_chat.id = 300
+    update.callback_query = AsyncMock()
+    update.callback_query.data = "viewed:1"
+
+    await telegram_bot.handle_callback(update, MagicMock())
+
+    assert db.get_job_statuses(["1"]) == {"1": "pending"}
+    update.callback_query.edit_message_text.assert_not_called()
@@ -0,0 +1,171 @@
+import asyncio
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import config
+import db
+import main
+import pipeline
+import scraper
+from checkpoint import ScanCheckpoint
+from models import Job
+from scraper import LinkedInJobScraper
+
+
+def _job(job_id, keyword="Python"):
+    return Job(job_id, f"Job {job_id}", "Acme", "SG", f"https://x/{job_id}", keyword=keyword)
+
+
+def _fake_pages(pages_per_keyword=3, per_page=2):
+    calls = []
+
+    def fetch(keyword, location, timeframe, page):
+        calls.append((keyword, page))
+        if page >= pages_per_keyword:
+            return None
+        return [_job(f"{keyword}-{page}-{i}", keyword=None) for i in range(per_page)]
+
+    return fetch, calls
+
+
+@pytest.fixture(autouse=True)
+def clear_stop_event():
+    scraper.stop_event.clear()
+    yield
+    scraper.stop_event.clear()
+
+
+def test_interrupted_search_resumes_without_refetching():
+    fetch, calls = _fake_pages()
+
+    def fetch_then_stop(*args):
+        result = fetch(*args)
+        if len(calls) == 2:
+            scraper.stop_event.set()
+        return result
+
+    checkpoint = ScanCheckpoint.start(["A", "B"], "SG", "r604800")
+    li = LinkedInJobScraper()
+    with patch.object(li, "_fetch_page", side_effect=fetch_then_stop):
+        li.search_jobs(["A", "B"], "SG", budget=10, checkpoint=checkpoint)
+    assert len(calls) == 2
+
+    scraper.stop_event.clear()
+    resumed = ScanCheckpoint.interrupted()
+    assert resumed.scan_id == checkpoint.scan_id
+    assert resumed.keywords == ["A", "B"]
+
+    li = LinkedInJobScraper()
+    with patch.object(li, "_fetch_page", side_effect=fetch):
+        jobs = li.search_jobs(resumed.keywords, "SG", budget=10, checkpoint=resumed)
+
+    # Every page fetched exactly once across both runs
+    assert len(calls) == len(set(calls))
+    assert len(calls) == 8
+    assert len(jobs) == 12
+    assert {job["keyword"] for job in jobs} == {"A", "B"}
+
+
+def test_failed_pages_are_checkpointed():
+    checkpoint = ScanCheckpoint.start(["A"], "SG", "r604800")
+    checkpoint.record_unit("A", 0, None, [])
+    assert checkpoint.done_units() == [("A", 0, None)]
+
+
+@pytest.mark.asyncio
+async def test_resumed_scan_does_not_repeat_alerts():
+    checkpoint = ScanCheckpoint.start(["Python"], "SG", "r604800")
+    jobs = [_job("1"), _job("2"), _job("3")]
+    checkpoint.record_unit("Python", 0, 3, jobs)
+
+    sent_ids = []
+
+    async def send(application, job, chat_id=None):
+        sent_ids.append(job["job_id"])
+        if len(sent_ids) == 2:
+            scraper.stop_event.set()
+
+    with patch("telegram_bot.send_job_alert", new=AsyncMock(side_effect=send)):
+        await pipeline.process_new_jobs(None, checkpoint.jobs(), checkpoint)
+        assert sent_ids == ["1", "2"]
+
+        scraper.stop_event.clear()
+        resumed = ScanCheckpoint.interrupted()
+        sent, _ = await pipeline.process_new_jobs(None, resumed.jobs(), resumed)
+
+    assert sent == 1
+    assert sent_ids == ["1", "2", "3"]
+
+
+@pytest.mark.asyncio
+async def test_run_scan_finishes_checkpoint():
+    checkpoint = ScanCheckpoint.start(["Python"], "SG", "r604800")
+    with patch("scraper.scrape_new_jobs", return_value=[_job("1")]), \
+         patch("telegram_bot.send_job_alert", new=AsyncMock()):
+        result = await pipeline.run_scan(None, checkpoint)
+
+    assert result == (1, 1)
+    assert ScanCheckpoint.interrupted() is None
+    assert db.get_scan_units(checkpoint.scan_id) == []
+    assert db.get_scan_jobs(checkpoint.scan_id) == []
+
+
+@pytest.mark.asyncio
+async def test_run_scan_interrupted_keeps_checkpoint():
+    checkpoint = ScanCheckpoint.start(["Python"], "SG", "r604800")
+
+    def scrape(*args, **kwargs):
+        scraper.stop_event.set()
+        return []
+
+    with patch("scraper.scrape_new_jobs", side_effect=scrape):
+        assert await pipeline.run_scan(None, checkpoint) is None
+
+    assert ScanCheckpoint.interrupted().scan_id == checkpoint.scan_id
+
+
+def test_new_scan_supersedes_interrupted_one():
+    old = ScanCheckpoint.start(["Python"], "SG", "r604800")
+    old.record_unit("Python", 0, 1, [_job("1")])
+    new = ScanCheckpoint.start(["Go"], "SG", "r604800")
+
+    assert ScanCheckpoint.interrupted().scan_id == new.scan_id
+    assert old.jobs() == []
+
+
+@pytest.mark.asyncio
+async def test_scan_that_keeps_failing_is_abandoned(monkeypatch):
+    monkeypatch.setattr(config, "SCAN_MAX_FAILURES", 2)
+    checkpoint = ScanCheckpoint.start(["Python"], "SG", "r604800")
+    checkpoint.record_unit("Python", 0, 1, [_job("1")])
+
+    with patch("pipeline.run_scan", side_effect=RuntimeError("parser bug")):
+        assert await main._run_checkpointed(None, checkpoint, {}, 0) is None
+        assert ScanCheckpoint.interrupted().scan_id == checkpoint.scan_id
+        assert await main._run_checkpointed(None, ScanCheckpoint.interrupted(), {}, 0) is None
+
+    # Due queries get a fresh scan next time
+    assert ScanCheckpoint.interrupted() is None
+    assert checkpoint.jobs() == []
+
+
+@pytest.mark.asyncio
+async def test_shutdown_waits_for_the_running_scan_before_stopping_the_scheduler():
+    scheduler = MagicMock()
+    finished = []
+
+    async def scan():
+        async with pipeline.scan_lock:
+            await asyncio.sleep(0.05)
+            finished.append(scheduler.shutdown.called)
+
+    running = asyncio.create_task(scan())
+    await asyncio.sleep(0)
+    await main._stop_scans(scheduler)
+
+    assert running.done() and not running.cancelled()
+    assert finished == [False]
+    scheduler.pause.assert_called_once()
+    scheduler.shutdown.assert_called_once_with(wait=False)
+    pipeline.scan_lock.release()
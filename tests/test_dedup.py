@@ -0,0 +1,99 @@
+import time
+
+import pytest
+
+import config
+import db
+import dedup
+
+
+def _job(job_id, title="Senior Machine Learning Engineer", company="Acme AI", location="Singapore", **extra):
+    return {
+        "job_id": job_id,
+        "title": title,
+        "company": company,
+        "location": location,
+        "url": f"https://www.linkedin.com/jobs/view/{job_id}",
+        **extra,
+    }
+
+
+def _store(job, status="pending"):
+    db.insert_job(job["job_id"], job["title"], job["company"], job["location"], job["url"], status)
+    dedup.record_fingerprint(job)
+
+
+def test_simhash_is_stable_and_normalized():
+    a = dedup.simhash(_job("1"))
+    b = dedup.simhash(_job("2", title="Senior Machine-Learning Engineer!", company="ACME AI"))
+    assert a == b
+    assert dedup.hamming(a, dedup.simhash(_job("3", title="Accountant", company="Big Bank"))) > 3
+
+
+def test_bands_roundtrip_signed_storage():
+    value = (1 << 64) - 1
+    assert dedup._from_signed(dedup._to_signed(value)) == value
+    assert dedup.bands(value) == (0xFFFF,) * 4
+
+
+def test_repost_of_ignored_job_is_merged():
+    _store(_job("100"), status="ignored")
+
+    kept = dedup.suppress_near_duplicates([_job("200")])
+
+    assert kept == []
+    assert db.get_job_statuses(["200"]) == {"200": "ignored"}
+    assert db.job_exists("200") is True
+
+
+def test_repost_of_recent_pending_job_is_suppressed():
+    _store(_job("100"))
+    assert dedup.suppress_near_duplicates([_job("200", posted_at="2024-05-10T09:00:00")]) == []
+    # Stored, so later scans skip it without fingerprinting it again
+    assert db.get_job_statuses(["200"]) == {"200": "suppressed"}
+    assert db.job_exists("200") is True
+    assert {job["job_id"]: job["posted_at"] for job in db.list_jobs()}["200"] == "2024-05-10T09:00:00"
+
+
+def test_stored_pending_job_passes_through():
+    _store(_job("100"))
+    kept = dedup.suppress_near_duplicates([_job("100")])
+    assert [job["job_id"] for job in kept] == ["100"]
+
+
+def test_different_job_is_kept():
+    _store(_job("100"), status="viewed")
+    kept = dedup.suppress_near_duplicates([_job("200", title="Data Analyst", company="Other Co")])
+    assert [job["job_id"] for job in kept] == ["200"]
+
+
+def test_duplicates_within_batch_keep_first():
+    kept = dedup.suppress_near_duplicates([_job("1"), _job("2"), _job("3", title="Product Designer")])
+    assert [job["job_id"] for job in kept] == ["1", "3"]
+
+
+def test_max_distance_is_limited_to_what_the_bands_guarantee():
+    assert config._near_dup_distance("3") == 3
+    with pytest.raises(ValueError, match="between 0 and 3"):
+        config._near_dup_distance("4")
+
+
+def test_backfill_fingerprints_existing_jobs():
+    db.insert_job("1", "Engineer", "Acme", "SG", "https://link", "ignored")
+    db.insert_job("2", "Designer", "Acme", "SG", "https://link", "viewed")
+    assert dedup.backfill_fingerprints(batch_size=1) == 2
+    assert dedup.backfill_fingerprints() == 0
+
+
+def test_lookup_stays_fast_with_many_fingerprints():
+    entries = []
+    for i in range(20000):
+        value = dedup.simhash(_job(str(i), title=f"Role {i}", company=f"Company {i}"))
+        entries.append((str(i), dedup._to_signed(value), dedup.bands(value)))
+    db.save_fingerprints(entries)
+
+    value = dedup.simhash(_job("new"))
+    start = time.perf_counter()
+    for _ in range(100):
+        dedup.find_near_duplicate(_job("new"), value)
+    assert (time.perf_counter() - start) / 100 < 0.01
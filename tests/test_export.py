@@ -0,0 +1,158 @@
+import csv
+import json
+import os
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+import config
+import db
+import export
+from telegram_bot import handle_export
+
+
+def _store(first, last):
+    for i in range(first, last + 1):
+        db.insert_job(str(i), f"Engineer {i}", "Acme", "SG", f"https://x/{i}", keyword="Python")
+
+
+def test_csv_export_includes_details_and_verdicts(tmp_path):
+    _store(1, 3)
+    db.save_job_details("2", "Build, ship \"things\".\nOn call.", "Senior", "Full-time")
+    db.save_verdicts([("3", False, "junior role")])
+
+    path = str(tmp_path / "jobs.csv")
+    assert export.export_jobs(path, "csv") == (3, 3)
+
+    with open(path, newline="") as f:
+        rows = list(csv.DictReader(f))
+    assert [row["job_id"] for row in rows] == ["1", "2", "3"]
+    assert rows[1]["description"] == "Build, ship \"things\".\nOn call."
+    assert (rows[2]["fit"], rows[2]["reason"]) == ("False", "junior role")
+    assert rows[0]["fit"] == ""
+
+
+def test_export_reads_in_chunks(tmp_path):
+    _store(1, 7)
+    path = str(tmp_path / "jobs.ndjson")
+    with patch("db.get_export_rows", wraps=db.get_export_rows) as get_rows:
+        count, _ = export.export_jobs(path, "ndjson", chunk_rows=3)
+
+    assert count == 7
+    assert [call.args for call in get_rows.call_args_list] == [(0, 3, None), (3, 3, None), (6, 3, None), (7, 3, None)]
+    with open(path) as f:
+        assert [json.loads(line)["job_id"] for line in f] == [str(i) for i in range(1, 8)]
+
+
+def test_incremental_exports_only_new_rows(tmp_path):
+    _store(1, 3)
+    assert export.export_jobs(str(tmp_path / "a.ndjson"), "ndjson", incremental=True) == (3, 3)
+    _store(4, 5)
+    assert export.export_jobs(str(tmp_path / "b.ndjson"), "ndjson", incremental=True) == (2, 5)
+    assert export.export_jobs(str(tmp_path / "c.ndjson"), "ndjson", incremental=True) == (0, 5)
+    # Watermarks are per format; a full export ignores them
+    assert export.export_jobs(str(tmp_path / "d.csv"), "csv", incremental=True) == (5, 5)
+    assert export.export_jobs(str(tmp_path / "e.ndjson"), "ndjson") == (5, 5)
+
+
+def test_failed_export_leaves_no_file_and_keeps_watermark(tmp_path):
+    _store(1, 3)
+    path = tmp_path / "exports" / "jobs.csv"
+    with patch("db.get_export_rows", side_effect=[db.get_export_rows(0, 2), OSError("disk full")]):
+        with pytest.raises(OSError):
+            export.export_jobs(str(path), "csv", incremental=True)
+
+    assert list((tmp_path / "exports").iterdir()) == []
+    assert export.export_jobs(str(path), "csv", incremental=True) == (3, 3)
+
+
+def test_parquet_export(tmp_path):
+    parquet = pytest.importorskip("pyarrow.parquet")
+    _store(1, 4)
+    db.save_verdicts([("1", True, "fits")])
+    path = str(tmp_path / "jobs.parquet")
+    export.export_jobs(path, "parquet", chunk_rows=3)
+
+    table = parquet.read_table(path)
+    assert table.num_rows == 4
+    assert table.column("fit").to_pylist() == [True, None, None, None]
+
+
+@pytest.mark.asyncio
+async def test_handle_export_sends_file(monkeypatch):
+    _store(1, 2)
+    update = MagicMock()
+    update.effective_chat.id = config.TELEGRAM_CHAT_ID
+    update.message = AsyncMock()
+    context = MagicMock()
+
+    context.args = ["ndjson", "new"]
+    await handle_export(update, context)
+    sent = update.message.reply_document.call_args.kwargs
+    assert sent["filename"].startswith("jobs-") and sent["filename"].endswith(".ndjson")
+    assert sent["caption"] == "2 jobs"
+    # Nothing is left behind once sent
+    assert not os.path.exists(sent["document"].name)
+    assert not os.path.exists(os.path.dirname(export.default_path("ndjson")))
+
+    await handle_export(update, context)
+    assert update.message.reply_text.call_args[0][0] == "No new jobs since the last export."
+
+    context.args = ["xlsx"]
+    await handle_export(update, context)
+    assert "Usage" in update.message.reply_text.call_args[0][0]
+
+
+@pytest.mark.asyncio
+async def test_handle_export_keeps_only_files_too_large_to_send(monkeypatch):
+    monkeypatch.setattr("telegram_bot.MAX_DOCUMENT_BYTES", 10)
+    _store(1, 2)
+    update = MagicMock()
+    update.effective_chat.id = config.TELEGRAM_CHAT_ID
+    update.message = AsyncMock()
+    context = MagicMock()
+    context.args = ["csv"]
+
+    await handle_export(update, context)
+
+    update.message.reply_document.assert_not_called()
+    kept = update.message.reply_text.call_args[0][0].split(" to ")[1].split(";")[0]
+    assert os.path.dirname(kept) == os.path.dirname(export.default_path("csv"))
+    assert os.path.exists(kept)
+
+
+def test_exports_and_watermarks_are_per_chat(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "TELEGRAM_EXTRA_CHAT_IDS", ["200"])
+    _store(1, 2)
+    db.insert_job("3", "Go Dev", "Globex", "SG", "https://x/3", keyword="Go", chat_id=200)
+    db.save_verdicts([("3", True, "team fit")], chat_id=200)
+
+    path = str(tmp_path / "team.ndjson")
+    assert export.export_jobs(path, "ndjson", incremental=True, chat_id=200) == (1, 1)
+    with open(path) as f:
+        rows = [json.loads(line) for line in f]
+    assert [(row["job_id"], row["keyword"], row["fit"]) for row in rows] == [("3", "Go", True)]
+
+    # The team chat's watermark doesn't move the primary chat's
+    assert export.export_jobs(str(tmp_path / "all.ndjson"), "ndjson", incremental=True) == (2, 2)
+
+
+def test_incremental_export_includes_postings_first_stored_for_another_chat(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "TELEGRAM_EXTRA_CHAT_IDS", ["200"])
+    _store(1, 1)
+    db.insert_job("2", "Go Dev", "Globex", "SG", "https://x/2", keyword="Go", chat_id=200)
+
+    def exported(chat_id=None):
+        path = str(tmp_path / "jobs.ndjson")
+        export.export_jobs(path, "ndjson", incremental=True, chat_id=chat_id)
+        with open(path) as f:
+            return [json.loads(line)["job_id"] for line in f]
+
+    assert exported(200) == ["2"]
+    assert exported() == ["1"]
+
+    # Each chat takes up the other's older, lower-id posting after its last export
+    db.insert_job("1", "Engineer 1", "Acme", "SG", "https://x/1", keyword="Python", chat_id=200)
+    db.insert_job("2", "Go Dev", "Globex", "SG", "https://x/2", keyword="Go")
+    assert exported(200) == ["1"]
+    assert exported() == ["2"]
@@ -0,0 +1,110 @@
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+import config
+import filters
+from telegram_bot import handle_exclude, handle_unfilter
+
+
+def _job(title="Senior Python Engineer", company="Acme", location="Singapore"):
+    return {"job_id": "1", "title": title, "company": company, "location": location}
+
+
+def test_normalize_strips_accents_and_punctuation():
+    assert filters.normalize("Café-Bar, Zürich!") == ("cafe", "bar", "zurich")
+
+
+def test_exclude_matches_whole_words_only():
+    job_filter = filters.JobFilter([{"action": "exclude", "field": "title", "pattern": "intern"}])
+    assert job_filter.rejects(_job(title="Software Engineering Intern"))
+    assert not job_filter.rejects(_job(title="International Sales Engineer"))
+
+
+def test_exclude_phrase_on_any_field():
+    job_filter = filters.JobFilter([{"action": "exclude", "field": "any", "pattern": "Talent Acquisition"}])
+    assert job_filter.rejects(_job(company="XYZ Talent-Acquisition Partners"))
+    assert not job_filter.rejects(_job(company="Talent Labs"))
+
+
+def test_include_rules_require_a_match_per_field():
+    job_filter = filters.JobFilter([
+        {"action": "include", "field": "title", "pattern": "python"},
+        {"action": "include", "field": "title", "pattern": "data engineer"},
+    ])
+    assert not job_filter.rejects(_job(title="Senior Python Engineer"))
+    assert not job_filter.rejects(_job(title="Lead Data Engineer"))
+    assert job_filter.rejects(_job(title="Java Developer"))
+
+
+def test_many_rules_still_match():
+    rules = [{"action": "exclude", "field": "company", "pattern": f"agency {i}"} for i in range(500)]
+    job_filter = filters.JobFilter(rules)
+    assert job_filter.rejects(_job(company="Agency 499"))
+    assert not job_filter.rejects(_job(company="Agency"))
+
+
+def test_add_remove_rules_and_recompile():
+    assert not filters.load_filter().rejects(_job(company="Recruit Co"))
+
+    filters.add_rule("exclude", "company", "recruit")
+    filters.add_rule("exclude", "company", "recruit")  # duplicates ignored
+    assert len(filters.get_rules()) == 1
+    assert filters.load_filter().rejects(_job(company="Recruit Co"))
+
+    removed = filters.remove_rule(1)
+    assert removed["pattern"] == "recruit"
+    assert not filters.load_filter().rejects(_job(company="Recruit Co"))
+
+
+def test_add_rule_rejects_bad_input():
+    with pytest.raises(ValueError):
+        filters.add_rule("exclude", "salary", "low")
+    with pytest.raises(ValueError):
+        filters.add_rule("exclude", "title", "!!!")
+
+
+@pytest.mark.asyncio
+async def test_handle_exclude_with_field():
+    update = MagicMock()
+    update.effective_chat.id = config.TELEGRAM_CHAT_ID
+    update.message = AsyncMock()
+    context = MagicMock()
+    context.args = ["title", "Intern"]
+
+    await handle_exclude(update, context)
+
+    assert filters.get_rules() == [{"action": "exclude", "field": "title", "pattern": "Intern"}]
+
+
+@pytest.mark.asyncio
+async def test_handle_unfilter_unknown_index():
+    update = MagicMock()
+    update.effective_chat.id = config.TELEGRAM_CHAT_ID
+    update.message = AsyncMock()
+    context = MagicMock()
+    context.args = ["3"]
+
+    await handle_unfilter(update, context)
+
+    assert "No rule #3" in update.message.reply_text.call_args[0][0]
+
+
+def test_scraper_drops_rejected_cards(monkeypatch):
+    import scraper
+
+    monkeypatch.setattr(scraper.rate_limiter, "min_interval", 0)
+    filters.add_rule("exclude", "title", "intern")
+
+    html = "".join(
+        f'<div class="base-card"><a class="base-card__full-link" href="/jobs/view/{job_id}/"></a>'
+        f'<h3 class="base-search-card__title">{title}</h3></div>'
+        for job_id, title in [("1", "ML Intern"), ("2", "ML Engineer")]
+    )
+    pages = [MagicMock(text=html), MagicMock(text="")]
+    li_scraper = scraper.LinkedInJobScraper()
+    li_scraper.session.get = MagicMock(side_effect=pages)
+
+    jobs = li_scraper._search_single_keyword("ML", "Singapore", "r86400", limit=10)
+
+    assert [job["job_id"] for job in jobs] == ["2"]
+    assert li_scraper.rejected == 1
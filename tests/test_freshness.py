@@ -0,0 +1,130 @@
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from bs4 import BeautifulSoup
+
+import api
+import config
+import db
+import pipeline
+import scraper
+from checkpoint import ScanCheckpoint
+from models import Job
+from telegram_bot import handle_freshness
+
+NOW = datetime(2024, 5, 10, 12, 0, 0)
+
+
+def _card_time(html):
+    return scraper._parse_card_time(BeautifulSoup(html, "html.parser").find("time"), NOW)
+
+
+def _job(job_id, posted_at):
+    return Job(job_id, "Engineer", "Acme", "SG", f"https://x/{job_id}", keyword="Python", posted_at=posted_at)
+
+
+def test_card_time_uses_relative_text_only_when_finer_than_the_date():
+    assert _card_time('<time datetime="2024-05-10">2 hours ago</time>') == "2024-05-10T10:00:00"
+    assert _card_time('<time datetime="2024-05-08">2 days ago</time>') == "2024-05-08T00:00:00"
+    assert _card_time('<time datetime="2024-05-01">Just now</time>') == "2024-05-01T00:00:00"
+    assert _card_time("<time>1 week ago</time>") == "2024-05-03T12:00:00"
+    assert _card_time("<time>Recently</time>") is None
+    assert scraper._parse_card_time(None) is None
+
+
+def test_freshest_first_drops_stale_and_orders_newest_first():
+    jobs = [_job("old", "2024-05-01T00:00:00"), _job("undated", None),
+            _job("new", "2024-05-10T11:50:00"), _job("mid", "2024-05-10T06:00:00")]
+
+    assert [job.job_id for job in pipeline.freshest_first(jobs)] == ["new", "mid", "old", "undated"]
+    fresh = pipeline.freshest_first(jobs, max_age_hours=24, now=NOW)
+    assert [job.job_id for job in fresh] == ["new", "mid", "undated"]
+
+
+@pytest.mark.asyncio
+async def test_stale_postings_are_never_stored_or_alerted(monkeypatch):
+    monkeypatch.setattr(config, "MAX_POSTING_AGE_HOURS", 24)
+    now = datetime.utcnow().replace(microsecond=0)
+    jobs = [_job("1", now.replace(year=now.year - 1).isoformat()), _job("2", now.isoformat())]
+    sent = []
+
+    async def send(application, job, chat_id=None):
+        sent.append(job.job_id)
+
+    with patch("telegram_bot.send_job_alert", new=AsyncMock(side_effect=send)):
+        total, _ = await pipeline.process_new_jobs(None, jobs)
+
+    assert sent == ["2"]
+    assert db.get_known_job_ids(["1", "2"]) == {"2"}
+    assert db.list_jobs()[0]["posted_at"] == now.isoformat()
+
+
+@pytest.mark.asyncio
+async def test_handle_freshness_sets_per_chat_threshold():
+    update = MagicMock()
+    update.effective_chat.id = config.TELEGRAM_CHAT_ID
+    update.message = AsyncMock()
+    context = MagicMock()
+
+    context.args = ["2d"]
+    await handle_freshness(update, context)
+    assert pipeline.max_posting_age_hours(config.TELEGRAM_CHAT_ID) == 48
+    assert "2 days" in update.message.reply_text.call_args[0][0]
+
+    context.args = ["soon"]
+    await handle_freshness(update, context)
+    assert "Invalid" in update.message.reply_text.call_args[0][0]
+    assert pipeline.max_posting_age_hours(config.TELEGRAM_CHAT_ID) == 48
+
+    context.args = ["off"]
+    await handle_freshness(update, context)
+    assert pipeline.max_posting_age_hours(config.TELEGRAM_CHAT_ID) == 0
+
+
+def test_api_filters_on_posting_time():
+    db.insert_job("1", "Engineer", "Acme", "SG", "https://x/1", posted_at="2024-05-01T09:00:00")
+    db.insert_job("2", "Engineer", "Acme", "SG", "https://x/2", posted_at="2024-05-09T09:00:00")
+    db.insert_job("3", "Engineer", "Acme", "SG", "https://x/3")
+
+    def job_ids(**params):
+        return [job["job_id"] for job in api.list_jobs({k: [v] for k, v in params.items()})["jobs"]]
+
+    assert job_ids(posted_since="2024-05-02") == ["2"]
+    assert job_ids(posted_until="2024-05-01 09:00:01") == ["1"]
+
+
+@pytest.mark.asyncio
+async def test_postings_stale_for_every_chat_are_dropped_as_scraped(monkeypatch):
+    monkeypatch.setattr(config, "FETCH_JOB_DETAILS", True)
+    monkeypatch.setattr(config, "TELEGRAM_EXTRA_CHAT_IDS", ["200"])
+    monkeypatch.setattr(scraper.rate_limiter, "min_interval", 0)
+    db.set_setting("max_age_hours", "24")
+    db.set_setting("max_age_hours", "48", 200)
+    now = datetime.utcnow().replace(microsecond=0)
+    cards = [Job(job_id, title, "Acme", "SG", f"https://x/{job_id}", posted_at=posted_at.isoformat())
+             for job_id, title, posted_at in [("week", "Data Engineer", now - timedelta(days=7)),
+                                              ("day-and-a-half", "Site Reliability Engineer", now - timedelta(hours=36)),
+                                              ("now", "Backend Developer", now)]]
+    sent = []
+
+    def fetch(keyword, location, timeframe, page):
+        return list(cards) if page == 0 else None
+
+    async def send(application, job, chat_id=None):
+        sent.append((chat_id, job.job_id))
+
+    checkpoint = ScanCheckpoint.start(["Python"], "SG", "r604800")
+    with patch.object(scraper.LinkedInJobScraper, "_fetch_page", side_effect=fetch), \
+            patch("db.save_scan_unit", wraps=db.save_scan_unit) as save_unit, \
+            patch("scheduling.record_yields") as record_yields, \
+            patch("scraper.attach_job_details") as attach, \
+            patch("telegram_bot.send_job_alert", new=AsyncMock(side_effect=send)):
+        await pipeline.run_scan(None, checkpoint, subscribers={"Python": [None, "200"]})
+
+    # Never checkpointed, counted as yield or looked up
+    assert [job.job_id for job in save_unit.call_args_list[0].args[4]] == ["day-and-a-half", "now"]
+    assert record_yields.call_args.args[2] == {"Python": 2}
+    assert [job.job_id for job in attach.call_args[0][0]] == ["now", "day-and-a-half"]
+    # The 24h chat still drops what only the 48h chat wants
+    assert sent == [(None, "now"), ("200", "now"), ("200", "day-and-a-half")]
@@ -0,0 +1,83 @@
+from datetime import datetime
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+import db
+import scraper
+from models import Job
+
+
+DETAIL_HTML = """
+<html><body>
+  <span class="posted-time-ago__text">3 days ago</span>
+  <div class="show-more-less-html__markup"><p>Build ML systems.</p><p>Python required.</p></div>
+  <ul>
+    <li class="description__job-criteria-item">
+      <h3 class="description__job-criteria-subheader">Seniority level</h3>
+      <span class="description__job-criteria-text">Mid-Senior level</span>
+    </li>
+    <li class="description__job-criteria-item">
+      <h3 class="description__job-criteria-subheader">Employment type</h3>
+      <span class="description__job-criteria-text">Full-time</span>
+    </li>
+  </ul>
+</body></html>
+"""
+
+
+def _job(job_id):
+    return Job(job_id, "Engineer", "Acme", "SG", f"https://x/{job_id}")
+
+
+@pytest.fixture(autouse=True)
+def no_rate_limit(monkeypatch):
+    monkeypatch.setattr(scraper.rate_limiter, "min_interval", 0)
+
+
+def test_parse_relative_time():
+    now = datetime(2024, 5, 10, 12, 0, 0)
+    assert scraper._parse_relative_time("3 days ago", now) == "2024-05-07T12:00:00"
+    assert scraper._parse_relative_time("1 week ago", now) == "2024-05-03T12:00:00"
+    assert scraper._parse_relative_time("Reposted recently", now) == ""
+
+
+def test_parse_job_details():
+    details = scraper.LinkedInJobScraper()._parse_job_details(DETAIL_HTML)
+    assert details["description"] == "Build ML systems.\nPython required."
+    assert details["seniority"] == "Mid-Senior level"
+    assert details["employment_type"] == "Full-time"
+    assert details["posted_at"]
+
+
+def test_save_and_get_job_details_roundtrip():
+    db.save_job_details("123", "Long description " * 100, "Entry level", "Contract", "2024-05-01T00:00:00")
+    details = db.get_job_details(["123", "missing"])
+    assert list(details) == ["123"]
+    assert details["123"]["description"] == "Long description " * 100
+    assert details["123"]["employment_type"] == "Contract"
+
+
+def test_attach_job_details_fetches_each_job_once():
+    response = MagicMock(text=DETAIL_HTML)
+    response.raise_for_status = MagicMock()
+    jobs = [_job("1"), _job("2")]
+
+    with patch("requests.Session.get", return_value=response) as get:
+        scraper.attach_job_details(jobs)
+        assert get.call_count == 2
+        scraper.attach_job_details([_job("1"), _job("2")])
+        assert get.call_count == 2
+
+    assert jobs[0].seniority == "Mid-Senior level"
+    assert set(db.get_job_details(["1", "2"])) == {"1", "2"}
+
+
+def test_attach_job_details_skips_failed_fetch():
+    import requests
+
+    with patch("requests.Session.get", side_effect=requests.exceptions.ConnectionError("down")):
+        jobs = scraper.attach_job_details([_job("9")])
+
+    assert jobs[0].description is None
+    assert db.get_job_details(["9"]) == {}
@@ -0,0 +1,67 @@
+import config
+import db
+import leases
+from checkpoint import ScanCheckpoint
+
+KEYWORDS = ["Data", "Go", "Python", "Rust"]
+
+
+def _acquire_as(monkeypatch, instance, now):
+    monkeypatch.setattr(config, "INSTANCE_ID", instance)
+    return leases.acquire(KEYWORDS, "SG", now=now)
+
+
+def test_single_instance_holds_every_query(monkeypatch):
+    assert _acquire_as(monkeypatch, "a", 0) == KEYWORDS
+
+
+def test_queries_rebalance_when_an_instance_joins(monkeypatch):
+    monkeypatch.setattr(config, "LEASE_SECONDS", 100)
+    assert len(_acquire_as(monkeypatch, "a", 0)) == 4
+    # b is live but everything is leased to a
+    assert _acquire_as(monkeypatch, "b", 1) == []
+    # a gives up what exceeds its share, b picks it up
+    held_a = _acquire_as(monkeypatch, "a", 2)
+    held_b = _acquire_as(monkeypatch, "b", 3)
+
+    assert len(held_a) == 2 and len(held_b) == 2
+    assert sorted(held_a + held_b) == KEYWORDS
+
+
+def test_dead_instance_queries_are_taken_over(monkeypatch):
+    monkeypatch.setattr(config, "LEASE_SECONDS", 100)
+    _acquire_as(monkeypatch, "a", 0)
+    assert _acquire_as(monkeypatch, "b", 50) == []
+    # a stopped heartbeating; its leases have lapsed
+    assert _acquire_as(monkeypatch, "b", 150) == KEYWORDS
+
+
+def test_heartbeat_keeps_leases_alive(monkeypatch):
+    monkeypatch.setattr(config, "LEASE_SECONDS", 100)
+    _acquire_as(monkeypatch, "a", 0)
+    assert leases.heartbeat(now=90) == 4
+    assert _acquire_as(monkeypatch, "b", 150) == []
+
+
+def test_release_hands_over_immediately(monkeypatch):
+    _acquire_as(monkeypatch, "a", 0)
+    leases.release()
+    assert _acquire_as(monkeypatch, "b", 1) == KEYWORDS
+
+
+def test_job_alert_claimed_once_per_gap():
+    db.insert_job("1", "Dev", "Acme", "SG", "https://x/1")
+    assert db.claim_job_alert("1", 1000.0, 300)
+    assert not db.claim_job_alert("1", 1100.0, 300)
+    assert db.claim_job_alert("1", 1300.0, 300)
+
+
+def test_checkpoints_are_per_instance(monkeypatch):
+    monkeypatch.setattr(config, "INSTANCE_ID", "a")
+    scan_a = ScanCheckpoint.start(["Python"], "SG", "r604800")
+    monkeypatch.setattr(config, "INSTANCE_ID", "b")
+    scan_b = ScanCheckpoint.start(["Go"], "SG", "r604800")
+
+    assert ScanCheckpoint.interrupted().scan_id == scan_b.scan_id
+    monkeypatch.setattr(config, "INSTANCE_ID", "a")
+    assert ScanCheckpoint.interrupted().scan_id == scan_a.scan_id
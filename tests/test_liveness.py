@@ -0,0 +1,103 @@
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+import requests
+
+import db
+import dedup
+import liveness
+import main
+import pipeline
+from scraper import LinkedInJobScraper
+
+
+@pytest.fixture(autouse=True)
+def no_rate_limit(monkeypatch):
+    monkeypatch.setattr("scraper.rate_limiter.min_interval", 0)
+
+
+def _response(status, body=b""):
+    response = MagicMock(status_code=status)
+    response.iter_content.return_value = [body[i:i + 8192] for i in range(0, len(body), 8192)]
+    return response
+
+
+@pytest.mark.parametrize("response, live", [
+    (_response(200, b"<section class='top-card'>Apply</section>" + b"x" * 50000), True),
+    (_response(200, b"<span class='closed-job__flavor--closed'>No longer accepting applications</span>"), False),
+    (_response(404), False),
+    (_response(429), None),
+])
+def test_check_liveness_reads_status_and_closed_banner(response, live):
+    li = LinkedInJobScraper()
+    with patch.object(li.session, "get", return_value=response) as get:
+        assert li._check_liveness("123") is live
+    assert get.call_args.args[0].endswith("/jobs-guest/jobs/api/jobPosting/123")
+    response.close.assert_called_once()
+
+
+def test_check_liveness_network_error_is_inconclusive():
+    li = LinkedInJobScraper()
+    with patch.object(li.session, "get", side_effect=requests.exceptions.ConnectionError()):
+        assert li._check_liveness("123") is None
+
+
+def _store(*job_ids, status="pending"):
+    for job_id in job_ids:
+        db.insert_job(job_id, f"Engineer {job_id}", "Acme", "SG", f"https://x/{job_id}", status=status)
+
+
+def test_check_pending_expires_closed_postings():
+    _store("1", "2", "3")
+    _store("4", status="viewed")
+    db.insert_job("5", "Engineer 5", "Acme", "SG", "https://x/5", chat_id=200)
+    answers = {"1": False, "2": True, "3": None, "5": False}
+
+    with patch.object(LinkedInJobScraper, "_check_liveness", side_effect=lambda job_id: answers[job_id]) as check:
+        assert liveness.check_pending(batch_size=10) == (4, 2)
+        # Nothing is due again until the recheck interval passes
+        assert liveness.check_pending(batch_size=10) == (0, 0)
+
+    assert sorted(call.args[0] for call in check.call_args_list) == ["1", "2", "3", "5"]
+    assert db.get_job_statuses(["1", "2", "3", "4"]) == {"1": "expired", "2": "pending", "3": "pending", "4": "viewed"}
+    assert db.get_job_statuses(["5"], 200) == {"5": "expired"}
+    # Expired postings are never alerted again
+    assert db.job_exists("1")
+    assert {row["status"]: row["jobs"] for row in db.get_stats()["status"]} == {"pending": 2, "expired": 1, "viewed": 1}
+
+    later = db.get_liveness_candidates(time.time() + 1, 10)
+    assert sorted(later) == ["2", "3"]
+
+
+def test_check_pending_is_bounded_and_yields_to_scans():
+    _store(*[str(i) for i in range(10)])
+    stops = iter([False, False, True, True, True])
+
+    with patch.object(LinkedInJobScraper, "_check_liveness", return_value=True):
+        checked, _ = liveness.check_pending(batch_size=5, should_stop=lambda: next(stops))
+
+    assert checked == 2
+    # Skipped and unchecked postings are first in line next time
+    assert len(db.get_liveness_candidates(time.time() - 1, 100)) == 8
+
+
+def test_expired_original_does_not_suppress_repost():
+    job = {"job_id": "1", "title": "Senior ML Engineer", "company": "Acme AI", "location": "SG", "url": "u"}
+    _store("1")
+    dedup.record_fingerprint(job)
+    repost = dict(job, job_id="2")
+    assert dedup.suppress_near_duplicates([dict(repost)]) == []
+
+    db.expire_jobs(["1"])
+    assert [kept["job_id"] for kept in dedup.suppress_near_duplicates([dict(repost)])] == ["2"]
+
+
+@pytest.mark.asyncio
+async def test_liveness_check_skipped_while_scanning():
+    with patch("liveness.check_pending") as check:
+        async with pipeline.scan_lock:
+            await main.run_liveness_check()
+        check.assert_not_called()
+        await main.run_liveness_check()
+        check.assert_called_once()
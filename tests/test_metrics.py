@@ -0,0 +1,72 @@
+import urllib.request
+from unittest.mock import MagicMock, patch
+
+import requests
+
+import db
+import metrics
+from scraper import LinkedInJobScraper
+
+
+def test_counter_renders_labels_escaped():
+    counter = metrics.Counter("test_things_total", "Things.", ["name"])
+    counter.inc('say "hi"')
+    counter.inc('say "hi"', amount=2)
+
+    lines = counter.render()
+    assert lines[:2] == ["# HELP test_things_total Things.", "# TYPE test_things_total counter"]
+    assert lines[2] == 'test_things_total{name="say \\"hi\\""} 3'
+
+
+def test_histogram_buckets_are_cumulative():
+    histogram = metrics.Histogram("test_seconds", "Durations.", buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.7, 5.0):
+        histogram.observe(value)
+
+    lines = histogram.render()[2:]
+    assert lines == [
+        'test_seconds_bucket{le="0.1"} 1',
+        'test_seconds_bucket{le="1"} 3',
+        'test_seconds_bucket{le="+Inf"} 4',
+        "test_seconds_sum 6.25",
+        "test_seconds_count 4",
+    ]
+
+
+def test_db_calls_are_timed():
+    before = metrics.DB_SECONDS.count("insert_job")
+    db.insert_job("1", "Dev", "Acme", "SG", "https://x/1")
+    assert metrics.DB_SECONDS.count("insert_job") == before + 1
+
+
+def test_linkedin_status_codes_counted():
+    li = LinkedInJobScraper()
+    before_ok = metrics.LINKEDIN_RESPONSES.value("search", "429")
+    before_err = metrics.LINKEDIN_RESPONSES.value("search", "error")
+
+    response = MagicMock(status_code=429)
+    response.raise_for_status.side_effect = requests.exceptions.HTTPError("429")
+    with patch("scraper.rate_limiter.wait"), patch.object(li.session, "get", return_value=response):
+        assert li._fetch_page("Python", "SG", "r86400", 0) is None
+    with patch("scraper.rate_limiter.wait"), \
+         patch.object(li.session, "get", side_effect=requests.exceptions.ConnectionError()):
+        assert li._fetch_page("Python", "SG", "r86400", 0) is None
+
+    assert metrics.LINKEDIN_RESPONSES.value("search", "429") == before_ok + 1
+    assert metrics.LINKEDIN_RESPONSES.value("search", "error") == before_err + 1
+
+
+def test_server_exposes_metrics():
+    metrics.ALERTS_SENT.inc()
+    server = metrics.start_server("127.0.0.1", 0)
+    try:
+        url = f"http://127.0.0.1:{server.server_address[1]}/metrics"
+        with urllib.request.urlopen(url) as response:
+            body = response.read().decode()
+            assert response.headers["Content-Type"].startswith("text/plain")
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert "# TYPE radar_alerts_sent_total counter" in body
+    assert "radar_db_call_seconds_bucket" in body
@@ -0,0 +1,42 @@
+import json
+
+import pytest
+
+from models import Job
+
+
+def _job(**extra):
+    return Job("1", "Engineer", "".join(["Ac", "me"]), "".join(["Singa", "pore"]), "https://x/1", **extra)
+
+
+def test_company_and_location_strings_are_shared():
+    a, b = _job(), _job()
+    assert a.company is b.company
+    assert a.location is b.location
+
+
+def test_job_has_no_instance_dict():
+    with pytest.raises(AttributeError):
+        _job().__dict__
+    with pytest.raises(AttributeError):
+        _job().salary = "100k"
+
+
+def test_job_reads_like_a_dict():
+    job = _job(keyword="Python")
+    assert job["title"] == "Engineer"
+    assert job.get("description") is None
+    job.update({"description": "Build things.", "seniority": "Senior"})
+    job["simhash"] = 5
+    assert (job.description, job.seniority, job.simhash) == ("Build things.", "Senior", 5)
+    with pytest.raises(KeyError):
+        job["salary"]
+    with pytest.raises(KeyError):
+        job["salary"] = "100k"
+
+
+def test_json_roundtrip_keeps_set_fields_only():
+    job = _job(keyword="Python", posted_at="2024-05-01T00:00:00")
+    stored = json.loads(json.dumps(job.to_dict()))
+    assert "description" not in stored
+    assert Job.from_dict({**stored, "unknown": 1}) == job
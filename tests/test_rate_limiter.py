@@ -0,0 +1,36 @@
+import time
+
+from scraper import RateLimiter
+
+
+def test_wait_enforces_min_interval():
+    limiter = RateLimiter(0.05)
+    start = time.monotonic()
+    for _ in range(3):
+        limiter.wait()
+    assert time.monotonic() - start >= 0.1
+
+
+def test_wait_paces_at_requested_interval():
+    limiter = RateLimiter(0.0)
+    start = time.monotonic()
+    for _ in range(3):
+        limiter.wait(0.05)
+    assert time.monotonic() - start >= 0.1
+
+
+def test_jitter_never_goes_below_min_interval():
+    limiter = RateLimiter(0.02, jitter=0.9)
+    for _ in range(5):
+        limiter.wait()
+    slots = list(limiter._history)
+    gaps = [b - a for a, b in zip(slots, slots[1:])]
+    assert min(gaps) >= 0.02 - 1e-9
+
+
+def test_requests_per_minute_counts_recent_requests():
+    limiter = RateLimiter(0.0)
+    for _ in range(6):
+        limiter.wait()
+    assert limiter.requests_per_minute(window=60) == 6
+    assert limiter.requests_per_minute(window=120) == 3
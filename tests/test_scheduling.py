@@ -0,0 +1,56 @@
+import config
+import db
+import scheduling
+
+
+def test_new_queries_are_due():
+    assert scheduling.due_keywords(["Python", "Go"], "Singapore", now=1000) == ["Python", "Go"]
+
+
+def test_record_yields_schedules_next_run(monkeypatch):
+    monkeypatch.setattr(config, "SCHEDULE_JITTER", 0)
+    scheduling.record_yields(["Python"], "Singapore", {}, now=1000)
+
+    row = db.get_query_schedules("Singapore")["Python"]
+    assert row["last_run_at"] == 1000
+    assert row["next_run_at"] == 1000 + row["interval_minutes"] * 60
+    assert scheduling.due_keywords(["Python"], "Singapore", now=1001) == []
+    assert scheduling.due_keywords(["Python"], "Singapore", now=row["next_run_at"]) == ["Python"]
+    # Schedules are per location
+    assert scheduling.due_keywords(["Python"], "Remote", now=1001) == ["Python"]
+
+
+def test_dead_query_backs_off_to_max(monkeypatch):
+    monkeypatch.setattr(config, "SCAN_MAX_INTERVAL_MINUTES", 60)
+    now = 0
+    for _ in range(10):
+        scheduling.record_yields(["COBOL"], "SG", {}, now=now)
+        now = db.get_query_schedules("SG")["COBOL"]["next_run_at"]
+
+    assert db.get_query_schedules("SG")["COBOL"]["interval_minutes"] == 60
+
+
+def test_busy_query_speeds_up_to_min(monkeypatch):
+    monkeypatch.setattr(config, "SCAN_MIN_INTERVAL_MINUTES", 5)
+    now = 0
+    for _ in range(10):
+        scheduling.record_yields(["Python"], "SG", {"Python": 20}, now=now)
+        now = db.get_query_schedules("SG")["Python"]["next_run_at"]
+
+    assert db.get_query_schedules("SG")["Python"]["interval_minutes"] == 5
+
+
+def test_next_run_is_jittered(monkeypatch):
+    monkeypatch.setattr(config, "SCHEDULE_JITTER", 0.1)
+    scheduling.record_yields(["Python"], "SG", {}, now=0)
+    row = db.get_query_schedules("SG")["Python"]
+    delay = row["next_run_at"] / 60
+    assert 0.9 * row["interval_minutes"] <= delay <= 1.1 * row["interval_minutes"]
+
+
+def test_interval_changes_at_most_two_fold_per_scan():
+    scheduling.record_yields(["Python"], "SG", {}, now=0)
+    first = db.get_query_schedules("SG")["Python"]["interval_minutes"]
+    scheduling.record_yields(["Python"], "SG", {"Python": 500}, now=first * 60)
+    second = db.get_query_schedules("SG")["Python"]["interval_minutes"]
+    assert second >= first / 2
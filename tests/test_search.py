@@ -0,0 +1,105 @@
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+import config
+import db
+from telegram_bot import handle_callback, handle_search
+
+
+def _insert(job_id, title, company="Acme", location="Singapore", status="pending"):
+    db.insert_job(job_id, title, company, location, f"https://www.linkedin.com/jobs/view/{job_id}", status)
+
+
+def test_search_matches_title_company_and_prefix():
+    _insert("1", "Staff Machine Learning Engineer", company="X Labs")
+    _insert("2", "Backend Engineer", company="Y Corp")
+
+    assert [row["job_id"] for row in db.search_jobs("staff x")] == ["1"]
+    assert [row["job_id"] for row in db.search_jobs("mach")] == ["1"]
+    assert db.search_jobs("frontend") == []
+
+
+def test_search_ranks_title_hits_first():
+    _insert("1", "Data Analyst", company="Python Co")
+    _insert("2", "Python Developer", company="Other")
+    assert [row["job_id"] for row in db.search_jobs("python")] == ["2", "1"]
+
+
+def test_search_ignores_fts_syntax():
+    _insert("1", "C++ Engineer (Embedded)")
+    assert [row["job_id"] for row in db.search_jobs('c++ "embedded" OR NOT')] == []
+    assert [row["job_id"] for row in db.search_jobs("embedded)")] == ["1"]
+    assert db.search_jobs("  ") == []
+
+
+def test_search_indexes_descriptions_in_either_order():
+    db.save_job_details("1", "Work on pytorch training infrastructure")
+    _insert("1", "Engineer")
+    _insert("2", "Engineer")
+    db.save_job_details("2", "Tune pytorch kernels")
+
+    assert {row["job_id"] for row in db.search_jobs("pytorch")} == {"1", "2"}
+
+
+def test_search_keyset_pagination_covers_all_rows_once():
+    for i in range(12):
+        _insert(str(i), f"Platform Engineer {i}")
+
+    seen = []
+    after = None
+    while True:
+        rows = db.search_jobs("platform", limit=5, after=after)
+        if not rows:
+            break
+        seen.extend(row["job_id"] for row in rows)
+        after = (rows[-1]["score"], rows[-1]["id"])
+
+    assert sorted(seen, key=int) == [str(i) for i in range(12)]
+
+
+def test_search_index_backfills_existing_jobs():
+    """A database created before the index existed gets its history indexed."""
+    conn = db._get_conn()
+    conn.execute("DROP TABLE jobs_fts")
+    for trigger in ("jobs_fts_insert", "jobs_fts_update", "jobs_fts_delete", "job_details_fts_insert"):
+        conn.execute(f"DROP TRIGGER {trigger}")
+    conn.commit()
+    conn.close()
+    _insert("9", "Security Engineer")
+
+    db.init_db()
+
+    assert [row["job_id"] for row in db.search_jobs("security")] == ["9"]
+
+
+@pytest.mark.asyncio
+async def test_handle_search_pages_with_button():
+    for i in range(7):
+        _insert(str(i), f"Robotics Engineer {i}")
+
+    update = MagicMock()
+    update.effective_chat.id = config.TELEGRAM_CHAT_ID
+    update.message = AsyncMock()
+    context = MagicMock()
+    context.args = ["robotics"]
+    context.chat_data = {}
+
+    await handle_search(update, context)
+
+    text = update.message.reply_text.call_args[0][0]
+    keyboard = update.message.reply_text.call_args[1]["reply_markup"]
+    assert text.count("Robotics Engineer") == 5
+    next_data = keyboard.inline_keyboard[0][0].callback_data
+    assert next_data.startswith("srch:")
+
+    query = AsyncMock()
+    query.data = next_data
+    cb_update = MagicMock()
+    cb_update.effective_chat.id = config.TELEGRAM_CHAT_ID
+    cb_update.callback_query = query
+
+    await handle_callback(cb_update, context)
+
+    page_two = query.edit_message_text.call_args[0][0]
+    assert page_two.count("Robotics Engineer") == 2
+    assert query.edit_message_text.call_args[1]["reply_markup"] is None
@@ -0,0 +1,72 @@
+import sqlite3
+import subprocess
+import sys
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+import db
+import main
+from bench.startup import ROOT, time_to_first_answer
+
+# Generous for slow CI machines; a cold start answers in well under a second
+FIRST_ANSWER_BUDGET_SECONDS = 10
+
+
+def test_importing_main_leaves_heavy_dependencies_unloaded():
+    # Lazy modules sit in sys.modules unexecuted; their submodules only appear once used
+    code = (
+        "import sys, main; "
+        "print(','.join(m for m in ('ollama._client', 'bs4.element', 'requests.adapters') if m in sys.modules))"
+    )
+    result = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == ""
+
+
+def test_bot_answers_quickly_without_profile_or_ollama():
+    seconds = time_to_first_answer()
+    assert seconds is not None, "the bot never answered /stats"
+    assert seconds < FIRST_ANSWER_BUDGET_SECONDS
+
+
+@pytest.mark.asyncio
+async def test_profile_failure_keeps_bot_running_and_schedules_scans():
+    db.set_setting("keywords", "Python")
+    application = MagicMock()
+    application.bot.send_message = AsyncMock()
+    scheduler = MagicMock()
+
+    with patch("resume_parser.get_or_create_profile", side_effect=ConnectionError("ollama down")):
+        await main._deferred_startup(application, scheduler)
+
+    assert "ollama down" in application.bot.send_message.call_args.kwargs["text"]
+    # Saved keywords keep scanning
+    assert scheduler.add_job.call_args.args[0] is main.run_job_scan
+    assert db.get_setting("keywords") == "Python"
+
+
+@pytest.mark.asyncio
+async def test_profile_keywords_seed_settings():
+    scheduler = MagicMock()
+    with patch("resume_parser.get_or_create_profile", return_value=("profile", ["Go Developer"])):
+        await main._deferred_startup(MagicMock(), scheduler)
+
+    assert db.get_setting("keywords") == "Go Developer"
+    assert db.get_setting("location")
+    scheduler.add_job.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_startup_failures_still_schedule_scans():
+    scheduler = MagicMock()
+    with patch("dedup.backfill_fingerprints", side_effect=sqlite3.OperationalError("database is locked")), \
+            patch("resume_parser.get_or_create_profile", return_value=("profile", ["Go Developer"])):
+        await main._deferred_startup(MagicMock(), scheduler)
+    assert db.get_setting("keywords") == "Go Developer"
+    assert scheduler.add_job.call_args.args[0] is main.run_job_scan
+
+    scheduler = MagicMock()
+    with patch("main._seed_settings", side_effect=sqlite3.OperationalError("disk I/O error")), \
+            patch("resume_parser.get_or_create_profile", return_value=("profile", ["Go Developer"])):
+        await main._deferred_startup(MagicMock(), scheduler)
+    assert scheduler.add_job.call_args.args[0] is main.run_job_scan
@@ -0,0 +1,64 @@
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+import config
+import db
+from telegram_bot import handle_stats
+
+
+def _counts(rows, key):
+    return {row[key]: row["jobs"] for row in rows}
+
+
+def test_insert_job_counts_only_new_jobs():
+    assert db.insert_job("1", "Engineer", "Acme", "Singapore", "u", keyword="ML Engineer") is True
+    assert db.insert_job("1", "Engineer", "Acme", "Singapore", "u", keyword="ML Engineer") is False
+    db.insert_job("2", "Engineer", "Acme", "Remote", "u", keyword="Data Engineer")
+
+    stats = db.get_stats()
+    assert _counts(stats["keywords"], "keyword") == {"ML Engineer": 1, "Data Engineer": 1}
+    assert _counts(stats["companies"], "company") == {"Acme": 2}
+    assert _counts(stats["locations"], "location") == {"Singapore": 1, "Remote": 1}
+    assert _counts(stats["status"], "status") == {"pending": 2}
+
+
+def test_update_job_status_moves_status_counts():
+    db.insert_job("1", "Engineer", "Acme", "SG", "u")
+    db.insert_job("2", "Engineer", "Acme", "SG", "u")
+    db.update_job_status("1", "viewed")
+    db.update_job_status("1", "viewed")  # no double count
+    db.update_job_status("missing", "ignored")
+
+    assert _counts(db.get_stats()["status"], "status") == {"pending": 1, "viewed": 1}
+
+
+def test_stats_backfilled_from_existing_jobs():
+    db.insert_job("1", "Engineer", "Acme", "SG", "u", status="ignored", keyword="Python")
+    conn = db._get_conn()
+    for table in ("stats_keyword_daily", "stats_company", "stats_location", "stats_status"):
+        conn.execute(f"DROP TABLE {table}")
+    conn.commit()
+    conn.close()
+
+    db.init_db()
+
+    stats = db.get_stats()
+    assert _counts(stats["status"], "status") == {"ignored": 1}
+    assert _counts(stats["keywords"], "keyword") == {"Python": 1}
+
+
+@pytest.mark.asyncio
+async def test_handle_stats_reports_counts():
+    db.insert_job("1", "Engineer", "Acme", "Singapore", "u", keyword="Python")
+
+    update = MagicMock()
+    update.effective_chat.id = config.TELEGRAM_CHAT_ID
+    update.message = AsyncMock()
+    context = MagicMock()
+
+    await handle_stats(update, context)
+
+    text = update.message.reply_text.call_args[0][0]
+    assert "pending: 1" in text
+    assert "Python: 1" in text
+    assert "Acme: 1" in text
@@ -1,6 +1,7 @@
 import pytest
 from unittest.mock import AsyncMock, MagicMock, patch
 
+import config
 import db
 from telegram_bot import (
     _escape_md,
@@ -70,6 +71,7 @@ async def test_handle_keywords_show_current():
     db.set_setting("keywords", "Python,Django,AWS")
 
     update = MagicMock()
+    update.effective_chat.id = config.TELEGRAM_CHAT_ID
     update.message = AsyncMock()
     context = MagicMock()
     context.args = []
@@ -86,6 +88,7 @@ async def test_handle_keywords_show_current():
 async def test_handle_keywords_show_empty():
     """When no args and no keywords set, show usage."""
     update = MagicMock()
+    update.effective_chat.id = config.TELEGRAM_CHAT_ID
     update.message = AsyncMock()
     context = MagicMock()
     context.args = []
@@ -100,6 +103,7 @@ async def test_handle_keywords_show_empty():
 async def test_handle_keywords_update():
     """When args provided, update keywords in DB."""
     update = MagicMock()
+    update.effective_chat.id = config.TELEGRAM_CHAT_ID
     update.message = AsyncMock()
     context = MagicMock()
     context.args = ["React,", "Node.js,", "TypeScript"]
@@ -123,6 +127,7 @@ async def test_handle_location_show_current():
     db.set_setting("location", "Bangalore")
 
     update = MagicMock()
+    update.effective_chat.id = config.TELEGRAM_CHAT_ID
     update.message = AsyncMock()
     context = MagicMock()
     context.args = []
@@ -137,6 +142,7 @@ async def test_handle_location_show_current():
 async def test_handle_location_show_empty():
     """When no args and no location set, show usage."""
     update = MagicMock()
+    update.effective_chat.id = config.TELEGRAM_CHAT_ID
     update.message = AsyncMock()
     context = MagicMock()
     context.args = []
@@ -151,6 +157,7 @@ async def test_handle_location_show_empty():
 async def test_handle_location_update():
     """When args provided, update location in DB."""
     update = MagicMock()
+    update.effective_chat.id = config.TELEGRAM_CHAT_ID
     update.message = AsyncMock()
     context = MagicMock()
     context.args = ["New", "York"]
@@ -173,6 +180,7 @@ async def test_handle_callback_viewed():
     query.message.text_markdown_v2 = "some message"
 
     update = MagicMock()
+    update.effective_chat.id = config.TELEGRAM_CHAT_ID
     update.callback_query = query
     context = MagicMock()
 
@@ -181,7 +189,7 @@ async def test_handle_callback_viewed():
     query.answer.assert_called_once()
     query.edit_message_reply_markup.assert_called_once_with(reply_markup=None)
 
-    import sqlite3, config
+    import sqlite3
     conn = sqlite3.connect(config.DB_PATH)
     conn.row_factory = sqlite3.Row
     row = conn.execute("SELECT status FROM jobs WHERE job_id = '555'").fetchone()
@@ -200,12 +208,13 @@ async def test_handle_callback_ignored():
     query.message.text_markdown_v2 = "some message"
 
     update = MagicMock()
+    update.effective_chat.id = config.TELEGRAM_CHAT_ID
     update.callback_query = query
     context = MagicMock()
 
     await handle_callback(update, context)
 
-    import sqlite3, config
+    import sqlite3
     conn = sqlite3.connect(config.DB_PATH)
     conn.row_factory = sqlite3.Row
     row = conn.execute("SELECT status FROM jobs WHERE job_id = '666'").fetchone()
@@ -0,0 +1,136 @@
+import json
+import threading
+import time
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+import config
+import db
+import pipeline
+import tracing
+from checkpoint import ScanCheckpoint
+from models import Job
+from telegram_bot import handle_perf
+
+
+@pytest.fixture(autouse=True)
+def clean_traces(monkeypatch):
+    monkeypatch.setattr(tracing, "_traces", tracing.collections.deque(maxlen=5))
+    monkeypatch.setattr(tracing, "_profile_next", False)
+
+
+def _job(job_id):
+    return Job(job_id, f"Job {job_id}", "Acme", "SG", f"https://x/{job_id}", keyword="Python")
+
+
+def test_spans_recorded_only_inside_a_traced_scan(monkeypatch):
+    with tracing.span("outside"):
+        pass
+    assert tracing.recent() == []
+
+    monkeypatch.setattr(config, "TRACING", True)
+    with tracing.scan("test") as trace:
+        with tracing.span("fetch.search", page=0):
+            pass
+        db.get_setting("keywords")
+
+    assert [span[0] for span in trace.spans] == ["fetch.search", "db.get_setting"]
+    assert tracing.recent() == [trace]
+
+
+def test_tracing_off_records_nothing():
+    with tracing.scan("test") as trace:
+        db.get_setting("keywords")
+    assert trace is None
+    assert tracing.recent() == []
+
+
+def test_chrome_export(monkeypatch, tmp_path):
+    monkeypatch.setattr(config, "TRACING", True)
+    with tracing.scan("Python @ SG") as trace:
+        with tracing.span("parse", page=1):
+            pass
+
+    path = tracing.export_chrome(trace, str(tmp_path / "trace.json"))
+    with open(path) as f:
+        events = json.load(f)["traceEvents"]
+
+    complete = [event for event in events if event["ph"] == "X"]
+    assert complete[0]["name"] == "Python @ SG"
+    assert complete[1]["name"] == "parse"
+    assert complete[1]["args"] == {"page": 1}
+    assert complete[1]["dur"] >= 0
+    assert any(event["ph"] == "M" for event in events)
+
+
+def test_ring_buffer_keeps_latest_scans(monkeypatch):
+    monkeypatch.setattr(config, "TRACING", True)
+    for i in range(7):
+        with tracing.scan(f"scan {i}"):
+            pass
+    assert [trace.label for trace in tracing.recent()] == [f"scan {i}" for i in range(2, 7)]
+
+
+def test_stage_summary_sorted_by_total(monkeypatch):
+    monkeypatch.setattr(config, "TRACING", True)
+    with tracing.scan("test") as trace:
+        pass
+    trace.spans = [("parse", 0, 1, 1, "t", {}), ("fetch.search", 0, 2, 1, "t", {}), ("parse", 0, 1.5, 1, "t", {})]
+
+    assert tracing.stage_summary([trace]) == [("parse", 2, 2.5, 1.5), ("fetch.search", 1, 2.0, 2.0)]
+
+
+def test_profile_samples_one_scan(monkeypatch):
+    monkeypatch.setattr(config, "PROFILE_INTERVAL_SECONDS", 0.001)
+    bystander = threading.Thread(target=threading.Event().wait, args=(0.2,), daemon=True)
+    bystander.start()
+    tracing.profile_next_scan()
+    with tracing.scan("profiled") as trace:
+        deadline = time.perf_counter() + 0.05
+        while time.perf_counter() < deadline:
+            pass
+
+    assert trace.profile
+    # Only the scan's own threads, and only while busy
+    assert all("test_profile_samples_one_scan" in stack for stack in trace.profile)
+    assert tracing.latest_profiled() is trace
+    # Armed for one scan only
+    with tracing.scan("next") as trace:
+        pass
+    assert trace is None
+
+
+@pytest.mark.asyncio
+async def test_run_scan_traces_stages(monkeypatch):
+    monkeypatch.setattr(config, "TRACING", True)
+    checkpoint = ScanCheckpoint.start(["Python"], "SG", "r604800")
+    with patch("scraper.scrape_new_jobs", return_value=[_job("1")]), \
+         patch("telegram_bot.send_job_alert", new=AsyncMock()):
+        await pipeline.run_scan(None, checkpoint)
+
+    names = {span[0] for span in tracing.recent()[-1].spans}
+    assert {"scrape", "dedup", "db.insert_job_record", "telegram.send"} <= names
+
+
+@pytest.mark.asyncio
+async def test_handle_perf_summarizes_and_exports(monkeypatch):
+    monkeypatch.setattr(config, "TRACING", True)
+    with tracing.scan("Python @ SG"):
+        with tracing.span("fetch.search"):
+            pass
+
+    update = MagicMock()
+    update.effective_chat.id = config.TELEGRAM_CHAT_ID
+    update.message = AsyncMock()
+    context = MagicMock()
+
+    context.args = []
+    await handle_perf(update, context)
+    assert "fetch.search" in update.message.reply_text.call_args[0][0]
+
+    context.args = ["trace"]
+    await handle_perf(update, context)
+    document = update.message.reply_document.call_args.kwargs["document"]
+    events = json.loads(document.getvalue())["traceEvents"]
+    assert "fetch.search" in {event["name"] for event in events}
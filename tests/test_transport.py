@@ -0,0 +1,85 @@
+import os
+
+import pytest
+import requests
+
+import config
+import transport
+from bench import fakes
+from scraper import LinkedInJobScraper
+
+
+@pytest.fixture(autouse=True)
+def no_pacing(monkeypatch):
+    monkeypatch.setattr("scraper.rate_limiter.wait", lambda interval=0.0: None)
+    monkeypatch.setattr(transport, "_archives", {})
+
+
+def _fetch_all(li, pages=3):
+    return [li._fetch_page("Python", "SG", "r604800", page) for page in range(pages)]
+
+
+def test_replay_matches_live_parse(monkeypatch, tmp_path):
+    archive = str(tmp_path / "archive")
+    with fakes.FakeLinkedIn(jobs_per_keyword=40) as linkedin:
+        monkeypatch.setattr(config, "LINKEDIN_URL", linkedin.url)
+        monkeypatch.setattr(config, "HTTP_RECORD_DIR", archive)
+        live = _fetch_all(LinkedInJobScraper())
+
+    # Server gone: everything comes from the archive
+    monkeypatch.setattr(config, "HTTP_RECORD_DIR", "")
+    monkeypatch.setattr(config, "HTTP_REPLAY_DIR", archive)
+    monkeypatch.setattr(config, "HTTP_REPLAY_TIMING", "none")
+    replayed = _fetch_all(LinkedInJobScraper())
+
+    assert replayed == live
+    assert [len(page or []) for page in live] == [25, 15, 0]
+
+
+def test_identical_bodies_stored_once(tmp_path):
+    archive = transport.Archive(str(tmp_path))
+    archive.record("GET", "https://x/a?b=1&a=2", 200, "OK", {"Content-Type": "text/html"}, b"same")
+    archive.record("GET", "https://x/a?a=2&b=1", 200, "OK", {"Content-Type": "text/html"}, b"same")
+
+    blobs = [name for _, _, files in os.walk(tmp_path / "blobs") for name in files]
+    assert len(blobs) == 1
+    # Query order doesn't matter; the second request gets the second recording
+    assert archive.next_entry("GET", "https://x/a?b=1&a=2")["recorded_at"] < \
+        archive.next_entry("GET", "https://x/a?a=2&b=1")["recorded_at"]
+
+
+def test_replays_failures_and_rejects_unknown_urls(monkeypatch, tmp_path):
+    archive = transport.Archive(str(tmp_path))
+    archive.record("GET", "https://x/down", elapsed=0.2, error="ConnectTimeout: timed out")
+    archive.record("GET", "https://x/slow", 429, "Too Many Requests", {"Retry-After": "5"}, b"", elapsed=0.05)
+    monkeypatch.setattr(transport, "_archives", {str(tmp_path): archive})
+    monkeypatch.setattr(config, "HTTP_REPLAY_DIR", str(tmp_path))
+    monkeypatch.setattr(config, "HTTP_REPLAY_TIMING", "original")
+    session = transport.new_session()
+
+    response = session.get("https://x/slow")
+    assert response.status_code == 429
+    assert response.headers["retry-after"] == "5"
+    # Original timing: takes as long as the recorded response did
+    assert response.elapsed.total_seconds() >= 0.05
+    with pytest.raises(requests.exceptions.ConnectionError, match="timed out"):
+        session.get("https://x/down")
+    with pytest.raises(requests.exceptions.ConnectionError, match="Not in HTTP archive"):
+        session.get("https://x/elsewhere")
+
+
+def test_replayed_responses_stream(monkeypatch, tmp_path):
+    archive = transport.Archive(str(tmp_path))
+    archive.record("GET", "https://x/posting", 200, "OK", {"Content-Type": "text/html"}, b"<html>open</html>" * 1000)
+    posting_url = f"{config.LINKEDIN_URL}/jobs-guest/jobs/api/jobPosting/1"
+    archive.record("GET", posting_url, 200, "OK", {"Content-Type": "text/html"}, b"<html>open</html>")
+    monkeypatch.setattr(transport, "_archives", {str(tmp_path): archive})
+    monkeypatch.setattr(config, "HTTP_REPLAY_DIR", str(tmp_path))
+    monkeypatch.setattr(config, "HTTP_REPLAY_TIMING", "none")
+
+    response = transport.new_session().get("https://x/posting", stream=True)
+    assert b"".join(response.iter_content(8192)) == b"<html>open</html>" * 1000
+    response.close()
+
+    # Liveness checks read the posting fragment that way
+    assert LinkedInJobScraper()._check_liveness("1") is True
@@ -0,0 +1,72 @@
+import json
+from unittest.mock import patch
+
+import db
+import triage
+
+
+def _job(job_id, title="Engineer"):
+    return {
+        "job_id": job_id,
+        "title": title,
+        "company": "Acme",
+        "location": "Singapore",
+        "url": f"https://www.linkedin.com/jobs/view/{job_id}",
+    }
+
+
+def _reply(verdicts):
+    return {"message": {"content": json.dumps(verdicts)}}
+
+
+def test_parse_verdicts_handles_fences_and_wrapped_list():
+    content = "```json\n" + json.dumps({"verdicts": [
+        {"job_id": 1, "fit": "yes", "reason": "Good"},
+        {"job_id": "2", "fit": False},
+    ]}) + "\n```"
+    verdicts = triage._parse_verdicts(content)
+    assert verdicts == {"1": (True, "Good"), "2": (False, "")}
+
+
+def test_triage_jobs_skips_without_profile():
+    jobs = [_job("1")]
+    with patch("triage.ollama.chat", side_effect=Exception("should not be called")):
+        assert triage.triage_jobs(jobs) == jobs
+
+
+def test_triage_jobs_batches_and_filters():
+    db.save_profile("raw", "Senior Python engineer", "Python")
+    jobs = [_job(str(i)) for i in range(5)]
+    replies = [
+        _reply([{"job_id": "0", "fit": True}, {"job_id": "1", "fit": False},
+                {"job_id": "2", "fit": True}]),
+        _reply([{"job_id": "3", "fit": False}, {"job_id": "4", "fit": True}]),
+    ]
+
+    with patch("triage.ollama.chat", side_effect=replies) as chat:
+        kept = triage.triage_jobs(jobs, batch_size=3)
+
+    assert chat.call_count == 2
+    assert [job["job_id"] for job in kept] == ["0", "2", "4"]
+    assert set(db.get_verdicts(["0", "1", "2", "3", "4"])) == {"0", "1", "2", "3", "4"}
+
+
+def test_triage_jobs_uses_cached_verdicts():
+    db.save_profile("raw", "Senior Python engineer", "Python")
+    db.save_verdicts([("1", True, "ok"), ("2", False, "junior role")])
+
+    with patch("triage.ollama.chat", side_effect=Exception("should not be called")):
+        kept = triage.triage_jobs([_job("1"), _job("2")])
+
+    assert [job["job_id"] for job in kept] == ["1"]
+
+
+def test_triage_jobs_keeps_batch_on_llm_error():
+    db.save_profile("raw", "Senior Python engineer", "Python")
+    jobs = [_job("1"), _job("2")]
+
+    with patch("triage.ollama.chat", side_effect=Exception("ollama down")):
+        kept = triage.triage_jobs(jobs)
+
+    assert kept == jobs
+    assert db.get_verdicts(["1", "2"]) == {}
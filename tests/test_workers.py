@@ -0,0 +1,108 @@
+import threading
+from unittest.mock import patch
+
+import pytest
+
+import breakers
+import config
+import db
+import scraper
+import workers
+from checkpoint import ScanCheckpoint
+from models import Job
+from scraper import LinkedInJobScraper
+
+
+def _fake_fetch(self, keyword, location, timeframe, page):
+    if page >= 2:
+        return None
+    return [
+        Job(f"{keyword}-{page}-{i}", "t", "c", "l", "u")
+        for i in range(3)
+    ]
+
+
+@pytest.fixture
+def worker_threads(monkeypatch):
+    """Run workers as threads of the test process so _fetch_page can be patched."""
+    monkeypatch.setattr(config, "REQUEST_INTERVAL_SECONDS", 0)
+    monkeypatch.setattr(scraper.rate_limiter, "min_interval", 0)
+    monkeypatch.setattr(workers, "POLL_SECONDS", 0.01)
+    stop = threading.Event()
+    threads = []
+
+    def start(count):
+        for i in range(count):
+            thread = threading.Thread(target=workers.run_worker, args=(f"t{i}", count, stop))
+            thread.start()
+            threads.append(thread)
+
+    with patch.object(LinkedInJobScraper, "_fetch_page", _fake_fetch):
+        yield start
+        stop.set()
+        for thread in threads:
+            thread.join()
+
+
+def test_claim_is_exclusive_until_stale():
+    (unit_id,) = db.enqueue_scrape_units([("Python", "SG", "r604800", 0, 0.0)])
+
+    assert db.claim_scrape_unit("a", 100.0, 0.0)["id"] == unit_id
+    assert db.claim_scrape_unit("b", 101.0, 0.0) is None
+    # Worker "a" went quiet: its claim is older than the stale cutoff
+    assert db.claim_scrape_unit("b", 300.0, 200.0)["claimed_by"] == "b"
+
+
+def test_result_for_withdrawn_unit_is_dropped():
+    (unit_id,) = db.enqueue_scrape_units([("Python", "SG", "r604800", 0, 0.0)])
+    db.delete_scrape_units([unit_id])
+    db.save_scrape_result(unit_id, [Job("1", "t", "c", "l", "u")], 0)
+    assert db.get_scrape_results([unit_id]) == {}
+
+
+def test_fetch_via_queue_returns_results_in_order(worker_threads):
+    worker_threads(2)
+    results, rejected = workers.fetch_via_queue([("A", 0), ("B", 5), ("C", 1)], "SG", "r604800")
+
+    assert [job["job_id"] for job in results[0]] == ["A-0-0", "A-0-1", "A-0-2"]
+    assert results[1] is None
+    assert results[2][0]["job_id"] == "C-1-0"
+    assert rejected == 0
+    # Units are cleaned up once read
+    assert db.claim_scrape_unit("x", 0.0, 0.0) is None
+
+
+def test_fetch_via_queue_gives_up_without_workers(monkeypatch):
+    monkeypatch.setattr(config, "SCRAPE_UNIT_TIMEOUT_SECONDS", 0.05)
+    monkeypatch.setattr(workers, "POLL_SECONDS", 0.01)
+    results, _ = workers.fetch_via_queue([("A", 0)], "SG", "r604800")
+    assert results == [None]
+
+
+def test_search_jobs_through_workers_matches_in_process(worker_threads, monkeypatch):
+    in_process = LinkedInJobScraper().search_jobs(["A", "B", "C"], "SG", budget=10)
+
+    worker_threads(3)
+    monkeypatch.setattr(config, "SCRAPE_WORKERS", 3)
+    pooled = LinkedInJobScraper().search_jobs(["A", "B", "C"], "SG", budget=10)
+
+    assert sorted(job["job_id"] for job in pooled) == sorted(job["job_id"] for job in in_process)
+    assert len(pooled) == 18
+
+
+def test_pages_blocked_in_workers_are_reported_like_in_process(worker_threads, monkeypatch):
+    def blocked_fetch(self, keyword, location, timeframe, page):
+        # What _fetch_page does while the LinkedIn breaker is open
+        self.attempted += 1
+        self.blocked += 1
+        return None
+
+    worker_threads(2)
+    monkeypatch.setattr(config, "SCRAPE_WORKERS", 2)
+    checkpoint = ScanCheckpoint.start(["A", "B"], "SG", "r604800")
+    with patch.object(LinkedInJobScraper, "_fetch_page", blocked_fetch), \
+            pytest.raises(breakers.CircuitOpen):
+        scraper.scrape_new_jobs(["A", "B"], "SG", checkpoint=checkpoint)
+
+    # Nothing recorded as fetched, so a resumed scan tries those pages again
+    assert checkpoint.done_units() == []
@@ -0,0 +1,226 @@
+import collections
+import functools
+import json
+import logging
+import os
+import sys
+import threading
+import time
+
+import config
+
+logger = logging.getLogger(__name__)
+
+# Only one scan runs per process at a time (pipeline.scan_lock), so spans from
+# any thread — the scrape thread, detail fetchers, the event loop — belong to it.
+_active = None
+_profile_next = False
+_traces = collections.deque(maxlen=config.TRACE_BUFFER_SIZE)
+
+
+class Trace:
+    """Spans recorded during one scan, plus an optional stack-sampling profile."""
+
+    def __init__(self, label):
+        self.label = label
+        self.started_at = time.time()
+        self.start = time.perf_counter()
+        self.end = None
+        # (name, start, end, thread id, thread name, args)
+        self.spans = []
+        # Collapsed stack ("outer;inner;leaf") -> samples, when profiled
+        self.profile = None
+        # Threads that worked on the scan: the one that started it and any that opened a span
+        self.threads = {threading.get_ident()}
+
+    def add(self, name, start, end, args):
+        thread = threading.current_thread()
+        self.spans.append((name, start, end, thread.ident, thread.name, args))
+
+    @property
+    def duration(self):
+        return (self.end or time.perf_counter()) - self.start
+
+    def to_chrome(self):
+        """Chrome trace-event JSON (load in chrome://tracing or ui.perfetto.dev)."""
+        tids = {}
+        events = []
+        for name, start, end, ident, thread_name, args in self.spans:
+            if ident not in tids:
+                tids[ident] = len(tids) + 1
+                events.append({
+                    "name": "thread_name", "ph": "M", "pid": 1, "tid": tids[ident],
+                    "args": {"name": thread_name},
+                })
+            events.append({
+                "name": name,
+                "cat": name.split(".", 1)[0],
+                "ph": "X",
+                "ts": round((start - self.start) * 1e6, 1),
+                "dur": round((end - start) * 1e6, 1),
+                "pid": 1,
+                "tid": tids[ident],
+                "args": args,
+            })
+        events.insert(0, {
+            "name": self.label, "cat": "scan", "ph": "X", "ts": 0,
+            "dur": round(self.duration * 1e6, 1), "pid": 1, "tid": 0,
+            "args": {"started_at": self.started_at},
+        })
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+
+class span:
+    """Context manager recording a named span in the running scan's trace, if any."""
+
+    __slots__ = ("name", "args", "trace", "start")
+
+    def __init__(self, name, **args):
+        self.name = name
+        self.args = args
+
+    def __enter__(self):
+        self.trace = _active
+        if self.trace is not None:
+            self.trace.threads.add(threading.get_ident())
+            self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        if self.trace is not None:
+            self.trace.add(self.name, self.start, time.perf_counter(), self.args)
+        return False
+
+
+def traced(name):
+    """Decorator recording each call as a span."""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if _active is None:
+                return fn(*args, **kwargs)
+            with span(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+# Leaf frames of a thread that is only waiting: an idle event loop, or a
+# thread blocked on a lock or condition until another one finishes
+_IDLE_LEAVES = {"selectors.py:select", "threading.py:wait"}
+
+
+class _StackSampler(threading.Thread):
+    """Samples the Python stacks of a trace's threads at a fixed interval, skipping idle ones."""
+
+    def __init__(self, interval, threads):
+        super().__init__(name="stack-sampler", daemon=True)
+        self.interval = interval
+        self.threads = threads
+        self.samples = collections.Counter()
+        self._done = threading.Event()
+
+    def run(self):
+        while not self._done.wait(self.interval):
+            for ident, frame in sys._current_frames().items():
+                if ident not in self.threads:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                    frame = frame.f_back
+                if stack[0] in _IDLE_LEAVES:
+                    continue
+                self.samples[";".join(reversed(stack))] += 1
+
+    def stop(self):
+        self._done.set()
+        self.join()
+        return self.samples
+
+
+class scan:
+    """
+    Context manager tracing one scan when TRACING is on or a profile is armed.
+
+    Yields the Trace, or None when not tracing. Finished traces go into a
+    ring buffer of the last TRACE_BUFFER_SIZE scans.
+    """
+
+    def __init__(self, label):
+        self.label = label
+        self.trace = None
+        self.sampler = None
+
+    def __enter__(self):
+        global _active, _profile_next
+        if _active is not None or not (config.TRACING or _profile_next):
+            return None
+        self.trace = Trace(self.label)
+        if _profile_next:
+            _profile_next = False
+            self.sampler = _StackSampler(config.PROFILE_INTERVAL_SECONDS, self.trace.threads)
+            self.sampler.start()
+        _active = self.trace
+        return self.trace
+
+    def __exit__(self, *exc):
+        global _active
+        if self.trace is None:
+            return False
+        _active = None
+        self.trace.end = time.perf_counter()
+        if self.sampler:
+            self.trace.profile = self.sampler.stop()
+        _traces.append(self.trace)
+        logger.info(f"Traced scan '{self.label}': {self.trace.duration:.1f}s, {len(self.trace.spans)} spans")
+        return False
+
+
+def profile_next_scan():
+    """Trace and stack-sample the next scan, even with TRACING off."""
+    global _profile_next
+    _profile_next = True
+
+
+def recent():
+    """Finished traces, oldest first."""
+    return list(_traces)
+
+
+def latest_profiled():
+    for trace in reversed(_traces):
+        if trace.profile is not None:
+            return trace
+    return None
+
+
+def stage_summary(traces):
+    """Per span name: count, total and max seconds across traces, slowest total first."""
+    stages = {}
+    for trace in traces:
+        for name, start, end, *_ in trace.spans:
+            count, total, longest = stages.get(name, (0, 0.0, 0.0))
+            stages[name] = (count + 1, total + end - start, max(longest, end - start))
+    return sorted(
+        ((name, count, total, longest) for name, (count, total, longest) in stages.items()),
+        key=lambda stage: stage[2],
+        reverse=True,
+    )
+
+
+def top_functions(profile, top=10):
+    """Functions with the most samples at the top of the stack: [(function, samples)]."""
+    leaves = collections.Counter()
+    for stack, samples in profile.items():
+        leaves[stack.rsplit(";", 1)[-1]] += samples
+    return leaves.most_common(top)
+
+
+def export_chrome(trace, path):
+    """Write a trace as Chrome trace-event JSON."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(trace.to_chrome(), f)
+    return path
@@ -0,0 +1,200 @@
+import gzip
+import hashlib
+import io
+import json
+import os
+import threading
+import time
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+import config
+
+# Not replayed as recorded: the stored body is already decoded and complete
+_DROPPED_HEADERS = {"content-encoding", "content-length", "transfer-encoding", "connection", "set-cookie"}
+
+
+def request_key(method, url):
+    """Method plus URL with sorted query parameters, so parameter order doesn't matter."""
+    parts = urlsplit(url)
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return f"{method.upper()} {urlunsplit((parts.scheme, parts.netloc, parts.path, query, ''))}"
+
+
+class Archive:
+    """
+    Recorded HTTP exchanges in a directory.
+
+    index.jsonl holds one line per exchange, in recording order. Bodies are
+    stored once per distinct content under blobs/<sha256>.gz, so pages that
+    come back unchanged take no extra space. Appends are safe from several
+    threads and processes.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._entries = None
+        self._by_key = None
+        self._cursors = {}
+
+    def _blob_path(self, digest):
+        return os.path.join(self.path, "blobs", digest[:2], f"{digest}.gz")
+
+    def record(self, method, url, status=None, reason="", headers=None, body=b"", elapsed=0.0, error=None):
+        digest = None
+        if error is None:
+            digest = hashlib.sha256(body).hexdigest()
+            blob = self._blob_path(digest)
+            if not os.path.exists(blob):
+                os.makedirs(os.path.dirname(blob), exist_ok=True)
+                tmp = f"{blob}.{os.getpid()}.{threading.get_ident()}"
+                with gzip.open(tmp, "wb") as f:
+                    f.write(body)
+                os.replace(tmp, blob)
+        entry = {
+            "key": request_key(method, url),
+            "url": url,
+            "status": status,
+            "reason": reason,
+            "headers": {k: v for k, v in (headers or {}).items() if k.lower() not in _DROPPED_HEADERS},
+            "body": digest,
+            "elapsed": round(elapsed, 4),
+            "recorded_at": time.time(),
+            "error": error,
+        }
+        line = json.dumps(entry) + "\n"
+        with self._lock:
+            os.makedirs(self.path, exist_ok=True)
+            with open(os.path.join(self.path, "index.jsonl"), "a") as f:
+                f.write(line)
+
+    def entries(self):
+        """Every recorded exchange, in recording order."""
+        if self._entries is None:
+            index = os.path.join(self.path, "index.jsonl")
+            if not os.path.exists(index):
+                raise FileNotFoundError(f"No HTTP archive at {self.path}")
+            with open(index) as f:
+                self._entries = [json.loads(line) for line in f if line.strip()]
+            self._by_key = {}
+            for entry in self._entries:
+                self._by_key.setdefault(entry["key"], []).append(entry)
+        return self._entries
+
+    def body(self, digest):
+        with gzip.open(self._blob_path(digest), "rb") as f:
+            return f.read()
+
+    def rewind(self):
+        """Replay every URL from its first recording again."""
+        with self._lock:
+            self._cursors.clear()
+
+    def next_entry(self, method, url):
+        """
+        The next recorded exchange for this request. Repeated requests get
+        the recordings in order; once they run out the last one repeats.
+        """
+        key = request_key(method, url)
+        with self._lock:
+            self.entries()
+            matches = self._by_key.get(key)
+            if not matches:
+                return None
+            cursor = self._cursors.get(key, 0)
+            self._cursors[key] = cursor + 1
+            return matches[min(cursor, len(matches) - 1)]
+
+
+_archives = {}
+_archives_lock = threading.Lock()
+
+
+def get_archive(path):
+    """One Archive per path per process, so replay order carries across sessions."""
+    with _archives_lock:
+        if path not in _archives:
+            _archives[path] = Archive(path)
+        return _archives[path]
+
+
+class RecordingAdapter(HTTPAdapter):
+    """Sends requests for real and records every exchange (or failure) into an archive."""
+
+    def __init__(self, archive, **kwargs):
+        super().__init__(**kwargs)
+        self.archive = archive
+
+    def send(self, request, **kwargs):
+        start = time.perf_counter()
+        try:
+            response = super().send(request, **kwargs)
+            body = response.content
+        except requests.exceptions.RequestException as e:
+            self.archive.record(request.method, request.url, elapsed=time.perf_counter() - start,
+                                error=f"{type(e).__name__}: {e}")
+            raise
+        self.archive.record(request.method, request.url, response.status_code, response.reason,
+                            dict(response.headers), body, time.perf_counter() - start)
+        return response
+
+
+class ReplayAdapter(HTTPAdapter):
+    """
+    Answers requests from an archive without touching the network.
+
+    With timing "original", each response takes as long as it did when it
+    was recorded; with "none" it returns immediately. Requests that were
+    never recorded fail with ConnectionError, like an unreachable host.
+    """
+
+    def __init__(self, archive, timing="original", **kwargs):
+        super().__init__(**kwargs)
+        self.archive = archive
+        self.timing = timing
+
+    def send(self, request, **kwargs):
+        entry = self.archive.next_entry(request.method, request.url)
+        if entry is None:
+            raise requests.exceptions.ConnectionError(f"Not in HTTP archive: {request.method} {request.url}", request=request)
+        if self.timing == "original" and entry["elapsed"]:
+            time.sleep(entry["elapsed"])
+        if entry["error"]:
+            raise requests.exceptions.ConnectionError(f"Replayed failure: {entry['error']}", request=request)
+
+        response = requests.Response()
+        response.status_code = entry["status"]
+        response.reason = entry["reason"]
+        response.headers = CaseInsensitiveDict(entry["headers"])
+        response.encoding = get_encoding_from_headers(response.headers)
+        body = self.archive.body(entry["body"])
+        # Complete already: content, iter_content (stream=True) and raw reads all serve it
+        response._content = body
+        response._content_consumed = True
+        response.raw = io.BytesIO(body)
+        response.url = request.url
+        response.request = request
+        response.connection = self
+        return response
+
+
+def install(session):
+    """Mount the recording or replaying adapter on a session, as configured. Returns the session."""
+    if config.HTTP_REPLAY_DIR:
+        adapter = ReplayAdapter(get_archive(config.HTTP_REPLAY_DIR), config.HTTP_REPLAY_TIMING)
+    elif config.HTTP_RECORD_DIR:
+        adapter = RecordingAdapter(get_archive(config.HTTP_RECORD_DIR))
+    else:
+        return session
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def new_session():
+    return install(requests.Session())
@@ -0,0 +1,132 @@
+import json
+import logging
+
+import config
+import db
+import metrics
+import tracing
+from lazy import lazy_import
+from resume_parser import ollama_breaker, strip_code_fences
+
+ollama = lazy_import("ollama")
+
+logger = logging.getLogger(__name__)
+
+
+# Descriptions are long; the first part carries most of the signal
+DESCRIPTION_CHARS = 600
+
+
+def _job_summary(job):
+    summary = {
+        "job_id": job["job_id"],
+        "title": job["title"],
+        "company": job["company"],
+        "location": job["location"],
+    }
+    if job.get("seniority"):
+        summary["seniority"] = job["seniority"]
+    if job.get("employment_type"):
+        summary["employment_type"] = job["employment_type"]
+    if job.get("description"):
+        summary["description"] = job["description"][:DESCRIPTION_CHARS]
+    return summary
+
+
+def _build_prompt(profile, jobs):
+    listing = json.dumps([_job_summary(job) for job in jobs], indent=2)
+    return f"""You are screening LinkedIn job postings for a candidate.
+
+Candidate profile:
+{profile}
+
+For each job below, decide whether it is a realistic fit for this candidate.
+Return a JSON array with exactly one object per job, each with exactly these keys:
+- "job_id": the job_id string exactly as given
+- "fit": true or false
+- "reason": one short sentence explaining the verdict
+
+Jobs:
+{listing}
+
+Respond ONLY with valid JSON. No markdown, no explanation."""
+
+
+def _parse_verdicts(content):
+    """Parse the LLM reply into {job_id: (fit, reason)}."""
+    result = json.loads(strip_code_fences(content))
+    if isinstance(result, dict):
+        # Some models wrap the array, e.g. {"verdicts": [...]}
+        result = next((v for v in result.values() if isinstance(v, list)), [])
+
+    verdicts = {}
+    for item in result:
+        if not isinstance(item, dict) or "job_id" not in item or "fit" not in item:
+            continue
+        fit = item["fit"]
+        if isinstance(fit, str):
+            fit = fit.strip().lower() in ("true", "yes", "1")
+        verdicts[str(item["job_id"])] = (bool(fit), str(item.get("reason", "")))
+    return verdicts
+
+
+def triage_batch(profile, jobs):
+    """Ask Ollama for fit verdicts on a batch of jobs in a single call."""
+    with metrics.OLLAMA_SECONDS.time("triage"), tracing.span("triage", jobs=len(jobs)):
+        response = ollama_breaker.call(
+            ollama.chat,
+            model=config.OLLAMA_MODEL,
+            messages=[{"role": "user", "content": _build_prompt(profile, jobs)}],
+        )
+    return _parse_verdicts(response["message"]["content"])
+
+
+def triage_jobs(jobs, batch_size=None, chat_id=None):
+    """
+    Drop jobs that the LLM judges a poor fit for the chat's stored profile.
+
+    Verdicts are cached permanently per chat and job_id, so a posting is only ever
+    sent to Ollama once. Uncached jobs are sent in batches of batch_size per
+    prompt. Jobs without a verdict (LLM error, missing from the reply) are
+    kept and left uncached so they are retried on the next scan.
+    """
+    if not jobs:
+        return jobs
+
+    profile = db.get_profile(chat_id)
+    if not profile:
+        logger.warning("Triage skipped: no parsed profile. Use /profile refresh.")
+        return jobs
+
+    batch_size = batch_size or config.TRIAGE_BATCH_SIZE
+    cached = db.get_verdicts((job["job_id"] for job in jobs), chat_id)
+    verdicts = {job_id: bool(row["fit"]) for job_id, row in cached.items()}
+
+    uncached = [job for job in jobs if job["job_id"] not in verdicts]
+    calls = 0
+    for i in range(0, len(uncached), batch_size):
+        batch = uncached[i:i + batch_size]
+        calls += 1
+        try:
+            batch_verdicts = triage_batch(profile["parsed_profile"], batch)
+        except Exception as e:
+            logger.error(f"Triage batch failed, keeping {len(batch)} jobs: {e}")
+            continue
+
+        batch_ids = {job["job_id"] for job in batch}
+        to_save = [
+            (job_id, fit, reason)
+            for job_id, (fit, reason) in batch_verdicts.items()
+            if job_id in batch_ids
+        ]
+        db.save_verdicts(to_save, chat_id)
+        for job_id, fit, _ in to_save:
+            verdicts[job_id] = fit
+
+    kept = [job for job in jobs if verdicts.get(job["job_id"], True)]
+    hit_rate = len(cached) / len(jobs) * 100
+    logger.info(
+        f"Triage: {len(jobs)} jobs, {len(cached)} cached ({hit_rate:.0f}% hit rate), "
+        f"{calls} LLM calls, {len(jobs) - len(kept)} rejected."
+    )
+    return kept
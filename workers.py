@@ -0,0 +1,127 @@
+import logging
+import multiprocessing
+import os
+import time
+
+import config
+import db
+import filters
+import scraper
+
+logger = logging.getLogger(__name__)
+
+# How often idle workers and the waiting coordinator look at the queue
+POLL_SECONDS = 0.2
+
+# Result placeholder for a unit the coordinator stopped waiting for at shutdown
+UNFINISHED = object()
+# Result placeholder for a unit the LinkedIn breaker turned away unfetched
+BLOCKED = object()
+
+
+def fetch_via_queue(arms, location, timeframe, spacing=0.0):
+    """
+    Have the worker processes fetch and parse (keyword, page) search pages.
+
+    Blocks until every unit has a result, shutdown is requested, or no
+    result arrives for SCRAPE_UNIT_TIMEOUT_SECONDS (no live workers).
+    Returns ([jobs, None, UNFINISHED or BLOCKED per arm], cards dropped by filters).
+    """
+    unit_ids = db.enqueue_scrape_units(
+        [(keyword, location, timeframe, page, spacing) for keyword, page in arms]
+    )
+    results = {}
+    last_progress = time.monotonic()
+    try:
+        while len(results) < len(unit_ids) and not scraper.stop_event.is_set():
+            done = db.get_scrape_results(unit_ids)
+            if len(done) > len(results):
+                last_progress = time.monotonic()
+            results = done
+            if len(results) == len(unit_ids):
+                break
+            if time.monotonic() - last_progress > config.SCRAPE_UNIT_TIMEOUT_SECONDS:
+                logger.error(f"No scrape results for {config.SCRAPE_UNIT_TIMEOUT_SECONDS:g}s; are the workers running?")
+                break
+            time.sleep(POLL_SECONDS)
+    finally:
+        db.delete_scrape_units(unit_ids)
+
+    missing = UNFINISHED if scraper.stop_event.is_set() else None
+    jobs = [
+        (BLOCKED if results[unit_id][2] else results[unit_id][0]) if unit_id in results else missing
+        for unit_id in unit_ids
+    ]
+    rejected = sum(result[1] for result in results.values())
+    return jobs, rejected
+
+
+def run_worker(name, worker_count, stop):
+    """
+    Claim and process queued units until stop is set.
+
+    Every worker paces itself at worker_count times the configured request
+    interval, so the pool as a whole keeps the single-process request rate.
+    """
+    scraper.rate_limiter.min_interval = config.REQUEST_INTERVAL_SECONDS * worker_count
+    li = scraper.LinkedInJobScraper()
+    logger.info(f"Scrape worker {name} started.")
+
+    while not stop.is_set():
+        now = time.time()
+        unit = db.claim_scrape_unit(name, now, now - config.SCRAPE_UNIT_TIMEOUT_SECONDS)
+        if unit is None:
+            stop.wait(POLL_SECONDS)
+            continue
+
+        li.spacing = unit["spacing"] * worker_count
+        li.job_filter = filters.load_scrape_filter()
+        li.rejected = li.blocked = 0
+        try:
+            jobs = li._fetch_page(unit["keyword"], unit["location"], unit["timeframe"], unit["page"])
+        except Exception as e:
+            logger.error(f"Worker {name} failed on '{unit['keyword']}' page {unit['page']}: {e}")
+            jobs = None
+        db.save_scrape_result(unit["id"], jobs, li.rejected, blocked=li.blocked > 0)
+
+    logger.info(f"Scrape worker {name} stopped.")
+
+
+def _worker_main(name, worker_count, stop):
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+    try:
+        run_worker(name, worker_count, stop)
+    except KeyboardInterrupt:
+        pass
+
+
+def start_workers(count):
+    """Spawn count worker processes. Returns (processes, stop event) for stop_workers()."""
+    # Spawn, not fork: the parent runs an asyncio loop and bot threads
+    ctx = multiprocessing.get_context("spawn")
+    stop = ctx.Event()
+    processes = []
+    for i in range(count):
+        process = ctx.Process(
+            target=_worker_main,
+            args=(f"{os.getpid()}-{i}", count, stop),
+            name=f"scrape-worker-{i}",
+            daemon=True,
+        )
+        process.start()
+        processes.append(process)
+    return processes, stop
+
+
+def stop_workers(processes, stop, timeout=10.0):
+    stop.set()
+    deadline = time.monotonic() + timeout
+    for process in processes:
+        process.join(max(0.0, deadline - time.monotonic()))
+        if process.is_alive():
+            process.terminate()
+
+
+if __name__ == "__main__":
+    # Standalone worker, e.g. `python workers.py` alongside a bot with SCRAPE_WORKERS set
+    _worker_main(f"{os.getpid()}", max(config.SCRAPE_WORKERS, 1), multiprocessing.Event())